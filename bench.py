@@ -0,0 +1,197 @@
+#!/usr/bin/python
+'''Bench script.
+
+This script estimates the time complexity of a problem's `main.py` by running
+it on generated inputs of growing size, fitting the times to the usual
+complexity classes and projecting the runtime at the maximum constraint.
+
+Inputs come from a generator `gen.py` in the problem folder, which is run as
+`python3 gen.py <seed> <n>` and must write an input of size `n` to stdout.
+Either can instead be a source in a compiled language, such as `main.cpp`,
+which is built once and kept in the build cache (see `build_cache.py`).
+Each size is timed several times and the fastest run is kept. Every class is
+fitted as `a + b * f(n)`, where `a` absorbs interpreter startup, minimising the
+relative error, and the class with the smallest error wins.
+
+Example::
+
+    $ python3 bench.py -n 1000,10000,100000,1000000 -r 5 CodeJam/2020/Round1A/Pascal
+
+    $ cd CodeJam/2020/Round1A/Pascal && python3 ../../../../bench.py -m 1000000000
+
+'''
+
+import math, sys, tempfile
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+from problems import run_solution, solution_file
+
+DEFAULT_SIZES = [1000, 3000, 10000, 30000, 100000, 300000, 1000000]
+
+# Complexity classes, simplest first. Ties go to the simpler class.
+CLASSES = [
+  ('O(1)',       lambda n: 1.0),
+  ('O(log n)',   lambda n: math.log(n)),
+  ('O(n)',       lambda n: float(n)),
+  ('O(n log n)', lambda n: n * math.log(n)),
+  ('O(n^2)',     lambda n: float(n) ** 2),
+  ('O(n^3)',     lambda n: float(n) ** 3),
+]
+
+# A more complex class must reduce the error by this factor to be preferred.
+TIE_FACTOR = 0.9
+
+def main(argv):
+  try:
+    opts = process_input(argv)
+    if opts == 'help':
+      print_usage(err=False)
+    bench(**opts)
+  except Exception as e:
+    exit('{}'.format(e))
+
+def print_usage(err=True):
+  exit('usage: bench.py [-h] [-n <n1,n2,...>] [-r <repeats>] [-m <max n>] [-s <seed>] [<path>]', err=err)
+
+def exit(message, err=True):
+  print(message)
+  sys.exit(1 if err else 0)
+
+def process_input(argv):
+  try:
+    opts, args = getopt(argv, 'hn:r:m:s:', ['sizes=', 'repeats=', 'max=', 'seed='])
+  except GetoptError:
+    print_usage()
+  if len(args) > 1:
+    print_usage()
+  result = {'path': Path(args[0]) if args else Path.cwd(), 'sizes': DEFAULT_SIZES,
+            'repeats': 3, 'max_n': None, 'seed': 0}
+  try:
+    for opt, arg in opts:
+      if opt == '-h':
+        return 'help'
+      elif opt in ('-n', '--sizes'):
+        result['sizes'] = sorted(int(float(s)) for s in arg.split(','))
+      elif opt in ('-r', '--repeats'):
+        result['repeats'] = int(arg)
+      elif opt in ('-m', '--max'):
+        result['max_n'] = int(float(arg))
+      elif opt in ('-s', '--seed'):
+        result['seed'] = int(arg)
+  except ValueError as e:
+    raise ValueError('Sizes, repeats, max and seed must be numbers.') from e
+  if len(result['sizes']) < 3:
+    raise ValueError('At least three sizes are needed to fit a complexity class.')
+  if result['repeats'] < 1 or result['sizes'][0] < 1:
+    raise ValueError('Sizes and repeats must be positive.')
+  return result
+
+def bench(path, sizes=DEFAULT_SIZES, repeats=3, max_n=None, seed=0, out=sys.stdout):
+  '''Times a problem's solution at each size and prints the fitted classes.
+
+  Returns:
+    The list of Fit instances, best first.
+
+  '''
+  path = Path(path)
+  gen_path, main_path = solution_file(path, 'gen'), solution_file(path)
+  if gen_path is None:
+    raise FileNotFoundError('No generator gen.py in {}.'.format(path))
+  if main_path is None:
+    raise FileNotFoundError('No main.py in {}.'.format(path))
+  times = []
+  print('{:>10} {:>10}'.format('n', 'time'), file=out)
+  with tempfile.TemporaryDirectory() as tmp:
+    input_path = Path(tmp) / 'bench.in'
+    for n in sizes:
+      generate(gen_path, seed, n, input_path)
+      times.append(time_solution(main_path, input_path, repeats))
+      print('{:>10} {:>9.4f}s'.format(n, times[-1]), file=out, flush=True)
+  fits = fit(sizes, times)
+  max_n = max_n or sizes[-1]
+  print('', file=out)
+  print('{:<11} {:>9} {:>14}'.format('class', 'error', 'at n={}'.format(max_n)), file=out)
+  for f in fits:
+    print('{:<11} {:>9.4f} {:>13.3f}s'.format(f.name, f.error, f.predict(max_n)), file=out)
+  best = fits[0]
+  print('', file=out)
+  print('Best fit {}, projected {:.3f}s at n={}.'.format(best.name, best.predict(max_n), max_n), file=out)
+  return fits
+
+def generate(gen_path, seed, n, input_path):
+  '''Runs a generator, writing its output to `input_path`.'''
+  result = run_solution(gen_path, args=[str(seed), str(n)])
+  if result.returncode:
+    raise RuntimeError('Generator failed for n={}:\n{}'.format(n, result.stderr.decode(errors='replace')))
+  Path(input_path).write_bytes(result.stdout)
+
+def time_solution(main_path, input_path, repeats):
+  '''Returns the fastest wall time of `repeats` runs.'''
+  best = float('inf')
+  for _ in range(repeats):
+    result = run_solution(main_path, input_path)
+    if result.returncode:
+      raise RuntimeError('Solution failed:\n{}'.format(result.stderr.decode(errors='replace')))
+    best = min(best, result.wall)
+  return best
+
+def fit(sizes, times):
+  '''Fits the times to every complexity class.
+
+  Returns:
+    A list of Fit instances, best first.
+
+  '''
+  fits = [Fit(name, f, sizes, times) for name, f in CLASSES]
+  best = fits[0]
+  for f in fits[1:]:
+    if f.error < best.error * TIE_FACTOR:
+      best = f
+  return [best] + sorted((f for f in fits if f is not best), key=lambda f: f.error)
+
+
+class Fit:
+  '''A least squares fit of `time = a + b * f(n)`.
+
+  The squared errors are relative to the measured times, so that the small
+  sizes matter as much as the large ones. If the best `b` is negative the
+  class doesn't fit at all, and `b` is clamped to zero.
+
+  Args:
+    name (str): The name of the complexity class.
+    f (function): The class's growth function.
+    sizes (list): The input sizes.
+    times (list): The measured times.
+
+  Attributes:
+    name (str): The name of the complexity class.
+    a (float): The constant term, in seconds.
+    b (float): The coefficient of `f(n)`.
+    error (float): Root mean square relative error.
+
+  '''
+
+  def __init__(self, name, f, sizes, times):
+    self.name = name
+    self._f   = f
+    xs = [f(n) for n in sizes]
+    ws = [1 / (t * t) for t in times]
+    sw = sum(ws)
+    sx = sum(w * x for w, x in zip(ws, xs))
+    sy = sum(w * y for w, y in zip(ws, times))
+    sxx = sum(w * x * x for w, x in zip(ws, xs))
+    sxy = sum(w * x * y for w, x, y in zip(ws, xs, times))
+    det = sw * sxx - sx * sx
+    b = (sw * sxy - sx * sy) / det if det > 1e-12 * sw * sxx else 0.0
+    if b < 0:
+      b = 0.0
+    self.a = (sy - b * sx) / sw
+    self.b = b
+    self.error = math.sqrt(sum(((self.predict(n) - t) / t) ** 2 for n, t in zip(sizes, times)) / len(sizes))
+
+  def predict(self, n):
+    return self.a + self.b * self._f(n)
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+'''Checker benchmark.
+
+Compares a generated output of `Case #i:` lines of floats with a copy of itself,
+and with a copy whose floats all differ in the last digits (within tolerance),
+using `checker.py` and the naive check of splitting both files in memory and
+comparing token by token. Each check runs in a forked child, so that its peak
+RSS can be reported.
+
+Example::
+
+  $ python3 benchmarks/bench_checker.py
+
+  $ python3 benchmarks/bench_checker.py -s 500
+
+'''
+
+import os, random, sys, tempfile, time
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.resolve().parent))
+
+from checker import check, close
+
+def main(argv):
+  try:
+    opts, args = getopt(argv, 'hs:')
+  except GetoptError:
+    print_usage()
+  if args:
+    print_usage()
+  size = 100
+  for opt, arg in opts:
+    if opt == '-h':
+      print_usage(err=False)
+    elif opt == '-s':
+      size = int(arg)
+  with tempfile.TemporaryDirectory() as tmp:
+    expected, same, close = Path(tmp) / 'expected', Path(tmp) / 'same', Path(tmp) / 'close'
+    write_outputs(size << 20, expected, close)
+    os.link(str(expected), str(same))
+    mb = expected.stat().st_size / 1e6
+    print('{:.0f} MB of output.'.format(mb))
+    print('{:<26} {:>9} {:>10} {:>11}'.format('', 'time', 'MB/s', 'peak RSS'))
+    for name, output in (('identical', same), ('within tolerance', close)):
+      for method, f in (('naive', naive_check), ('checker', checker_check)):
+        seconds, rss = measure(f, output, expected)
+        print('{:<26} {:>8.2f}s {:>10.1f} {:>8.0f}MiB'.format('{} {}'.format(method, name), seconds, mb / seconds,
+                                                              rss / 1024))
+
+def print_usage(err=True):
+  print('usage: bench_checker.py [-h] [-s <MB>]')
+  sys.exit(1 if err else 0)
+
+def write_outputs(size, expected_path, close_path):
+  '''Writes lines of ten floats, and the same floats off by about 1e-9.'''
+  rng = random.Random(0)
+  written, case = 0, 1
+  with open(str(expected_path), 'wb') as expected, open(str(close_path), 'wb') as close:
+    while written < size:
+      values = [rng.uniform(0, 1000) for _ in range(10)]
+      line = 'Case #{}: {}\n'.format(case, ' '.join('{:.9f}'.format(v) for v in values)).encode()
+      expected.write(line)
+      close.write('Case #{}: {}\n'.format(case, ' '.join('{:.9f}'.format(v + 1e-9) for v in values)).encode())
+      written += len(line)
+      case += 1
+
+def naive_check(output, expected):
+  got, want = Path(output).read_bytes().split(), Path(expected).read_bytes().split()
+  return len(got) == len(want) and all(x == y or close(x, y) for x, y in zip(got, want))
+
+def checker_check(output, expected):
+  return check(output, expected).passed
+
+def measure(f, output, expected):
+  '''Runs `f` in a forked child, returning its wall time and peak RSS in KiB.'''
+  start = time.perf_counter()
+  pid = os.fork()
+  if pid == 0:
+    os._exit(0 if f(output, expected) else 1)
+  _, status, usage = os.wait4(pid, 0)
+  if os.waitstatus_to_exitcode(status):
+    raise RuntimeError('{} failed.'.format(f.__name__))
+  return time.perf_counter() - start, usage.ru_maxrss
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
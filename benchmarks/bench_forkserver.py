@@ -0,0 +1,77 @@
+#!/usr/bin/python
+'''Fork server benchmark.
+
+Measures the cost of one run of a solution on a tiny input, started as a new
+interpreter by `problems.run_solution` and forked from a warm interpreter by
+`forkserver.ForkServer`. The solutions are `templates/template.py` itself, which
+only imports `sys`, and the template with the imports a heavier solution might
+have, where the saving also covers the imports.
+
+Example::
+
+  $ python3 benchmarks/bench_forkserver.py
+
+  $ python3 benchmarks/bench_forkserver.py -n 500
+
+'''
+
+import sys, tempfile, time
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+BENCHMARKS_PATH = Path(__file__).parent.resolve()
+sys.path.insert(0, str(BENCHMARKS_PATH.parent))
+
+from forkserver import ForkServer
+from problems import run_solution
+
+TEMPLATE_PATH = BENCHMARKS_PATH.parent / 'templates' / 'template.py'
+
+# Imports added to the template for the heavier solution.
+IMPORTS = '''import bisect, collections, decimal, fractions, functools, heapq, itertools, math, re, statistics
+from dataclasses import dataclass
+from typing import List
+'''
+
+def main(argv):
+  try:
+    opts, args = getopt(argv, 'hn:')
+  except GetoptError:
+    print_usage()
+  if args:
+    print_usage()
+  runs = 200
+  for opt, arg in opts:
+    if opt == '-h':
+      print_usage(err=False)
+    elif opt == '-n':
+      runs = int(arg)
+  with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    (tmp / 'template.py').write_text(TEMPLATE_PATH.read_text())
+    (tmp / 'imports.py').write_text(IMPORTS + TEMPLATE_PATH.read_text())
+    input_path = tmp / 'tests.in'
+    input_path.write_text('3\n1 2\n3 4\n5 6\n')
+    print('{:<10} {:>12} {:>12} {:>8}'.format('', 'new process', 'fork server', 'speedup'))
+    for name in ('template', 'imports'):
+      main_path = tmp / (name + '.py')
+      cold = per_run(lambda: run_solution(main_path, input_path), runs)
+      with ForkServer(main_path) as server:
+        warm = per_run(lambda: server.run(input_path), runs)
+      print('{:<10} {:>10.2f}ms {:>10.2f}ms {:>7.1f}x'.format(name, cold * 1e3, warm * 1e3, cold / warm))
+
+def print_usage(err=True):
+  print('usage: bench_forkserver.py [-h] [-n <runs>]')
+  sys.exit(1 if err else 0)
+
+def per_run(run, runs):
+  '''Returns the mean wall time of `runs` calls to `run`, checking each one.'''
+  start = time.perf_counter()
+  for _ in range(runs):
+    result = run()
+    if result.returncode or not result.stdout.startswith(b'Case #1: 3'):
+      raise RuntimeError('Bad run:\n{}'.format(result.stderr.decode(errors='replace')))
+  return (time.perf_counter() - start) / runs
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+'''Generator benchmark.
+
+Times `templates/generator.py` writing T test cases of n random integers each,
+the default `write_case`, against a generator written the usual way, with
+`random.randint` and `print` per test case. Both write to a file, and the
+sizes are checked to match. The generator uses NumPy if the Python running
+this benchmark has it.
+
+Example::
+
+  $ python3 benchmarks/bench_generator.py
+
+  $ python3 benchmarks/bench_generator.py -n 100000 -t 100
+
+'''
+
+import subprocess, sys, tempfile, time
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+BENCHMARKS_PATH = Path(__file__).parent.resolve()
+GENERATOR_PATH = BENCHMARKS_PATH.parent / 'templates' / 'generator.py'
+
+NAIVE = '''import random, sys
+random.seed(int(sys.argv[1]))
+n, T = int(sys.argv[2]), int(sys.argv[3])
+print(T)
+for _ in range(T):
+  print(n)
+  print(" ".join(str(random.randint(1, 10 ** 9)) for _ in range(n)))
+'''
+
+def main(argv):
+  try:
+    opts, args = getopt(argv, 'hn:t:')
+  except GetoptError:
+    print_usage()
+  if args:
+    print_usage()
+  n, cases = 1000000, 20
+  for opt, arg in opts:
+    if opt == '-h':
+      print_usage(err=False)
+    elif opt == '-n':
+      n = int(arg)
+    elif opt == '-t':
+      cases = int(arg)
+  with tempfile.TemporaryDirectory() as tmp:
+    tmp = Path(tmp)
+    naive_path = tmp / 'naive.py'
+    naive_path.write_text(NAIVE)
+    print('{:<10} {:>9} {:>9} {:>10}'.format('', 'seconds', 'MB', 'MB/s'))
+    sizes = []
+    for name, path in (('naive', naive_path), ('generator', GENERATOR_PATH)):
+      output_path = tmp / (name + '.in')
+      seconds = generate(path, output_path, n, cases)
+      size = output_path.stat().st_size
+      sizes.append(size)
+      print('{:<10} {:>9.2f} {:>9.1f} {:>10.1f}'.format(name, seconds, size / 1e6, size / 1e6 / seconds))
+    # Random numbers have the same number of digits on average, not exactly.
+    if abs(sizes[0] - sizes[1]) > sizes[0] / 100:
+      raise RuntimeError('The outputs differ in size: {} and {} bytes.'.format(*sizes))
+
+def print_usage(err=True):
+  print('usage: bench_generator.py [-h] [-n <numbers per case>] [-t <cases>]')
+  sys.exit(1 if err else 0)
+
+def generate(path, output_path, n, cases):
+  '''Runs a generator with seed 1 into `output_path`, returning the wall time.'''
+  with open(str(output_path), 'wb') as output:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, str(path), '1', str(n), str(cases)], stdout=output, check=True)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+'''Interactive template I/O benchmark.
+
+Measures queries per second of `templates/interactive-template.py` and of the
+original template, which printed str lists, flushed with `sys.stdout.flush()`
+and read responses with `input()`, each playing `heavy_ball_judge.py` over
+pipes. Small ball counts keep the weighings cheap, so the rate is mostly the
+cost of an exchange.
+
+Example::
+
+  $ python3 benchmarks/bench_interactive_io.py
+
+  $ python3 benchmarks/bench_interactive_io.py -t 50000 -k 2 -r 5
+
+'''
+
+import subprocess, sys, tempfile, time
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+BENCHMARKS_PATH = Path(__file__).parent.resolve()
+TEMPLATE_PATH = BENCHMARKS_PATH.parent / 'templates' / 'interactive-template.py'
+JUDGE_PATH = BENCHMARKS_PATH / 'heavy_ball_judge.py'
+
+# The interactive template before the I/O helpers were added.
+PRINT_INPUT = '''import sys
+
+def solve(balls, guesses):
+  start, end = 0, balls
+  while end - start > 1:
+    third = (end - start) // 3
+    left = [str(x) for x in range(start, start + third)]
+    right = [str(x) for x in range(start + third, start + 2 * third)]
+    print(" ".join(left) + " # " + " ".join(right))
+    sys.stdout.flush()
+    s = input()
+    if s == "-1":
+      print("Something went wrong.")
+      sys.exit()
+    elif s == "r":
+      start = start + third
+    elif s == "b":
+      start = start + 2 * third
+    end = start + third
+  return start
+
+def main():
+  T = int(input())
+  for _ in range(T):
+    balls, guesses = map(int, input().split())
+    heavy = solve(balls, guesses)
+    print(heavy)
+    sys.stdout.flush()
+    s = input()
+    if s == "-1":
+      print("Wrong answer.")
+      sys.exit()
+
+
+if __name__ == "__main__":
+  main()
+'''
+
+def main(argv):
+  try:
+    opts, args = getopt(argv, 'ht:k:r:')
+  except GetoptError:
+    print_usage()
+  if args:
+    print_usage()
+  cases, max_exponent, repeats = 20000, 3, 3
+  for opt, arg in opts:
+    if opt == '-h':
+      print_usage(err=False)
+    elif opt == '-t':
+      cases = int(arg)
+    elif opt == '-k':
+      max_exponent = int(arg)
+    elif opt == '-r':
+      repeats = int(arg)
+  with tempfile.TemporaryDirectory() as tmp:
+    baseline = Path(tmp) / 'baseline.py'
+    baseline.write_text(PRINT_INPUT)
+    print('{:<14} {:>9} {:>9} {:>12}'.format('', 'queries', 'time', 'queries/s'))
+    rates = []
+    for name, solution in (('print/input', baseline), ('template', TEMPLATE_PATH)):
+      queries, seconds = best_run(solution, cases, max_exponent, repeats)
+      rates.append(queries / seconds)
+      print('{:<14} {:>9} {:>8.3f}s {:>12.0f}'.format(name, queries, seconds, rates[-1]))
+    print('Speedup {:.2f}x.'.format(rates[1] / rates[0]))
+
+def print_usage(err=True):
+  print('usage: bench_interactive_io.py [-h] [-t <cases>] [-k <max exponent>] [-r <repeats>]')
+  sys.exit(1 if err else 0)
+
+def play(solution, cases, max_exponent, seed=0):
+  '''Plays one game over pipes, returning the number of queries and the wall time.'''
+  start = time.perf_counter()
+  judge = subprocess.Popen([sys.executable, str(JUDGE_PATH), str(seed), str(cases), str(max_exponent)],
+                           stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+  sol = subprocess.Popen([sys.executable, str(solution)], stdin=judge.stdout, stdout=judge.stdin)
+  # Only the two programs should hold the pipes, so that each sees the other exit.
+  judge.stdin.close()
+  judge.stdout.close()
+  sol.wait()
+  report = judge.stderr.read().decode()
+  judge.stderr.close()
+  if judge.wait():
+    raise RuntimeError('{} failed: {}'.format(solution, report.strip()))
+  return int(report.split()[0]), time.perf_counter() - start
+
+def best_run(solution, cases, max_exponent, repeats):
+  best = None
+  for _ in range(repeats):
+    queries, seconds = play(solution, cases, max_exponent)
+    if best is None or seconds < best[1]:
+      best = queries, seconds
+  return best
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
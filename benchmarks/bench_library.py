@@ -0,0 +1,229 @@
+#!/usr/bin/python
+'''Library benchmark.
+
+Times each data structure in `templates/library` against the naive version
+people write under time pressure, on n random operations:
+
+  fenwick: Prefix sums by summing a slice of a list.
+  segment_tree: Range minimums by `min` over a slice of a list.
+  union_find: Parent pointers without path compression or union by size.
+  trie: The same trie with plain node objects, which also shows the memory
+    saved by `__slots__`.
+  int_heap: `heapq` with (key, value) tuples, on 10n operations.
+
+Example::
+
+  $ python3 benchmarks/bench_library.py
+
+  $ python3 benchmarks/bench_library.py -n 100000 -r 5
+
+'''
+
+import heapq, random, sys, time, tracemalloc
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.resolve().parent / 'templates' / 'library'))
+
+from fenwick import Fenwick
+from int_heap import IntHeap
+from segment_tree import SegmentTree
+from trie import Trie
+from union_find import UnionFind
+
+def main(argv):
+  try:
+    opts, args = getopt(argv, 'hn:r:')
+  except GetoptError:
+    print_usage()
+  if args:
+    print_usage()
+  n, repeats = 20000, 3
+  for opt, arg in opts:
+    if opt == '-h':
+      print_usage(err=False)
+    elif opt == '-n':
+      n = int(float(arg))
+    elif opt == '-r':
+      repeats = int(arg)
+  print('{:<14} {:>10} {:>10} {:>8}'.format('n={}'.format(n), 'naive', 'library', 'speedup'))
+  for name, naive, fast in BENCHMARKS:
+    rng = random.Random(0)
+    data = SETUPS[name](rng, n)
+    slow_time = best_time(naive, data, repeats)
+    fast_time = best_time(fast, data, repeats)
+    print('{:<14} {:>9.3f}s {:>9.3f}s {:>7.1f}x'.format(name, slow_time, fast_time, slow_time / fast_time))
+  words = SETUPS['trie'](random.Random(0), n)[0]
+  slow, fast = traced_size(PlainTrie, words), traced_size(Trie, words)
+  print('Trie memory: {:.1f} MB with plain nodes, {:.1f} MB with __slots__ nodes.'.format(slow / 1e6, fast / 1e6))
+
+def print_usage(err=True):
+  print('usage: bench_library.py [-h] [-n <operations>] [-r <repeats>]')
+  sys.exit(1 if err else 0)
+
+def best_time(f, data, repeats):
+  best = float('inf')
+  for _ in range(repeats):
+    start = time.perf_counter()
+    f(*data)
+    best = min(best, time.perf_counter() - start)
+  return best
+
+def traced_size(trie_class, words):
+  tracemalloc.start()
+  trie = trie_class(words)
+  size, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del trie
+  return size
+
+#
+# Inputs: each is a tuple of arguments for both versions.
+
+def updates_and_ranges(rng, n):
+  values = [rng.randrange(10 ** 6) for _ in range(n)]
+  ops = []
+  for _ in range(n):
+    lo, hi = sorted(rng.sample(range(n + 1), 2))
+    ops.append((rng.randrange(n), rng.randrange(10 ** 6), lo, hi))
+  return values, ops
+
+def unions(rng, n):
+  pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(n)]
+  queries = [(rng.randrange(n), rng.randrange(n)) for _ in range(n)]
+  return n, pairs, queries
+
+def words(rng, n):
+  alphabet = 'abcd'
+  words = [''.join(rng.choice(alphabet) for _ in range(rng.randint(5, 15))) for _ in range(n)]
+  prefixes = [w[:rng.randint(1, 4)] for w in rng.sample(words, min(n, 1000))]
+  return words, prefixes
+
+def heap_ops(rng, n):
+  # Heap operations are cheap, so there are more of them.
+  return [(rng.randrange(10 ** 9), rng.randrange(n)) for _ in range(10 * n)],
+
+SETUPS = {'fenwick': updates_and_ranges, 'segment_tree': updates_and_ranges, 'union_find': unions,
+          'trie': words, 'int_heap': heap_ops}
+
+#
+# Naive and library versions.
+
+def naive_fenwick(values, ops):
+  values = list(values)
+  total = 0
+  for i, delta, lo, hi in ops:
+    values[i] += delta
+    total += sum(values[lo:hi])
+  return total
+
+def fast_fenwick(values, ops):
+  tree = Fenwick(values)
+  total = 0
+  for i, delta, lo, hi in ops:
+    tree.add(i, delta)
+    total += tree.range_sum(lo, hi)
+  return total
+
+def naive_segment_tree(values, ops):
+  values = list(values)
+  total = 0
+  for i, value, lo, hi in ops:
+    values[i] = value
+    if lo < hi:
+      total += min(values[lo:hi])
+  return total
+
+def fast_segment_tree(values, ops):
+  tree = SegmentTree(values, min, float('inf'))
+  total = 0
+  for i, value, lo, hi in ops:
+    tree.update(i, value)
+    if lo < hi:
+      total += tree.query(lo, hi)
+  return total
+
+def naive_union_find(n, pairs, queries):
+  parent = list(range(n))
+  def find(x):
+    while parent[x] != x:
+      x = parent[x]
+    return x
+  for a, b in pairs:
+    a, b = find(a), find(b)
+    if a != b:
+      parent[a] = b
+  return sum(find(a) == find(b) for a, b in queries)
+
+def fast_union_find(n, pairs, queries):
+  uf = UnionFind(n)
+  for a, b in pairs:
+    uf.union(a, b)
+  return sum(uf.same(a, b) for a, b in queries)
+
+
+class PlainNode:
+  def __init__(self):
+    self.children = {}
+    self.count = 0
+    self.end = 0
+
+
+class PlainTrie(Trie):
+  '''The library trie with nodes that have a `__dict__`.'''
+
+  __slots__ = ()
+
+  def __init__(self, words=()):
+    self.root = PlainNode()
+    for word in words:
+      self.insert(word)
+
+  def insert(self, word):
+    node = self.root
+    node.count += 1
+    for c in word:
+      child = node.children.get(c)
+      if child is None:
+        child = node.children[c] = PlainNode()
+      node = child
+      node.count += 1
+    node.end += 1
+
+def naive_trie(words, prefixes):
+  return sum(sum(w.startswith(p) for w in words) for p in prefixes)
+
+def fast_trie(words, prefixes):
+  trie = Trie(words)
+  return sum(trie.count_prefix(p) for p in prefixes)
+
+def naive_int_heap(items):
+  heap = []
+  for key, value in items:
+    heapq.heappush(heap, (key, value))
+  total = 0
+  while heap:
+    key, value = heapq.heappop(heap)
+    total += value
+  return total
+
+def fast_int_heap(items):
+  heap = IntHeap()
+  for key, value in items:
+    heap.push(key, value)
+  total = 0
+  while heap:
+    key, value = heap.pop()
+    total += value
+  return total
+
+BENCHMARKS = [
+  ('fenwick',      naive_fenwick,      fast_fenwick),
+  ('segment_tree', naive_segment_tree, fast_segment_tree),
+  ('union_find',   naive_union_find,   fast_union_find),
+  ('trie',         naive_trie,         fast_trie),
+  ('int_heap',     naive_int_heap,     fast_int_heap),
+]
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
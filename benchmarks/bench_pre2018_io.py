@@ -0,0 +1,107 @@
+#!/usr/bin/python
+'''Pre-2018 template I/O benchmark.
+
+Compares the streaming I/O in `templates/pre2018-template.py` with the original
+template, which read the input file with `readline()` and wrote each result
+unbuffered by hand, on a generated large dataset. Both solve the same trivial
+problem, so the throughput is almost entirely I/O overhead.
+
+The input is a block of random test cases repeated up to the requested size,
+500 MB by default, so make sure there is room for it in the temp folder.
+
+Example::
+
+  $ python3 benchmarks/bench_pre2018_io.py
+
+  $ python3 benchmarks/bench_pre2018_io.py -s 50 -r 3
+
+'''
+
+import random, subprocess, sys, tempfile, time
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+TEMPLATE_PATH = Path(__file__).parent.resolve().parent / 'templates' / 'pre2018-template.py'
+
+MB = 10 ** 6
+
+# The pre-2018 template before streaming was added.
+READLINE = '''FILENAME = "tests"
+
+def main():
+  with open(FILENAME + ".in") as in_file, open(FILENAME + ".out", 'w') as out_file:
+    T = int(read(in_file))
+    for i in range(1, T + 1):
+      n, m = [int(s) for s in read(in_file).split(" ")]
+      result = solve_problem(n, m)
+      out_file.write("Case #{}: {}".format(i, result))
+
+def read(in_file):
+  return in_file.readline().strip()
+
+def solve_problem(a, b):
+  return a + b
+
+
+if __name__ == "__main__":
+  main()
+'''
+
+def main(argv):
+  try:
+    opts, args = getopt(argv, 'hs:r:')
+  except GetoptError:
+    print_usage()
+  if args:
+    print_usage()
+  size, repeats = 500, 1
+  for opt, arg in opts:
+    if opt == '-h':
+      print_usage(err=False)
+    elif opt == '-s':
+      size = float(arg)
+    elif opt == '-r':
+      repeats = int(arg)
+  with tempfile.TemporaryDirectory() as tmp:
+    input_path = Path(tmp) / 'tests.in'
+    T = write_input(input_path, int(size * MB))
+    megabytes = input_path.stat().st_size / MB
+    print('Input: {} test cases, {:.0f} MB.'.format(T, megabytes))
+    print('{:<10} {:>10} {:>10}'.format('', 'time', 'MB/s'))
+    times = []
+    for name, source in (('readline', READLINE), ('streaming', TEMPLATE_PATH.read_text())):
+      folder = Path(tmp) / name
+      folder.mkdir()
+      (folder / 'main.py').write_text(source)
+      (folder / 'tests.in').symlink_to(input_path)
+      times.append(best_time(folder, repeats))
+      print('{:<10} {:>9.2f}s {:>10.1f}'.format(name, times[-1], megabytes / times[-1]))
+    print('Speedup {:.1f}x.'.format(times[0] / times[1]))
+
+def print_usage(err=True):
+  print('usage: bench_pre2018_io.py [-h] [-s <MB>] [-r <repeats>]')
+  sys.exit(1 if err else 0)
+
+def write_input(path, size, seed=0):
+  '''Writes at least `size` bytes of test cases to `path`, returning T.'''
+  rng = random.Random(seed)
+  block = ''.join('{} {}\n'.format(rng.randrange(10 ** 9), rng.randrange(10 ** 9)) for _ in range(50000)).encode()
+  count = max(1, -(-size // len(block)))
+  T = count * block.count(b'\n')
+  with open(str(path), 'wb') as f:
+    f.write('{}\n'.format(T).encode())
+    for _ in range(count):
+      f.write(block)
+  return T
+
+def best_time(folder, repeats):
+  '''Returns the fastest of `repeats` runs of the solution in `folder`.'''
+  best = float('inf')
+  for _ in range(repeats):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, 'main.py'], cwd=str(folder), check=True)
+    best = min(best, time.perf_counter() - start)
+  return best
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
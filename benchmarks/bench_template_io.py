@@ -0,0 +1,81 @@
+#!/usr/bin/python
+'''Template I/O benchmark.
+
+Compares the bulk I/O in `templates/template.py` with the original template,
+which called `input()` and `print()` once per test case. Both solve the same
+trivial problem, so the times are almost entirely I/O overhead.
+
+Example::
+
+  $ python3 benchmarks/bench_template_io.py
+
+  $ python3 benchmarks/bench_template_io.py -r 5 100000 1000000
+
+'''
+
+import random, subprocess, sys, tempfile, time
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+TEMPLATE_PATH = Path(__file__).parent.resolve().parent / 'templates' / 'template.py'
+
+# The standard template before bulk I/O was added.
+LINE_BY_LINE = '''
+def main():
+  T = int(input())
+  for i in range(1, T + 1):
+    n, m = [int(s) for s in input().split(" ")]
+    result = solve_problem(n, m)
+    print("Case #{}: {}".format(i, result))
+
+def solve_problem(a, b):
+  return a + b
+
+if __name__ == "__main__":
+  main()
+'''
+
+def main(argv):
+  try:
+    opts, args = getopt(argv, 'hr:')
+  except GetoptError:
+    print_usage()
+  repeats = 3
+  for opt, arg in opts:
+    if opt == '-h':
+      print_usage(err=False)
+    elif opt == '-r':
+      repeats = int(arg)
+  sizes = [int(a) for a in args] or [10 ** 5, 10 ** 6]
+  with tempfile.TemporaryDirectory() as tmp:
+    baseline = Path(tmp) / 'baseline.py'
+    baseline.write_text(LINE_BY_LINE)
+    print('{:>9} {:>12} {:>12} {:>8}'.format('T', 'input()', 'bulk', 'speedup'))
+    for T in sizes:
+      input_path = Path(tmp) / 'tests.in'
+      write_input(input_path, T)
+      slow = best_time(baseline, input_path, repeats)
+      fast = best_time(TEMPLATE_PATH, input_path, repeats)
+      print('{:>9} {:>11.3f}s {:>11.3f}s {:>7.1f}x'.format(T, slow, fast, slow / fast))
+
+def print_usage(err=True):
+  print('usage: bench_template_io.py [-h] [-r <repeats>] [<T> ...]')
+  sys.exit(1 if err else 0)
+
+def write_input(path, T, seed=0):
+  rng = random.Random(seed)
+  lines = ['{} {}'.format(rng.randrange(10 ** 9), rng.randrange(10 ** 9)) for _ in range(T)]
+  path.write_text('{}\n{}\n'.format(T, '\n'.join(lines)))
+
+def best_time(solution, input_path, repeats):
+  '''Returns the fastest of `repeats` runs of `solution` on `input_path`.'''
+  best = float('inf')
+  for _ in range(repeats):
+    with open(str(input_path), 'rb') as stdin:
+      start = time.perf_counter()
+      subprocess.run([sys.executable, str(solution)], stdin=stdin, stdout=subprocess.DEVNULL, check=True)
+      best = min(best, time.perf_counter() - start)
+  return best
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
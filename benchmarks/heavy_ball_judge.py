@@ -0,0 +1,108 @@
+#!/usr/bin/python
+'''Heavy ball judge.
+
+A local judge for the "Find The Heavy Ball" problem solved by
+`templates/interactive-template.py`. It sends T, then for each test case the
+number of balls (a power of 3) and a guess limit, answers weighings with l, r
+or b, and answers the final guess with 1 or -1.
+
+The judge is a class, so it can be driven in-process by anything with
+`readline` and `write`/`flush` methods over bytes, or run as a program talking
+over stdin and stdout::
+
+  $ python3 benchmarks/heavy_ball_judge.py <seed> [<T> [<max exponent>]]
+
+As a program it exits with code 1 if the solution was wrong, and writes the
+number of queries it answered to stderr.
+'''
+
+import random, sys
+
+
+class Judge:
+  '''One game of the heavy ball problem.
+
+  Args:
+    seed (int): Seeds the ball counts and the heavy balls.
+    cases (int): The number of test cases, T.
+    max_exponent (int): Each case has 3**k balls, with k from 1 to this.
+
+  Attributes:
+    queries (int): The number of weighings and guesses answered so far.
+    error (str): Why the solution was judged wrong, or None.
+
+  '''
+
+  def __init__(self, seed=0, cases=3, max_exponent=5):
+    self.queries       = 0
+    self.error         = None
+    self._rng          = random.Random(seed)
+    self._cases        = cases
+    self._max_exponent = max_exponent
+
+  def run(self, infile, outfile):
+    '''Plays the game, reading the solution from `infile` and answering on `outfile`.
+
+    Returns:
+      True if the solution found every heavy ball.
+
+    '''
+    def send(line):
+      outfile.write(line)
+      outfile.flush()
+    send(b'%d\n' % self._cases)
+    for _ in range(self._cases):
+      k = self._rng.randint(1, self._max_exponent)
+      n, heavy = 3 ** k, self._rng.randrange(3 ** k)
+      send(b'%d %d\n' % (n, k))
+      guesses = 0
+      while True:
+        line = infile.readline()
+        self.queries += 1
+        if not line:
+          return self._fail(send, 'the solution closed its output')
+        if b'#' not in line:
+          break
+        guesses += 1
+        if guesses > k:
+          return self._fail(send, 'too many weighings')
+        left, right = line.split(b'#')
+        # Only the two sides' sizes and the heavy ball's side matter.
+        in_left, in_right = _contains(left, heavy), _contains(right, heavy)
+        send(b'l\n' if in_left else b'r\n' if in_right else b'b\n')
+      try:
+        guess = int(line)
+      except ValueError:
+        return self._fail(send, 'malformed guess {!r}'.format(line))
+      if guess != heavy:
+        return self._fail(send, 'guessed {} instead of {}'.format(guess, heavy))
+      send(b'1\n')
+    return True
+
+  def _fail(self, send, error):
+    self.error = error
+    try:
+      send(b'-1\n')
+    except (BrokenPipeError, ValueError):
+      pass
+    return False
+
+def _contains(side, ball):
+  token = str(ball).encode()
+  return token in side.split()
+
+def main(argv):
+  if not argv or len(argv) > 3:
+    print('usage: heavy_ball_judge.py <seed> [<T> [<max exponent>]]', file=sys.stderr)
+    sys.exit(2)
+  judge = Judge(*map(int, argv))
+  try:
+    correct = judge.run(sys.stdin.buffer, sys.stdout.buffer)
+  except BrokenPipeError:
+    correct = False
+    judge.error = 'the solution closed its input'
+  print('{} queries{}'.format(judge.queries, '' if correct else ', wrong: {}'.format(judge.error)), file=sys.stderr)
+  sys.exit(0 if correct else 1)
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,184 @@
+'''Build Cache module.
+
+Compiles solutions written in compiled languages once, and keeps the builds in
+a size-capped cache so that an unchanged `main.cpp` starts straight away on
+every later run.
+
+The language is picked by the source's extension (see `LANGUAGES`). Each build
+is keyed on a SHA-256 hash of the compiler's path, the compiler command with
+its flags, and the source. Builds are files (or folders, for Java) named by
+their key in `~/.cache/codejam-practice/builds`, or below `$XDG_CACHE_HOME` if
+it is set. `templates/interactive_runner.py` keeps its builds in the same
+folder under the same keys, so a binary built by either is reused by the other.
+Using a build updates its modification time, and once the cache holds more
+than its size cap the least recently used builds are deleted.
+
+Sources which include other files, such as a local header, aren't rebuilt when
+only those files change.
+'''
+
+import hashlib, os, shutil, subprocess, sys, tempfile
+from pathlib import Path
+
+CACHE_PATH = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'codejam-practice' / 'builds'
+
+# The default size cap, in bytes.
+MAX_BYTES = 256 << 20
+
+# Compiler commands by source extension. Extra flags go before the output
+# option, and `{source}` and `{binary}` are replaced by the paths.
+LANGUAGES = {
+  '.c':    ['gcc', '-std=c11', '-O2', '-o', '{binary}', '{source}', '-lm'],
+  '.cc':   ['g++', '-std=c++17', '-O2', '-o', '{binary}', '{source}'],
+  '.cpp':  ['g++', '-std=c++17', '-O2', '-o', '{binary}', '{source}'],
+  '.go':   ['go', 'build', '-o', '{binary}', '{source}'],
+  '.java': ['javac', '-d', '{binary}', '{source}'],
+  '.rs':   ['rustc', '-O', '-o', '{binary}', '{source}'],
+}
+
+def solution_command(source, flags=(), cache=None):
+  '''Returns the command line that runs a solution, building it first if needed.
+
+  Args:
+    source (Path): A Python file, or a source file in one of the `LANGUAGES`.
+    flags (list): Extra compiler flags.
+    cache (BuildCache): The cache to build in. Defaults to the shared one.
+
+  Raises:
+    ValueError: If the extension isn't Python or one of the `LANGUAGES`.
+    CompileError: If the compiler is missing or fails.
+
+  '''
+  source = Path(source)
+  if source.suffix == '.py':
+    return [sys.executable, str(source)]
+  build, _ = (cache or BuildCache()).build(source, flags)
+  return run_command(source, build)
+
+def run_command(source, build):
+  '''Returns the command line that runs the build of `source`.'''
+  if Path(source).suffix == '.java':
+    # Java needs the file to be named after its public class.
+    return ['java', '-cp', str(build), Path(source).stem]
+  return [str(build)]
+
+def compile_command(suffix, flags=()):
+  '''Returns the compiler command for an extension, with `flags` added.
+
+  Raises:
+    ValueError: If the extension isn't one of the `LANGUAGES`.
+
+  '''
+  if suffix not in LANGUAGES:
+    raise ValueError('Unknown source extension {}, expected .py or one of {}.'.format(suffix, ', '.join(LANGUAGES)))
+  command = LANGUAGES[suffix]
+  i = command.index('{binary}') - 1
+  return command[:i] + list(flags) + command[i:]
+
+
+class CompileError(Exception):
+  '''CompileError is raised when a source can't be built.
+
+  Attributes:
+    output (str): What the compiler printed.
+
+  '''
+
+  def __init__(self, message, output=''):
+    super().__init__(message)
+    self.output = output
+
+
+class BuildCache:
+  '''BuildCache compiles sources into a folder of builds keyed by content hash.
+
+  Args:
+    path (Path): The cache folder. It is created when the first source is built.
+      Defaults to `CACHE_PATH`.
+    max_bytes (int): The size cap used by `evict`.
+
+  '''
+
+  def __init__(self, path=None, max_bytes=MAX_BYTES):
+    self.path      = Path(path or CACHE_PATH)
+    self.max_bytes = max_bytes
+
+  def key(self, source, command):
+    '''Returns the hex key for building `source` with a compiler command.'''
+    h = hashlib.sha256()
+    for part in [shutil.which(command[0]) or command[0]] + command:
+      h.update(part.encode())
+      h.update(b'\0')
+    h.update(Path(source).read_bytes())
+    return h.hexdigest()
+
+  def build(self, source, flags=()):
+    '''Builds `source` unless the cache already has it.
+
+    Returns:
+      The path of the build, and whether it came from the cache.
+
+    Raises:
+      ValueError: If the extension isn't one of the `LANGUAGES`.
+      CompileError: If the compiler is missing or fails.
+
+    '''
+    source = Path(source).resolve()
+    command = compile_command(source.suffix, flags)
+    compiler = shutil.which(command[0])
+    if compiler is None:
+      raise CompileError('Can\'t build {}: {} is not installed.'.format(source.name, command[0]))
+    build = self.path / self.key(source, command)
+    if build.exists():
+      os.utime(str(build))
+      return build, True
+    self.path.mkdir(parents=True, exist_ok=True)
+    # Compile into a temporary folder next to the builds, so that the finished
+    # build can be moved into place atomically.
+    with tempfile.TemporaryDirectory(dir=str(self.path), prefix='.build-') as tmp:
+      output = Path(tmp) / 'build'
+      if source.suffix == '.java':
+        output.mkdir()
+      args = [compiler] + [arg.replace('{source}', str(source)).replace('{binary}', str(output))
+                           for arg in command[1:]]
+      p = subprocess.run(args, cwd=tmp, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+      if p.returncode:
+        log = p.stdout.decode(errors='replace')
+        raise CompileError('{} failed to build {}:\n{}'.format(command[0], source.name, log.rstrip()), log)
+      try:
+        os.replace(str(output), str(build))
+      except OSError:
+        # Another process put the same build in place first.
+        pass
+    self.evict()
+    return build, False
+
+  def evict(self):
+    '''Deletes the least recently used builds until the cache fits in its size cap.
+
+    Returns:
+      The number of builds deleted.
+
+    '''
+    try:
+      builds = [p for p in self.path.iterdir() if not p.name.startswith('.')]
+    except FileNotFoundError:
+      return 0
+    builds = sorted((p.stat().st_mtime, _size(p), p) for p in builds)
+    total = sum(size for _, size, _ in builds)
+    deleted = 0
+    for _, size, p in builds:
+      if total <= self.max_bytes:
+        break
+      if p.is_dir():
+        shutil.rmtree(str(p), ignore_errors=True)
+      else:
+        p.unlink()
+      total -= size
+      deleted += 1
+    return deleted
+
+def _size(path):
+  if path.is_dir():
+    return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+  return path.stat().st_size
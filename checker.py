@@ -0,0 +1,345 @@
+#!/usr/bin/python
+'''Checker script.
+
+This script compares a solution's output with the expected output, test case by
+test case, without loading either into memory, so that outputs of hundreds of
+megabytes can be checked.
+
+Both files are read in chunks and split into whitespace separated tokens, so
+differences in spacing and line breaks are ignored. Tokens are compared in
+large blocks, and only blocks that differ are looked at token by token. An
+expected token with a decimal point or an exponent is a float, and the output's
+token matches it if it is within the absolute or the relative tolerance, as in
+Code Jam's "within an absolute or relative error of 10^-6". Other tokens must
+be identical, so large integers are compared exactly. If the files are
+identical byte for byte, as they usually are, none of this happens.
+
+After a mismatch the rest of that test case is skipped in both files, and the
+comparison starts again at the next `Case #` in each. Checking stops after `-k`
+mismatches, each shown with the tokens around it.
+
+Example::
+
+    $ python3 checker.py out.txt tests.out
+
+    $ python3 checker.py -a 1e-9 -r 0 -k 1 out.txt tests.out
+
+'''
+
+import math, re, sys
+from getopt import getopt, GetoptError
+from itertools import compress, repeat
+from operator import le, mul, ne, sub
+from pathlib import Path
+
+# Files are read this many bytes at a time.
+CHUNK_SIZE = 1 << 20
+
+# Tokens are compared this many at a time.
+BLOCK_SIZE = 1 << 14
+
+# Tokens shown on each side of a mismatch.
+CONTEXT = 3
+
+# The Code Jam tolerance for floating point answers.
+DEFAULT_TOLERANCE = 1e-6
+
+CASE = b'Case'
+
+# Expected tokens matching this are floats.
+FLOAT = re.compile(rb'[.eE]')
+
+def main(argv):
+  try:
+    opts = process_input(argv)
+    if opts == 'help':
+      print_usage(err=False)
+    result = check(**opts)
+  except Exception as e:
+    exit('{}'.format(e))
+  print(result)
+  exit('', err=not result.passed)
+
+def print_usage(err=True):
+  exit('usage: checker.py [-h] [-a <abs tol>] [-r <rel tol>] [-k <mismatches>] <output> <expected>', err=err)
+
+def exit(message, err=True):
+  if message:
+    print(message)
+  sys.exit(1 if err else 0)
+
+def process_input(argv):
+  try:
+    opts, args = getopt(argv, 'ha:r:k:', ['abs=', 'rel=', 'mismatches='])
+  except GetoptError:
+    print_usage()
+  result = {'abs_tol': DEFAULT_TOLERANCE, 'rel_tol': DEFAULT_TOLERANCE, 'max_mismatches': 5}
+  try:
+    for opt, arg in opts:
+      if opt == '-h':
+        return 'help'
+      elif opt in ('-a', '--abs'):
+        result['abs_tol'] = float(arg)
+      elif opt in ('-r', '--rel'):
+        result['rel_tol'] = float(arg)
+      elif opt in ('-k', '--mismatches'):
+        result['max_mismatches'] = int(arg)
+  except ValueError as e:
+    raise ValueError('Tolerances and mismatches must be numbers.') from e
+  if len(args) != 2:
+    print_usage()
+  result['output'], result['expected'] = Path(args[0]), Path(args[1])
+  return result
+
+def check(output, expected, abs_tol=DEFAULT_TOLERANCE, rel_tol=DEFAULT_TOLERANCE, max_mismatches=5):
+  '''Compares an output with the expected output.
+
+  Args:
+    output (Path): The solution's output, as a path or a binary file object.
+    expected (Path): The expected output, as a path or a binary file object.
+    abs_tol (float): The absolute tolerance for float tokens.
+    rel_tol (float): The relative tolerance for float tokens.
+    max_mismatches (int): Stop after this many mismatches.
+
+  Returns:
+    A CheckResult.
+
+  '''
+  with _open(output) as out, _open(expected) as exp:
+    if _identical(out, exp):
+      return CheckResult([])
+    out.seek(0)
+    exp.seek(0)
+    return _compare(_Tokens(out), _Tokens(exp), abs_tol, rel_tol, max_mismatches)
+
+def close(token, expected, abs_tol=DEFAULT_TOLERANCE, rel_tol=DEFAULT_TOLERANCE):
+  '''Whether a token matches an expected token, within the tolerance if that is a float.'''
+  if token == expected:
+    return True
+  if not FLOAT.search(expected):
+    return False
+  try:
+    return math.isclose(float(token), float(expected), rel_tol=rel_tol, abs_tol=abs_tol)
+  except ValueError:
+    return False
+
+def _open(f):
+  if hasattr(f, 'read'):
+    # The caller's file stays open.
+    return _Borrowed(f)
+  return open(str(f), 'rb')
+
+def _identical(out, exp):
+  while True:
+    a, b = out.read(CHUNK_SIZE), exp.read(CHUNK_SIZE)
+    if a != b:
+      return False
+    if not a:
+      return True
+
+def _compare(out, exp, abs_tol, rel_tol, max_mismatches):
+  mismatches = []
+  case = None
+  while len(mismatches) < max_mismatches:
+    a, b = out.peek(BLOCK_SIZE), exp.peek(BLOCK_SIZE)
+    if not a and not b:
+      break
+    if a == b or (len(a) == len(b) and _all_close(a, b, abs_tol, rel_tol)):
+      out.advance(len(a))
+      exp.advance(len(b))
+      case = _last_case(b, exp, case)
+      continue
+    for i in range(min(len(a), len(b))):
+      if a[i] == b[i] or close(a[i], b[i], abs_tol, rel_tol):
+        if b[i - 1:i] == [CASE]:
+          case = b[i].decode(errors='replace').rstrip(':')
+        continue
+      got, want = _case_number(a, i), _case_number(b, i)
+      if got is not None and want is not None:
+        # Different case numbers: a case is missing from the file that is
+        # ahead, so only the other file moves on to its next case.
+        case = b[i].decode(errors='replace').rstrip(':')
+        mismatches.append(Mismatch(case, _context(a, i), _context(b, i)))
+        out.advance(i - 1)
+        exp.advance(i - 1)
+        behind = out if got < want else exp
+        behind.advance(1)
+        behind.skip_to_case()
+      else:
+        mismatches.append(Mismatch(case, _context(a, i), _context(b, i)))
+        out.advance(i)
+        exp.advance(i)
+        out.skip_to_case()
+        exp.skip_to_case()
+      break
+    else:
+      n = min(len(a), len(b))
+      if len(a) == len(b):
+        # Tokens that are close but not equal.
+        out.advance(n)
+        exp.advance(n)
+        case = _last_case(b, exp, case)
+        continue
+      # One file ended before the other.
+      longer = a if len(a) > len(b) else b
+      context = ' '.join(t.decode(errors='replace') for t in longer[n:n + 2 * CONTEXT])
+      mismatches.append(Mismatch(case, context if longer is a else '(end of file)',
+                                 context if longer is b else '(end of file)'))
+      break
+  return CheckResult(mismatches, len(mismatches) >= max_mismatches and bool(out.peek(1) or exp.peek(1)))
+
+def _all_close(got, expected, abs_tol, rel_tol):
+  # `close` for whole blocks, with the loops in C: blocks of floats that all
+  # differ slightly would otherwise cost a Python call per token.
+  mask = list(map(ne, got, expected))
+  got, expected = list(compress(got, mask)), list(compress(expected, mask))
+  # Most floats have one decimal point, which is quicker to count. A token
+  # with more than one fails to parse below.
+  if b' '.join(expected).count(b'.') != len(expected) and not all(map(FLOAT.search, expected)):
+    return False
+  try:
+    xs, ys = list(map(float, got)), list(map(float, expected))
+  except ValueError:
+    return False
+  # NaN compares false and inf is within any relative tolerance of inf, so
+  # non-finite values are left to `math.isclose`, as in `close`.
+  if not all(map(math.isfinite, xs)) or not all(map(math.isfinite, ys)):
+    return all(math.isclose(x, y, rel_tol=rel_tol, abs_tol=abs_tol) for x, y in zip(xs, ys))
+  errors = list(map(abs, map(sub, xs, ys)))
+  if max(errors) <= abs_tol:
+    return True
+  bounds = map(max, repeat(abs_tol), map(mul, repeat(rel_tol), map(max, map(abs, xs), map(abs, ys))))
+  return all(map(le, errors, bounds))
+
+def _last_case(block, tokens, case):
+  # Updates the current case from the last `Case #i:` in a block of tokens.
+  try:
+    i = len(block) - 1 - block[::-1].index(CASE)
+  except ValueError:
+    return case
+  label = block[i + 1] if i + 1 < len(block) else tokens.peek(1)[0] if tokens.peek(1) else b''
+  return label.decode(errors='replace').rstrip(':')
+
+def _case_number(block, i):
+  # The number of a `Case #i:` label at position i, or None.
+  if i == 0 or block[i - 1] != CASE:
+    return None
+  try:
+    return int(block[i].strip(b'#:'))
+  except ValueError:
+    return None
+
+def _context(block, i):
+  before = ' '.join(t.decode(errors='replace') for t in block[max(0, i - CONTEXT):i])
+  after = ' '.join(t.decode(errors='replace') for t in block[i + 1:i + 1 + CONTEXT])
+  return ' '.join(part for part in (before, '[{}]'.format(block[i].decode(errors='replace')), after) if part)
+
+
+class _Tokens:
+  '''The whitespace separated tokens of a binary file, read in chunks.'''
+
+  def __init__(self, f):
+    self._f       = f
+    self._tokens  = []
+    self._pos     = 0
+    self._partial = b''
+    self._eof     = False
+
+  def peek(self, n):
+    '''Returns up to the next `n` tokens, without consuming them.'''
+    if len(self._tokens) - self._pos < n:
+      self._fill(n)
+    return self._tokens[self._pos:self._pos + n]
+
+  def advance(self, n):
+    self._pos += n
+
+  def skip_to_case(self):
+    '''Consumes tokens up to the next `Case` token, or to the end.'''
+    while True:
+      block = self.peek(BLOCK_SIZE)
+      if not block:
+        return
+      try:
+        self.advance(block.index(CASE))
+        return
+      except ValueError:
+        self.advance(len(block))
+
+  def _fill(self, n):
+    tokens = self._tokens[self._pos:]
+    while len(tokens) < n and not self._eof:
+      chunk = self._f.read(CHUNK_SIZE)
+      if not chunk:
+        self._eof = True
+        if self._partial:
+          tokens.append(self._partial)
+        break
+      parts = (self._partial + chunk).split()
+      # The last token may go on in the next chunk.
+      self._partial = b'' if chunk[-1:].isspace() else parts.pop()
+      tokens.extend(parts)
+    self._tokens, self._pos = tokens, 0
+
+
+class _Borrowed:
+  '''A file object used as a context manager without being closed.'''
+
+  def __init__(self, f):
+    self._f = f
+
+  def __enter__(self):
+    return self._f
+
+  def __exit__(self, *exc):
+    pass
+
+
+class Mismatch:
+  '''A difference between the output and the expected output.
+
+  Attributes:
+    case (str): The case label, such as `#3`, or None before the first case.
+    got (str): The output's tokens around the mismatch, the differing one in
+      brackets.
+    expected (str): The expected tokens around the mismatch.
+
+  '''
+
+  def __init__(self, case, got, expected):
+    self.case     = case
+    self.got      = got
+    self.expected = expected
+
+  def __str__(self):
+    where = 'Case {}'.format(self.case) if self.case else 'Before the first case'
+    return '{}:\n  got:      {}\n  expected: {}'.format(where, self.got, self.expected)
+
+
+class CheckResult:
+  '''The outcome of a check.
+
+  Attributes:
+    mismatches (list): The Mismatches found, at most the maximum asked for.
+    truncated (bool): True if checking stopped before the end of the files.
+
+  '''
+
+  def __init__(self, mismatches, truncated=False):
+    self.mismatches = mismatches
+    self.truncated  = truncated
+
+  @property
+  def passed(self):
+    return not self.mismatches
+
+  def __str__(self):
+    if self.passed:
+      return 'Output matches.'
+    lines = [str(m) for m in self.mismatches]
+    lines.append('{} mismatch{}{}.'.format(len(self.mismatches), 'es' if len(self.mismatches) > 1 else '',
+                                           ', stopped early' if self.truncated else ''))
+    return '\n'.join(lines)
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
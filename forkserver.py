@@ -0,0 +1,278 @@
+'''Forkserver module.
+
+Runs a Python solution many times without paying for interpreter startup and
+imports on every run.
+
+A ForkServer is a Python process started for one solution file. It imports the
+modules the solution imports at the top level (found with `ast`), compiles the
+source once, and then waits for requests on a Unix socket. Each request carries
+the file descriptors for the run's stdin, stdout and stderr. The server forks,
+and the child puts those descriptors in place of its own, sets `sys.argv`, and
+executes the compiled code in a fresh `__main__` module, so `if __name__ ==
+"__main__":` works as usual. The server reaps the child with `os.wait4` and
+replies with its exit status and resource usage, which the caller turns into a
+RunResult like `problems.run_solution`'s.
+
+Children share the server's memory until they write to it, so the peak memory
+reported includes the warm interpreter and its imports. Modules imported by the
+server keep whatever state they had when it started, so a solution that relies
+on running in a fresh interpreter, other than `random`, which reseeds itself
+after a fork, should be run with `run_solution` instead.
+
+`run_warm` keeps one server per solution in each process, restarting it when
+the source changes, and falls back to `run_solution` for other languages.
+'''
+
+import ast, atexit, importlib, os, pickle, signal, socket, struct, subprocess, sys, tempfile, threading, time
+import traceback, types
+from pathlib import Path
+
+from problems import RunResult, run_solution
+
+# Servers started by `run_warm`, by solution path.
+_SERVERS = {}
+
+def run_warm(main_path, input_path=None, timeout=None, args=None):
+  '''Runs a solution like `run_solution`, through a ForkServer if it is Python.
+
+  Returns:
+    A RunResult.
+
+  '''
+  main_path = Path(main_path).resolve()
+  if main_path.suffix != '.py':
+    return run_solution(main_path, input_path, timeout, args)
+  stamp = _stamp(main_path)
+  server = _SERVERS.get(main_path)
+  if server is None or server.stamp != stamp:
+    if server is not None:
+      server.close()
+    server = _SERVERS[main_path] = ForkServer(main_path)
+  return server.run(input_path, timeout, args)
+
+def close_servers():
+  '''Stops the servers started by `run_warm`.'''
+  for server in _SERVERS.values():
+    server.close()
+  _SERVERS.clear()
+
+atexit.register(close_servers)
+
+def top_level_imports(source):
+  '''Returns the absolute module names imported by a module's top-level statements.
+
+  Imports inside `if` and `try` blocks count too, since they usually pick
+  between modules, but those inside functions don't.
+
+  '''
+  names = []
+  statements = list(ast.parse(source).body)
+  while statements:
+    node = statements.pop(0)
+    if isinstance(node, ast.Import):
+      names.extend(alias.name for alias in node.names)
+    elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+      names.append(node.module)
+    elif isinstance(node, (ast.If, ast.Try)):
+      statements.extend(node.body + node.orelse + getattr(node, 'finalbody', []) +
+                        [s for handler in getattr(node, 'handlers', []) for s in handler.body])
+  return list(dict.fromkeys(names))
+
+
+class ForkServer:
+  '''ForkServer runs one Python solution in children of a warm interpreter.
+
+  The server is started and warmed up by the constructor. Use it as a context
+  manager, or call `close`, to stop it.
+
+  Args:
+    main_path (Path): The solution file.
+
+  Attributes:
+    main_path (Path): The solution file.
+    stamp (tuple): The solution's size and modification time when the server
+      started.
+
+  '''
+
+  def __init__(self, main_path):
+    self.main_path    = Path(main_path).resolve()
+    self.stamp        = _stamp(self.main_path)
+    self._lock        = threading.Lock()
+    self._sock, child = socket.socketpair()
+    with child:
+      self._p = subprocess.Popen([sys.executable, __file__, str(self.main_path), str(child.fileno())],
+                                 pass_fds=[child.fileno()], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                 cwd=str(self.main_path.parent))
+    # The server says when it is warm, so the first run isn't slower.
+    if _receive(self._sock)[0] is None:
+      raise RuntimeError('The fork server for {} failed to start.'.format(self.main_path))
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+  def run(self, input_path=None, timeout=None, args=None):
+    '''Runs the solution once in a fresh child.
+
+    Args:
+      input_path (Path): File fed to the solution's stdin, or None for no input.
+      timeout (float): Seconds of wall time before the child is killed.
+      args (list): Command line arguments for the solution.
+
+    Returns:
+      A RunResult.
+
+    '''
+    with self._lock, _open_input(input_path) as stdin, tempfile.TemporaryFile() as stdout, \
+         tempfile.TemporaryFile() as stderr:
+      start = time.perf_counter()
+      _send(self._sock, [str(a) for a in args or []], [stdin.fileno(), stdout.fileno(), stderr.fileno()])
+      pid = _receive(self._sock)[0]
+      if pid is None:
+        raise RuntimeError('The fork server for {} stopped.'.format(self.main_path))
+      killed = threading.Event()
+      killer = None
+      if timeout is not None:
+        killer = threading.Timer(timeout, _kill, [pid, killed])
+        killer.start()
+      reply = _receive(self._sock)[0]
+      wall = time.perf_counter() - start
+      if killer is not None:
+        killer.cancel()
+      if reply is None:
+        raise RuntimeError('The fork server for {} stopped.'.format(self.main_path))
+      returncode, cpu, maxrss = reply
+      stdout.seek(0)
+      stderr.seek(0)
+      return RunResult(returncode, wall, cpu, maxrss, stdout.read(), stderr.read(), killed.is_set())
+
+  def close(self):
+    '''Stops the server. Closing its socket makes it exit.'''
+    self._sock.close()
+    try:
+      self._p.wait(1)
+    except subprocess.TimeoutExpired:
+      self._p.kill()
+      self._p.wait()
+
+def _stamp(path):
+  stat = path.stat()
+  return stat.st_size, stat.st_mtime_ns
+
+def _open_input(input_path):
+  return open(os.devnull if input_path is None else str(input_path), 'rb')
+
+def _kill(pid, killed):
+  killed.set()
+  try:
+    os.kill(pid, signal.SIGKILL)
+  except OSError:
+    pass
+
+#
+# The wire format: a 4 byte length, then a pickle, with any file descriptors
+# attached to the same message.
+
+def _send(sock, obj, fds=()):
+  data = pickle.dumps(obj)
+  socket.send_fds(sock, [struct.pack('!I', len(data)) + data], list(fds))
+
+def _receive(sock):
+  '''Returns the next object and the file descriptors sent with it, or (None, []) at EOF.'''
+  try:
+    header, fds, _, _ = socket.recv_fds(sock, 4, 3)
+  except OSError:
+    return None, []
+  header += _read_exactly(sock, 4 - len(header)) if header else b''
+  if len(header) < 4:
+    return None, fds
+  data = _read_exactly(sock, struct.unpack('!I', header)[0])
+  return pickle.loads(data), fds
+
+def _read_exactly(sock, size):
+  parts = []
+  while size > 0:
+    part = sock.recv(size)
+    if not part:
+      break
+    parts.append(part)
+    size -= len(part)
+  return b''.join(parts)
+
+#
+# The server side, run as `python forkserver.py <main.py> <socket fd>`.
+
+def serve(main_path, sock):
+  '''Warms up for a solution, then runs it in a child for every request until EOF.'''
+  main_path = Path(main_path)
+  source = main_path.read_bytes()
+  # Imports are resolved as they would be when running `python main.py`.
+  sys.path[0] = str(main_path.parent)
+  try:
+    names = top_level_imports(source)
+  except SyntaxError:
+    names = []
+  for name in names:
+    try:
+      importlib.import_module(name)
+    except Exception:
+      # The solution reports its own import errors when it runs.
+      pass
+  try:
+    code = compile(source, str(main_path), 'exec')
+  except SyntaxError:
+    code = None
+  _send(sock, 'ready')
+  while True:
+    args, fds = _receive(sock)
+    if args is None:
+      break
+    pid = os.fork()
+    if pid == 0:
+      sock.close()
+      _run_child(main_path, code, args, fds)
+    for fd in fds:
+      os.close(fd)
+    _send(sock, pid)
+    _, status, usage = os.wait4(pid, 0)
+    _send(sock, (os.waitstatus_to_exitcode(status), usage.ru_utime + usage.ru_stime, usage.ru_maxrss))
+
+def _run_child(main_path, code, args, fds):
+  '''Runs the solution as `__main__` with the request's stdin, stdout and stderr. Never returns.'''
+  status = 1
+  try:
+    for target, fd in enumerate(fds):
+      os.dup2(fd, target)
+      os.close(fd)
+    sys.argv = [str(main_path)] + args
+    if code is None:
+      # Show the syntax error as Python would.
+      compile(main_path.read_bytes(), str(main_path), 'exec')
+    module = types.ModuleType('__main__')
+    module.__file__ = str(main_path)
+    module.__builtins__ = __builtins__
+    sys.modules['__main__'] = module
+    exec(code, module.__dict__)
+    status = 0
+  except SystemExit as e:
+    if e.code is None or isinstance(e.code, int):
+      status = (e.code or 0) & 0xFF
+    else:
+      print(e.code, file=sys.stderr)
+  except BaseException:
+    # Leave this function's frame out, as Python would.
+    etype, value, tb = sys.exc_info()
+    traceback.print_exception(etype, value, tb.tb_next)
+  finally:
+    for f in (sys.stdout, sys.stderr):
+      try:
+        f.flush()
+      except Exception:
+        pass
+    os._exit(status)
+
+if __name__ == "__main__":
+  serve(sys.argv[1], socket.socket(fileno=int(sys.argv[2])))
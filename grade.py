@@ -0,0 +1,208 @@
+#!/usr/bin/python
+'''Grade script.
+
+This script runs every problem's solution on its `tests.in` below a given
+competition, year or round folder, and prints a verdict for each problem along
+with its wall-clock and CPU times. If a problem folder contains `tests.out` the
+output is compared with it by `checker.py`, ignoring differences in whitespace,
+and in floats within an absolute or relative error of 10^-6. The solution is
+`main.py`, or a `main` source in a compiled language such as `main.cpp`, which
+is built once and kept in the build cache (see `build_cache.py`).
+
+Problems are graded in parallel using a process pool with one worker per core.
+Runs are cached on the hashes of the solution and `tests.in` (see `run_cache.py`),
+so only problems that changed since they were last graded are run again, unless
+`--no-cache` is given. Cached verdicts are marked with a `*`. Other runs are
+recorded in the run history (see `history.py`) unless `--no-history` is given,
+and a run much slower than its problem's fastest version so far is flagged.
+
+Example:
+  The folder to grade defaults to the current working directory, and can be
+  the practice root or any competition, year, round or problem folder inside
+  it. The following is typical usage::
+
+    $ python3 grade.py CodeJam/2020
+
+    $ cd CodeJam/2020/Round1A && python3 ../../../grade.py -t 10
+
+Verdicts:
+  AC: The output matches `tests.out`.
+  WA: The output doesn't match `tests.out`.
+  OK: The solution exited normally, but there is no `tests.out` to check.
+  RE: The solution exited with a non-zero exit code.
+  TLE: The solution was killed after exceeding the timeout.
+  CE: The solution failed to build.
+  SKIP: The problem folder has no `tests.in`.
+
+'''
+
+import io, os, sys
+from concurrent.futures import ProcessPoolExecutor
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+from build_cache import CompileError
+from checker import check
+from history import History
+from problems import find_problems, problem_name, solution_file
+from run_cache import RunCache, cached_run
+
+def main(argv):
+  try:
+    opts = process_input(argv)
+    if opts == 'help':
+      print_usage(err=False)
+    verdicts = grade(**opts)
+  except Exception as e:
+    exit('{}'.format(e))
+  exit('', err=any(v.failed for v in verdicts))
+
+def print_usage(err=True):
+  exit('usage: grade.py [-h] [-j <jobs>] [-t <seconds>] [--no-cache] [--no-history] [<path>]', err=err)
+
+def exit(message, err=True):
+  if message:
+    print(message)
+  sys.exit(1 if err else 0)
+
+def process_input(argv):
+  try:
+    opts, args = getopt(argv, 'hj:t:', ['jobs=', 'timeout=', 'no-cache', 'no-history'])
+  except GetoptError:
+    print_usage()
+  result = {'path': Path(args[0]) if args else Path.cwd(), 'jobs': None, 'timeout': None, 'cache': RunCache(),
+            'history': History()}
+  for opt, arg in opts:
+    if opt == '-h':
+      return 'help'
+    elif opt in ('-j', '--jobs'):
+      result['jobs'] = _positive(arg, int, 'Number of jobs')
+    elif opt in ('-t', '--timeout'):
+      result['timeout'] = _positive(arg, float, 'Timeout')
+    elif opt == '--no-cache':
+      result['cache'] = None
+    elif opt == '--no-history':
+      result['history'] = None
+  if len(args) > 1:
+    print_usage()
+  return result
+
+def _positive(arg, kind, name):
+  try:
+    value = kind(arg)
+  except ValueError as e:
+    raise ValueError('{} {} must be a number.'.format(name, arg)) from e
+  if value <= 0:
+    raise ValueError('{} {} must be positive.'.format(name, arg))
+  return value
+
+def grade(path, jobs=None, timeout=None, cache=None, history=None, out=sys.stdout):
+  '''Grades all problems below `path` and prints a line per problem.
+
+  Args:
+    cache (RunCache): The run cache to use, or None to run every problem.
+    history (History): The run history to record new runs in, or None. A run
+      slower than its problem's best version gets a line of its own.
+
+  Returns:
+    A list of Verdict instances, in the order the problems were printed.
+
+  '''
+  problems = find_problems(path)
+  if not problems:
+    raise FileNotFoundError('No problem folders found in {}.'.format(path))
+  verdicts = []
+  print('{:<5} {:>8} {:>8}  {}'.format('', 'wall', 'cpu', 'problem'), file=out)
+  with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+    for problem, v in zip(problems, pool.map(grade_problem, problems, [timeout] * len(problems),
+                                             [cache] * len(problems))):
+      print(v, file=out)
+      if history is not None and v.result is not None and not v.cached:
+        regression = history.record(v.name, solution_file(problem), v.result, v.status)
+        if regression is not None:
+          print('  ! {}'.format(regression), file=out)
+      verdicts.append(v)
+  if cache is not None:
+    cache.evict()
+  failed = sum(v.failed for v in verdicts)
+  cached = sum(v.cached for v in verdicts)
+  print('{} problems, {} failed{}.'.format(len(verdicts), failed, ', {} cached'.format(cached) if cached else ''),
+        file=out)
+  return verdicts
+
+def grade_problem(path, timeout=None, cache=None):
+  '''Runs a single problem folder's solution and judges it.
+
+  Args:
+    path (Path): The problem folder.
+    timeout (float): Seconds of wall time before the solution is killed.
+    cache (RunCache): The run cache to use, or None to always run.
+
+  Returns:
+    A Verdict.
+
+  '''
+  path = Path(path)
+  name = problem_name(path)
+  input_path = path / 'tests.in'
+  if not input_path.is_file():
+    return Verdict(name, 'SKIP')
+  try:
+    result, cached = cached_run(cache, solution_file(path), input_path, timeout=timeout)
+  except CompileError:
+    return Verdict(name, 'CE')
+  return Verdict(name, judge(result, path / 'tests.out'), result, cached)
+
+def judge(result, expected_path):
+  '''Returns the status of a RunResult, comparing it with `expected_path` if it exists.'''
+  expected_path = Path(expected_path)
+  if result.timed_out:
+    return 'TLE'
+  elif result.returncode:
+    return 'RE'
+  elif not expected_path.is_file():
+    return 'OK'
+  elif check(io.BytesIO(result.stdout), expected_path, max_mismatches=1).passed:
+    return 'AC'
+  return 'WA'
+
+
+class Verdict:
+  '''The graded outcome of one problem.
+
+  Args:
+    name (str): The problem's `competition/year/round/problem` name.
+    status (str): One of AC, WA, OK, RE, TLE, CE or SKIP.
+    result (RunResult): The measured run, or None if the problem was skipped or
+      failed to build.
+    cached (bool): Whether the run came from the run cache.
+
+  Attributes:
+    name (str): The problem's `competition/year/round/problem` name.
+    status (str): One of AC, WA, OK, RE, TLE, CE or SKIP.
+    result (RunResult): The measured run, or None if the problem was skipped or
+      failed to build.
+    cached (bool): Whether the run came from the run cache.
+
+  '''
+
+  FAILURES = ('WA', 'RE', 'TLE', 'CE')
+
+  def __init__(self, name, status, result=None, cached=False):
+    self.name   = name
+    self.status = status
+    self.result = result
+    self.cached = cached
+
+  @property
+  def failed(self):
+    return self.status in self.FAILURES
+
+  def __str__(self):
+    if self.result is None:
+      return '{:<5} {:>8} {:>8}  {}'.format(self.status, '-', '-', self.name)
+    return '{:<5} {:>7.3f}s {:>7.3f}s{} {}'.format(self.status, self.result.wall, self.result.cpu,
+                                                   '*' if self.cached else ' ', self.name)
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
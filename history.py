@@ -0,0 +1,311 @@
+#!/usr/bin/python
+'''History script.
+
+Every run made by `grade.py` and `watch.py` is recorded in a SQLite database,
+`.history.sqlite` in the practice root, with its wall-clock time, CPU time,
+peak memory, verdict and a hash of the solution's source, keyed on the
+problem's `competition/year/round/problem` name. Runs that came from the run
+cache aren't recorded again.
+
+Runs with the same hash are one version of the solution. A new correct run (AC
+or OK) is a regression if its CPU time is more than three standard deviations
+above the mean of the fastest version so far. CPU time is used because it
+barely changes when `grade.py` runs problems in parallel, and the standard
+deviation is taken to be at least 5% of the mean, and at least 10ms, so a
+version run only once, or with very steady times, isn't flagged for noise.
+`grade.py` and `watch.py` print a line under the verdict of a regression.
+
+This script prints the history. Given a folder with many problems it prints a
+line per problem with its best and latest CPU times, and given a single problem
+the mean times of each version and its latest runs, regressions marked with a
+`!`.
+
+Example::
+
+    $ python3 history.py CodeJam/2020
+
+    $ cd CodeJam/2020/Round1A/Problem && python3 ../../../../history.py -n 50
+
+'''
+
+import hashlib, math, sqlite3, sys, time
+from collections import namedtuple
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+from new_problem import SCRIPT_PATH
+
+HISTORY_PATH = SCRIPT_PATH / '.history.sqlite'
+
+# Only runs with these verdicts count towards the statistics.
+CORRECT = ('AC', 'OK')
+
+# A run this many standard deviations slower than the best version regresses.
+SIGMAS = 3
+
+# The smallest standard deviation used, relative to the mean and in seconds.
+SIGMA_FLOOR = 0.05
+MIN_SIGMA = 0.01
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+  id       INTEGER PRIMARY KEY,
+  problem  TEXT NOT NULL,
+  time     REAL NOT NULL,
+  solution TEXT NOT NULL,
+  status   TEXT NOT NULL,
+  wall     REAL NOT NULL,
+  cpu      REAL NOT NULL,
+  maxrss   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_problem ON runs (problem, id);
+'''
+
+Entry = namedtuple('Entry', ['time', 'solution', 'status', 'wall', 'cpu', 'maxrss'])
+Entry.__doc__ = '''One recorded run.
+
+  Attributes:
+    time (float): When the run was recorded, in seconds since the epoch.
+    solution (str): The SHA-256 hash of the solution's source.
+    status (str): The run's verdict.
+    wall (float): Wall-clock time in seconds.
+    cpu (float): User plus system CPU time in seconds.
+    maxrss (int): Peak resident set size in kilobytes.
+
+'''
+
+def main(argv):
+  try:
+    opts = process_input(argv)
+    if opts == 'help':
+      print_usage(err=False)
+    show(**opts)
+  except Exception as e:
+    exit('{}'.format(e))
+
+def print_usage(err=True):
+  exit('usage: history.py [-h] [-n <runs>] [<path>]', err=err)
+
+def exit(message, err=True):
+  if message:
+    print(message)
+  sys.exit(1 if err else 0)
+
+def process_input(argv):
+  try:
+    opts, args = getopt(argv, 'hn:', ['runs='])
+  except GetoptError:
+    print_usage()
+  if len(args) > 1:
+    print_usage()
+  result = {'path': Path(args[0]) if args else Path.cwd(), 'runs': 20}
+  for opt, arg in opts:
+    if opt == '-h':
+      return 'help'
+    elif opt in ('-n', '--runs'):
+      try:
+        result['runs'] = int(arg)
+      except ValueError as e:
+        raise ValueError('Number of runs {} must be a number.'.format(arg)) from e
+  return result
+
+def show(path, runs=20, history=None, out=sys.stdout):
+  '''Prints the history of the problems below `path`.
+
+  Args:
+    path (Path): The practice root or a competition, year, round or problem
+      folder. The folder doesn't need to exist any more.
+    runs (int): The number of latest runs shown for a single problem.
+    history (History): The history to read, or None for the default one.
+
+  Returns:
+    The names of the problems shown.
+
+  '''
+  prefix = Path(path).resolve().relative_to(SCRIPT_PATH).as_posix()
+  history = history or History()
+  problems = history.problems('' if prefix == '.' else prefix)
+  if not problems:
+    raise FileNotFoundError('No runs recorded below {}.'.format(path))
+  if len(problems) == 1:
+    _show_problem(history, problems[0], runs, out)
+  else:
+    _show_summary(history, problems, out)
+  return problems
+
+def _show_summary(history, problems, out):
+  print('{:>5} {:>8} {:>8} {:>8}   {}'.format('runs', 'versions', 'best', 'latest', 'problem'), file=out)
+  for problem in problems:
+    entries = history.entries(problem)
+    versions = summarize(entries)
+    best = min(versions, key=lambda v: v.mean, default=None)
+    flagged = regressions(entries)
+    print('{:>5} {:>8} {:>8} {:>7.3f}s {} {}'.format(len(entries), len({e.solution for e in entries}),
+                                                     '-' if best is None else '{:.3f}s'.format(best.mean),
+                                                     entries[-1].cpu, '!' if flagged[-1] else ' ', problem),
+          file=out)
+
+def _show_problem(history, problem, runs, out):
+  entries = history.entries(problem)
+  print(problem, file=out)
+  print('{:<8} {:>5} {:>18} {:>8} {:>9}  {}'.format('version', 'runs', 'cpu', 'wall', 'memory', 'first run'),
+        file=out)
+  for v in summarize(entries):
+    print('{:<8} {:>5} {:>7.3f}s ± {:.3f}s {:>7.3f}s {:>6.1f}MiB  {}'.format(
+      v.solution[:8], v.runs, v.mean, v.stdev, v.wall, v.maxrss / 1024, _date(v.first)), file=out)
+  print('', file=out)
+  print('{:<16}  {:<8} {:<5} {:>8} {:>8} {:>9}'.format('date', 'version', '', 'wall', 'cpu', 'memory'), file=out)
+  flagged = regressions(entries)
+  for entry, regression in list(zip(entries, flagged))[-runs:]:
+    print('{:<16}  {:<8} {:<5} {:>7.3f}s {:>7.3f}s {:>6.1f}MiB{}'.format(
+      _date(entry.time), entry.solution[:8], entry.status, entry.wall, entry.cpu, entry.maxrss / 1024,
+      '  ! {}'.format(regression) if regression else ''), file=out)
+
+def _date(t):
+  return time.strftime('%Y-%m-%d %H:%M', time.localtime(t))
+
+def solution_hash(main_path):
+  '''Returns the SHA-256 hash of a solution's source.'''
+  return hashlib.sha256(Path(main_path).read_bytes()).hexdigest()
+
+def summarize(entries):
+  '''Returns the statistics of each version's correct runs, in the order the versions first ran.'''
+  groups = {}
+  for entry in entries:
+    if entry.status in CORRECT:
+      groups.setdefault(entry.solution, []).append(entry)
+  return [Version.of(group) for group in groups.values()]
+
+def regression(entry, versions):
+  '''Returns a Regression if a run is slower than the best of `versions`, or None.'''
+  if entry.status not in CORRECT or not versions:
+    return None
+  best = min(versions, key=lambda v: v.mean)
+  sigma = max(best.stdev, SIGMA_FLOOR * best.mean, MIN_SIGMA)
+  if entry.cpu <= best.mean + SIGMAS * sigma:
+    return None
+  return Regression(entry.cpu, best)
+
+def regressions(entries):
+  '''Returns, for each entry in order, its Regression against the runs before it, or None.'''
+  found = []
+  groups, versions = {}, {}
+  for entry in entries:
+    found.append(regression(entry, list(versions.values())))
+    if entry.status in CORRECT:
+      group = groups.setdefault(entry.solution, [])
+      group.append(entry)
+      versions[entry.solution] = Version.of(group)
+  return found
+
+
+class Version:
+  '''The statistics of one version's correct runs.
+
+  Attributes:
+    solution (str): The hash of the version's source.
+    runs (int): The number of correct runs.
+    mean (float): The mean CPU time in seconds.
+    stdev (float): The sample standard deviation of the CPU time, 0 for one run.
+    wall (float): The mean wall-clock time in seconds.
+    maxrss (int): The largest peak resident set size, in kilobytes.
+    first (float): When the version first ran, in seconds since the epoch.
+
+  '''
+
+  def __init__(self, solution, runs, mean, stdev, wall, maxrss, first):
+    self.solution = solution
+    self.runs     = runs
+    self.mean     = mean
+    self.stdev    = stdev
+    self.wall     = wall
+    self.maxrss   = maxrss
+    self.first    = first
+
+  @classmethod
+  def of(cls, entries):
+    '''Returns the Version of a non-empty list of entries with the same hash.'''
+    n = len(entries)
+    mean = sum(e.cpu for e in entries) / n
+    stdev = math.sqrt(sum((e.cpu - mean) ** 2 for e in entries) / (n - 1)) if n > 1 else 0.0
+    return cls(entries[0].solution, n, mean, stdev, sum(e.wall for e in entries) / n,
+               max(e.maxrss for e in entries), entries[0].time)
+
+
+class Regression:
+  '''A run slower than the best version so far.
+
+  Attributes:
+    cpu (float): The run's CPU time in seconds.
+    best (Version): The fastest version before the run.
+
+  '''
+
+  def __init__(self, cpu, best):
+    self.cpu  = cpu
+    self.best = best
+
+  def __str__(self):
+    return '{:.1f}x slower than {} ({:.3f}s ± {:.3f}s)'.format(self.cpu / self.best.mean if self.best.mean else math.inf,
+                                                            self.best.solution[:8], self.best.mean, self.best.stdev)
+
+
+class History:
+  '''History stores runs in a SQLite database.
+
+  Args:
+    path (Path): The database file. It is created when first opened.
+
+  '''
+
+  def __init__(self, path=HISTORY_PATH):
+    self.path = Path(path)
+    self._db  = None
+
+  def _connect(self):
+    # The database is only created once something is recorded or read.
+    if self._db is None:
+      self._db = sqlite3.connect(str(self.path), timeout=30)
+      self._db.executescript(SCHEMA)
+    return self._db
+
+  def close(self):
+    if self._db is not None:
+      self._db.close()
+      self._db = None
+
+  def record(self, problem, main_path, result, status):
+    '''Records a run and checks it against the problem's earlier runs.
+
+    Args:
+      problem (str): The problem's `competition/year/round/problem` name.
+      main_path (Path): The solution that ran, which is hashed.
+      result (RunResult): The run.
+      status (str): The run's verdict.
+
+    Returns:
+      A Regression if the run is slower than the problem's best version, or
+      None.
+
+    '''
+    entry = Entry(time.time(), solution_hash(main_path), status, result.wall, result.cpu, result.maxrss)
+    found = regression(entry, summarize(self.entries(problem)))
+    db = self._connect()
+    with db:
+      db.execute('INSERT INTO runs (problem, time, solution, status, wall, cpu, maxrss) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                 (problem,) + tuple(entry))
+    return found
+
+  def entries(self, problem):
+    '''Returns a problem's runs as Entries, oldest first.'''
+    rows = self._connect().execute('SELECT time, solution, status, wall, cpu, maxrss FROM runs WHERE problem = ? '
+                                   'ORDER BY id', (problem,))
+    return [Entry(*row) for row in rows]
+
+  def problems(self, prefix=''):
+    '''Returns the names of the problems with runs, below `prefix` if given, sorted.'''
+    rows = self._connect().execute('SELECT DISTINCT problem FROM runs ORDER BY problem')
+    return [p for p, in rows if not prefix or p == prefix or p.startswith(prefix + '/')]
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
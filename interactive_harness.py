@@ -0,0 +1,329 @@
+#!/usr/bin/python
+'''Interactive Harness script.
+
+This script plays many games between a judge and an interactive solution in a
+single process, without starting any subprocesses, so that thousands of
+randomised games take seconds rather than minutes.
+
+The judge is a Python file defining a `Judge` class. `Judge(seed, *args)` sets
+up one game, and `judge.run(infile, outfile)` plays it, reading the solution's
+lines with `infile.readline()` and answering with `outfile.write(bytes)` and
+`outfile.flush()`, and returns True if the solution was correct. If the judge
+has an `error` attribute it is shown for failed games.
+`benchmarks/heavy_ball_judge.py` is an example.
+
+The solution is any `main.py` built from `interactive-template.py`, unchanged:
+it is compiled once and run afresh for every game in a thread, calling its
+`main()` with `sys.stdin` and `sys.stdout` replaced by in-memory channels.
+Both `input()`/`print()` and the binary buffers used by the template work.
+During a game `sys.stdin` and `sys.stdout` are thread-local, so only the
+solution's thread sees the channels, and the judge, or anything else, can
+still print as usual.
+Python threads can't be killed, so if a solution is still running when a game
+times out, the remaining games are skipped.
+
+Example::
+
+    $ python3 interactive_harness.py -g 1000 benchmarks/heavy_ball_judge.py main.py 10 5
+
+'''
+
+import importlib.util, sys, threading, time, traceback, types
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+def main(argv):
+  try:
+    opts = process_input(argv)
+    if opts == 'help':
+      print_usage(err=False)
+    results = harness(**opts)
+  except Exception as e:
+    exit('{}'.format(e))
+  exit('', err=any(not r.passed for r in results))
+
+def print_usage(err=True):
+  exit('usage: interactive_harness.py [-h] [-g <games>] [-s <seed>] [-t <seconds>] <judge> <solution> [<judge args>...]',
+       err=err)
+
+def exit(message, err=True):
+  if message:
+    print(message)
+  sys.exit(1 if err else 0)
+
+def process_input(argv):
+  try:
+    opts, args = getopt(argv, 'hg:s:t:', ['games=', 'seed=', 'timeout='])
+  except GetoptError:
+    print_usage()
+  result = {'games': 100, 'seed': 0, 'timeout': 10.0}
+  try:
+    for opt, arg in opts:
+      if opt == '-h':
+        return 'help'
+      elif opt in ('-g', '--games'):
+        result['games'] = int(arg)
+      elif opt in ('-s', '--seed'):
+        result['seed'] = int(arg)
+      elif opt in ('-t', '--timeout'):
+        result['timeout'] = float(arg)
+  except ValueError as e:
+    raise ValueError('Games, seed and timeout must be numbers.') from e
+  if len(args) < 2:
+    print_usage()
+  result['judge_path'], result['solution_path'] = Path(args[0]), Path(args[1])
+  result['judge_args'] = [_number(arg) for arg in args[2:]]
+  return result
+
+def _number(arg):
+  try:
+    return int(arg)
+  except ValueError:
+    return arg
+
+def harness(judge_path, solution_path, judge_args=(), games=100, seed=0, timeout=10.0, out=sys.stdout):
+  '''Plays games with seeds `seed`, `seed + 1`, ... and prints a summary.
+
+  Returns:
+    A list of GameResults, one per game played.
+
+  '''
+  judge_class = getattr(load_module(judge_path), 'Judge', None)
+  if judge_class is None:
+    raise AttributeError('{} has no Judge class.'.format(judge_path))
+  code = compile(Path(solution_path).read_bytes(), str(solution_path), 'exec')
+  results = []
+  start = time.perf_counter()
+  for game_seed in range(seed, seed + games):
+    result = play(judge_class(game_seed, *judge_args), code, game_seed, timeout)
+    results.append(result)
+    if result.stuck:
+      break
+  elapsed = time.perf_counter() - start
+  failures = [r for r in results if not r.passed]
+  for r in failures[:10]:
+    print(r, file=out)
+  if len(failures) > 10:
+    print('... and {} more.'.format(len(failures) - 10), file=out)
+  if results and results[-1].stuck:
+    print('The solution is still running, so the remaining games were skipped.', file=out)
+  print('{} games in {:.3f}s ({:.0f} games/s), {} failed.'.format(len(results), elapsed, len(results) / max(elapsed, 1e-9),
+                                                                len(failures)), file=out)
+  return results
+
+def load_module(path):
+  '''Imports a Python file as a module.'''
+  if not Path(path).is_file():
+    raise FileNotFoundError('No file {}.'.format(path))
+  spec = importlib.util.spec_from_file_location(Path(path).stem, str(path))
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+def play(judge, code, seed=None, timeout=10.0):
+  '''Plays one game between a judge and a compiled solution.
+
+  Returns:
+    A GameResult.
+
+  '''
+  to_solution, to_judge = Channel(), Channel()
+  outcome = {}
+  def run_judge():
+    try:
+      outcome['correct'] = bool(judge.run(to_judge, to_solution))
+    except BaseException:
+      outcome['judge_error'] = traceback.format_exc()
+    finally:
+      # The solution sees EOF once the judge is done.
+      to_solution.close()
+  def run_solution():
+    try:
+      run_code(code, TextChannel(to_solution), TextChannel(to_judge))
+    except SystemExit as e:
+      if e.code not in (None, 0):
+        outcome['solution_error'] = 'exited with {}'.format(e.code)
+    except BaseException:
+      outcome['solution_error'] = traceback.format_exc()
+    finally:
+      to_judge.close()
+  threads = [threading.Thread(target=run_judge, daemon=True), threading.Thread(target=run_solution, daemon=True)]
+  old_stdin, old_stdout = sys.stdin, sys.stdout
+  sys.stdin, sys.stdout = ThreadLocalStream(old_stdin), ThreadLocalStream(old_stdout)
+  start = time.perf_counter()
+  try:
+    for thread in threads:
+      thread.start()
+    deadline = start + timeout
+    for thread in threads:
+      thread.join(max(0.0, deadline - time.perf_counter()))
+    timed_out = any(thread.is_alive() for thread in threads)
+    if timed_out:
+      # Unblock anything waiting on the other side, and give it a moment to go.
+      to_solution.close()
+      to_judge.close()
+      for thread in threads:
+        thread.join(0.5)
+  finally:
+    sys.stdin, sys.stdout = old_stdin, old_stdout
+  elapsed = time.perf_counter() - start
+  if timed_out:
+    status, detail = 'TLE', 'no result after {:.1f}s'.format(timeout)
+  elif 'judge_error' in outcome:
+    status, detail = 'JUDGE ERROR', outcome['judge_error']
+  elif 'solution_error' in outcome:
+    status, detail = 'RE', outcome['solution_error']
+  elif outcome.get('correct'):
+    status, detail = 'AC', ''
+  else:
+    status, detail = 'WA', getattr(judge, 'error', None) or ''
+  return GameResult(seed, status, detail, elapsed, threads[1].is_alive())
+
+def run_code(code, stdin, stdout):
+  '''Runs a compiled solution's main() in a new module with the given stdin and stdout.
+
+  `sys.stdin` and `sys.stdout` are only replaced for the calling thread if
+  they are ThreadLocalStreams, as they are during `play`.
+  '''
+  if isinstance(sys.stdin, ThreadLocalStream) and isinstance(sys.stdout, ThreadLocalStream):
+    sys.stdin.set(stdin)
+    sys.stdout.set(stdout)
+  else:
+    sys.stdin, sys.stdout = stdin, stdout
+  module = types.ModuleType('solution')
+  module.__file__ = code.co_filename
+  exec(code, module.__dict__)
+  module.main()
+
+
+class GameResult:
+  '''The outcome of one game.
+
+  Attributes:
+    seed (int): The judge's seed.
+    status (str): AC, WA, RE, TLE or JUDGE ERROR.
+    detail (str): The judge's error, a traceback or a timeout message.
+    time (float): Wall time in seconds.
+    stuck (bool): True if the solution thread was still running afterwards.
+
+  '''
+
+  def __init__(self, seed, status, detail, time, stuck=False):
+    self.seed   = seed
+    self.status = status
+    self.detail = detail
+    self.time   = time
+    self.stuck  = stuck
+
+  @property
+  def passed(self):
+    return self.status == 'AC'
+
+  def __str__(self):
+    line = '{:<5} seed {:<8} {:.3f}s'.format(self.status, self.seed, self.time)
+    if self.detail:
+      line += '  ' + self.detail.strip().splitlines()[-1]
+    return line
+
+
+class Channel:
+  '''Channel is an in-memory pipe of bytes between two threads.
+
+  It has the file methods the judge and the template use. Reads block until a
+  whole line, or everything, has been written or the channel is closed, after
+  which they return what is left, and then b''.
+  '''
+
+  def __init__(self):
+    self._data   = bytearray()
+    self._cond   = threading.Condition()
+    self._closed = False
+
+  def write(self, data):
+    with self._cond:
+      if self._closed:
+        raise BrokenPipeError('The channel is closed.')
+      self._data += data
+      self._cond.notify()
+    return len(data)
+
+  def flush(self):
+    pass
+
+  def readline(self):
+    with self._cond:
+      end = self._data.find(b'\n')
+      while end < 0 and not self._closed:
+        self._cond.wait()
+        end = self._data.find(b'\n')
+      end = len(self._data) if end < 0 else end + 1
+      line = bytes(self._data[:end])
+      del self._data[:end]
+      return line
+
+  def read(self, size=-1):
+    with self._cond:
+      while not self._closed and (size < 0 or len(self._data) < size):
+        self._cond.wait()
+      size = len(self._data) if size < 0 else min(size, len(self._data))
+      data = bytes(self._data[:size])
+      del self._data[:size]
+      return data
+
+  def close(self):
+    with self._cond:
+      self._closed = True
+      self._cond.notify_all()
+
+
+class ThreadLocalStream:
+  '''ThreadLocalStream stands in for sys.stdin or sys.stdout, with a stream per thread.
+
+  Attribute lookups go to the stream set by the current thread, or to the
+  stream it replaced for threads that haven't set one.
+
+  Args:
+    default: The stream it replaced.
+
+  '''
+
+  def __init__(self, default):
+    self.default = default
+    self._local  = threading.local()
+
+  def set(self, stream):
+    '''Makes `stream` the current thread's stream.'''
+    self._local.stream = stream
+
+  def __getattr__(self, name):
+    return getattr(getattr(self._local, 'stream', self.default), name)
+
+
+class TextChannel:
+  '''TextChannel is the text side of a Channel, used as sys.stdin or sys.stdout.
+
+  Attributes:
+    buffer (Channel): The underlying channel, for binary I/O.
+
+  '''
+
+  def __init__(self, channel):
+    self.buffer = channel
+
+  def write(self, text):
+    return self.buffer.write(text.encode())
+
+  def flush(self):
+    pass
+
+  def readline(self):
+    return self.buffer.readline().decode()
+
+  def read(self, size=-1):
+    return self.buffer.read(size).decode()
+
+  def isatty(self):
+    return False
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -16,12 +16,31 @@ Example:
 
     $ python3 ../../new_problem.py -r Round1A -p PatternMatching
 
+  A whole round or season can be created at once from a manifest file, or from
+  stdin if the file name is `-`. Each line is either CSV or a JSON object with
+  the fields competition, year, round, problem and (optionally) interactive,
+  library and generator, and missing fields are filled in from the current
+  working directory as above. Either every folder is created or none are::
+
+    $ python3 new_problem.py -m round1a.csv
+
+  Data structures from `templates/library` can be inlined into the new
+  `main.py`, after the template's docstring and imports, with `-l`::
+
+    $ python3 new_problem.py -r Round1A -p Graphs -l union_find,int_heap
+
+  With `-g` the folder also gets a `gen.py` input generator, copied from
+  `templates/generator.py`, for `stress.py`, `bench.py` and worst case inputs::
+
+    $ python3 new_problem.py -r Round1A -p Graphs -g
+
 Todo:
   * Change Args constructor input to a dictionary?
 
 '''
 
-import sys, shutil
+import ast, csv, json, os, re, sys, shutil, tempfile
+from functools import lru_cache
 from getopt import getopt, GetoptError
 from pathlib import Path
 
@@ -33,14 +52,22 @@ def main(argv):
     a = process_input(argv)
     if a == "help":
       print_usage(err=False)
+    # practice_index imports this module, through problems, for SCRIPT_PATH.
+    from practice_index import PracticeIndex
+    index = PracticeIndex.load()
+    if isinstance(a, list):
+      # Make all the folders from a manifest.
+      BatchFolderMaker(a, index=index).make_folders()
+      return
     # Make new folder.
-    fm = FolderMaker(a)
+    fm = FolderMaker(a, index=index)
     fm.make_folder()
   except Exception as e:
     exit("{}".format(e))
 
 def print_usage(err=True):
-  exit('usage: new_problem.py [-h] [-i] -c <competition> -y <year> -r <round> -p <name>', err=err)
+  exit('usage: new_problem.py [-h] [-i] [-g] [-l <library,...>] -c <competition> -y <year> -r <round> -p <name>\n'
+       '       new_problem.py [-h] -m <manifest>', err=err)
 
 def exit(message, err=True):
   print(message)
@@ -49,8 +76,12 @@ def exit(message, err=True):
 def process_input(argv):
   competition, year, round_name, name = None, None, None, None
   interactive = False
+  manifest = None
+  library = []
+  generator = False
   try:
-    opts, args = getopt(argv, 'hic:y:r:p:', ['interactive', 'competition=' 'year=', 'round=', 'name='])
+    opts, args = getopt(argv, 'higc:y:r:p:m:l:', ['interactive', 'generator', 'competition=' 'year=', 'round=', 'name=',
+                                                  'manifest=', 'library='])
   except GetoptError:
     print_usage()
   else:
@@ -59,6 +90,8 @@ def process_input(argv):
         return 'help'
       elif opt in ('-i', '--interactive'):
         interactive = True
+      elif opt in ('-g', '--generator'):
+        generator = True
       elif opt in ('-c', '--competition'):
         competition = arg
       elif opt in ('-y', '--year'):
@@ -71,12 +104,71 @@ def process_input(argv):
         round_name = arg
       elif opt in ('-p', '--name'):
         name = arg       
+      elif opt in ('-m', '--manifest'):
+        manifest = arg
+      elif opt in ('-l', '--library'):
+        library = split_names(arg)
+    if manifest is not None:
+      if manifest == '-':
+        return read_manifest(sys.stdin)
+      with open(manifest) as f:
+        return read_manifest(f)
   try:
-    a = Args(competition, year, round_name, name, interactive)
+    a = Args(competition, year, round_name, name, interactive, library, generator)
   except:
     raise
   return a
 
+MANIFEST_FIELDS = ['competition', 'year', 'round', 'problem', 'interactive', 'library', 'generator']
+
+def read_manifest(lines):
+  '''Reads a manifest of problems to create.
+
+  Blank lines and lines starting with `#` are ignored. Every other line is
+  either a JSON object or CSV, with fields in the order of MANIFEST_FIELDS.
+  Library names are a JSON list, or separated by spaces or semicolons in CSV.
+
+  Args:
+    lines: An iterable of lines, such as an open file.
+
+  Returns:
+    A list of Args instances, one per problem.
+
+  Raises:
+    ValueError: If a line can't be parsed, or its Args are invalid.
+    KeyError: If a line is missing a required field.
+
+  '''
+  result = []
+  for number, line in enumerate(lines, 1):
+    line = line.strip()
+    if not line or line.startswith('#'):
+      continue
+    try:
+      if line.startswith('{'):
+        fields = json.loads(line)
+      else:
+        fields = dict(zip(MANIFEST_FIELDS, next(csv.reader([line]))))
+      library = fields.get('library') or []
+      if isinstance(library, str):
+        library = split_names(library)
+      result.append(Args(fields.get('competition'), fields.get('year'), fields.get('round'),
+                         fields.get('problem'), _flag(fields.get('interactive'), 'interactive'), library,
+                         _flag(fields.get('generator'), 'generator')))
+    except (ValueError, KeyError) as e:
+      raise type(e)('Manifest line {}: {}'.format(number, e)) from e
+  return result
+
+def _flag(value, name):
+  # Flags in CSV are strings, and JSON flags are usually booleans.
+  if isinstance(value, str):
+    return value.strip().lower() in ('1', 'true', 'yes', 'y', name[0], name)
+  return bool(value)
+
+def split_names(names):
+  '''Splits a list of library names separated by commas, semicolons or spaces.'''
+  return [name for name in re.split(r'[,;\s]+', names) if name]
+
 class Args:
   '''The Args class validates input from the command line.
 
@@ -86,11 +178,14 @@ class Args:
     round_name (str): The name of the round.
     name (str): The name of the problem.
     interactive (bool): Indicates whether the problem is interactive.
+    library (list): Names of `templates/library` modules to inline.
+    generator (bool): Indicates whether to add a `gen.py` input generator.
 
   Raises:
     KeyError: If any parameters are missing. 
     ValueError: If `year` is not an integer.
     ValueError: If `interactive` is not compatible with `competition` and `year`.
+    ValueError: If a library module doesn't exist.
 
   Attributes:
     competition (str): The name of the competition.
@@ -98,10 +193,12 @@ class Args:
     round_name (str): The name of the round.
     name (str): The name of the problem.
     interactive (bool): Indicates wether the problem is interactive.
+    library (list): Names of `templates/library` modules to inline.
+    generator (bool): Indicates whether to add a `gen.py` input generator.
 
   '''
 
-  def __init__(self, competition, year, round_name, prob_name, interactive):
+  def __init__(self, competition, year, round_name, prob_name, interactive, library=(), generator=False):
     # If cwd is a subdirectory of the script's directoy, some arguments are optional.
     try:
       rel_parts = Path.cwd().relative_to(SCRIPT_PATH).parts
@@ -139,12 +236,20 @@ class Args:
     # Interactive option is only available for 2018 and later.
     if year < 2018 and interactive:
       raise ValueError('Interactive problems are only in 2018 and later.')
+    # Library modules must exist.
+    library = list(library)
+    available = library_names()
+    for module in library:
+      if module not in available:
+        raise ValueError('Unknown library {}, choose from {}.'.format(module, ', '.join(available)))
     # Finally, initialize fields.
     self.competition  = competition
     self.year         = year
     self.round_name   = round_name
     self.prob_name    = prob_name
     self.interactive  = interactive
+    self.library      = library
+    self.generator    = generator
 
   def _try_year(self, year):
     try:
@@ -161,24 +266,32 @@ class FolderMaker:
 
   Args:
     a (Args): An Args instance containing the new problem's data.
+    index (PracticeIndex): If given, new folders are added to it and it is saved.
 
   Attributes:
     problem_path (Path): pathlib.Path instance to destination folder.
 
   """
 
-  def __init__(self, a, test_mode=False):
+  def __init__(self, a, test_mode=False, index=None):
     self._competition  = a.competition
     self._year         = str(a.year)
     self._round_name   = a.round_name
     self._prob_name    = a.prob_name
     self._interactive  = a.interactive
+    self._library      = getattr(a, 'library', [])
+    self._generator    = getattr(a, 'generator', False)
     self._test_mode    = test_mode
+    self._index        = index
     self.problem_path = SCRIPT_PATH / self._competition / self._year / self._round_name / self._prob_name
 
-  def make_folder(self):
+  def make_folder(self, root=None):
     '''Creates and sets up folder.
 
+    Args:
+      root (Path): Folder to create the problem in instead of the practice
+        root, e.g. a staging folder.
+
     Returns:
       The path to the new folder.
 
@@ -189,6 +302,8 @@ class FolderMaker:
 
     # Create folder.
     path = self.problem_path
+    if root is not None:
+      path = Path(root) / path.relative_to(SCRIPT_PATH)
     path.mkdir(parents=True)
     self._output('Created folder {}/{}/{}/{}.'.format(self._competition, self._year, self._round_name, self._prob_name))
     # Select the right template.
@@ -198,27 +313,161 @@ class FolderMaker:
       template_name = prefix + '-'
     template_name += 'template.py'
     # Copy template file.
-    template_path = SCRIPT_PATH / 'templates' / template_name
-    dest_path = path / 'main.py'
-    shutil.copy(str(template_path), str(dest_path))
+    (path / 'main.py').write_bytes(inline_library(read_template(template_name), self._library))
     if self._interactive and int(self._year) >= 2019:
       # Although there are interactive problems in 2018 their local testing tool
       # is bundled with an interactive runner.
-      runner_path = SCRIPT_PATH / 'templates' / 'interactive_runner.py'
-      runner_dest = path / 'interactive_runner.py'
-      shutil.copy(str(runner_path), str(runner_dest))
+      (path / 'interactive_runner.py').write_bytes(read_template('interactive_runner.py'))
     rel_path = path.relative_to(path.parents[3])
     self._output('Copied {} template to {}.'.format(prefix, str(rel_path  / 'main.py')))
+    if self._library:
+      self._output('Inlined {}.'.format(', '.join(self._library)))
+    if self._generator:
+      (path / 'gen.py').write_bytes(read_template('generator.py'))
+      self._output('Copied generator to {}.'.format(str(rel_path / 'gen.py')))
     # Create tests file.
     test_path = path / 'tests.in'
     test_path.touch()
     self._output('Created test file {}.'.format(str(rel_path / 'tests.in')))
+    if self._index is not None and root is None:
+      self._index.add_problems([path])
+      self._index.save()
     return path
 
   def _output(self, text):
     if not self._test_mode:
       print(text)
 
+@lru_cache(maxsize=None)
+def read_template(name):
+  '''Returns the contents of a file in the templates folder, reading it once.'''
+  return (SCRIPT_PATH / 'templates' / name).read_bytes()
+
+def library_names():
+  '''Returns the sorted names of the modules in `templates/library`.'''
+  return sorted(p.stem for p in (SCRIPT_PATH / 'templates' / 'library').glob('*.py') if not p.stem.startswith('_'))
+
+def inline_library(template, names):
+  '''Inlines library modules into a template.
+
+  Each module's code, without its docstring and imports, goes after the
+  template's docstring and imports, and its imports are added to the
+  template's.
+
+  Args:
+    template (bytes): The template source.
+    names (list): Names of `templates/library` modules.
+
+  Returns:
+    The new source, as bytes.
+
+  '''
+  if not names:
+    return template
+  lines = template.decode().splitlines(keepends=True)
+  head_end = _head_end(lines)
+  imports, blocks = [], []
+  existing = {line.strip() for line in lines[:head_end]}
+  for name in names:
+    module_lines = read_template('library/{}.py'.format(name)).decode().splitlines(keepends=True)
+    end = _head_end(module_lines)
+    for line in module_lines[:end]:
+      if line.startswith(('import ', 'from ')) and line.strip() not in existing:
+        existing.add(line.strip())
+        imports.append(line)
+    blocks.append(''.join(module_lines[end:]).strip('\n') + '\n')
+  head = ''.join(lines[:head_end] + imports)
+  return (head + '\n\n' + '\n\n'.join(blocks) + '\n' + ''.join(lines[head_end:])).encode()
+
+def _head_end(lines):
+  # Returns the index of the first line after the docstring and the imports.
+  module = ast.parse(''.join(lines))
+  end = 0
+  for i, node in enumerate(module.body):
+    docstring = i == 0 and isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)
+    if not docstring and not isinstance(node, (ast.Import, ast.ImportFrom)):
+      break
+    end = node.end_lineno
+  return end
+
+
+class BatchFolderMaker:
+  '''BatchFolderMaker creates many problem folders, all or nothing.
+
+  Every folder is first built in a staging folder inside the practice root, and
+  then moved into place with an atomic rename. If anything fails, the folders
+  moved so far are moved back and the staging folder is deleted, so the
+  practice tree is left as it was.
+
+  Args:
+    args (list): Args instances, one for each new problem.
+    index (PracticeIndex): If given, new folders are added to it and it is saved.
+
+  '''
+
+  def __init__(self, args, test_mode=False, index=None):
+    self._makers    = [FolderMaker(a, test_mode=True) for a in args]
+    self._test_mode = test_mode
+    self._index     = index
+
+  def make_folders(self):
+    '''Creates and sets up all the folders.
+
+    Returns:
+      A list of paths to the new folders.
+
+    Raises:
+      FileExistsError: If any of the folders already exists, or a problem
+        appears twice.
+
+    '''
+    seen = set()
+    for fm in self._makers:
+      if fm.problem_path in seen or fm.problem_path.exists():
+        raise FileExistsError('Problem folder {} already exists.'.format(fm.problem_path.relative_to(SCRIPT_PATH)))
+      seen.add(fm.problem_path)
+    staging = Path(tempfile.mkdtemp(prefix='.staging-', dir=str(SCRIPT_PATH)))
+    moved, made_parents = [], []
+    try:
+      staged = [fm.make_folder(root=staging) for fm in self._makers]
+      for fm, staged_path in zip(self._makers, staged):
+        made_parents.extend(self._make_parents(fm.problem_path.parent))
+        os.rename(str(staged_path), str(fm.problem_path))
+        moved.append((staged_path, fm.problem_path))
+    except BaseException:
+      # Roll back, newest first.
+      for staged_path, path in reversed(moved):
+        os.rename(str(path), str(staged_path))
+      for parent in reversed(made_parents):
+        try:
+          parent.rmdir()
+        except OSError:
+          pass
+      raise
+    finally:
+      shutil.rmtree(str(staging), ignore_errors=True)
+    paths = [fm.problem_path for fm in self._makers]
+    for path in paths:
+      self._output('Created folder {}.'.format(path.relative_to(SCRIPT_PATH).as_posix()))
+    if self._index is not None:
+      self._index.add_problems(paths)
+      self._index.save()
+    return paths
+
+  def _make_parents(self, path):
+    # Returns the folders that had to be created, outermost first.
+    missing = []
+    while not path.exists():
+      missing.append(path)
+      path = path.parent
+    for folder in reversed(missing):
+      folder.mkdir()
+    return list(reversed(missing))
+
+  def _output(self, text):
+    if not self._test_mode:
+      print(text)
+
 if __name__ == "__main__":
   main(sys.argv[1:])
   # Close program.
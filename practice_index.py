@@ -0,0 +1,221 @@
+#!/usr/bin/python
+'''Practice Index script.
+
+This script keeps a persistent index of the practice tree, i.e. of every
+`<competition>/<year>/<round>/<problem>` folder, so questions about what exists
+can be answered without walking thousands of folders.
+
+The index is a compact JSON file in the practice root. `new_problem.py` adds
+new problems to it as it creates them, and `refresh` brings it up to date with
+changes made by hand. Refreshing is incremental: folders whose modification
+time hasn't changed aren't listed again, and problems whose folder hasn't
+changed keep their old record. Editing a file in place doesn't change its
+folder's modification time, so use `refresh -f` to re-read test file sizes.
+
+Example::
+
+    $ python3 practice_index.py refresh
+
+    $ python3 practice_index.py list CodeJam/2020
+
+    $ python3 practice_index.py stats
+
+'''
+
+import json, os, sys, tempfile
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+from new_problem import SCRIPT_PATH
+from problems import PROBLEM_DEPTH, solution_file, tree_children
+
+INDEX_PATH = SCRIPT_PATH / '.practice_index.json'
+INDEX_VERSION = 2
+
+def main(argv):
+  try:
+    opts, args = getopt(argv, 'hf')
+  except GetoptError:
+    print_usage()
+  full = False
+  for opt, _ in opts:
+    if opt == '-h':
+      print_usage(err=False)
+    elif opt == '-f':
+      full = True
+  if not args or args[0] not in ('list', 'stats', 'refresh') or len(args) > 2:
+    print_usage()
+  try:
+    index = PracticeIndex.load()
+    if args[0] == 'refresh' or not index.problems:
+      index.refresh(full=full)
+      index.save()
+    prefix = scope_prefix(args[1] if len(args) > 1 else None)
+    if args[0] == 'refresh':
+      print('Indexed {} problems.'.format(len(index.problems)))
+    elif args[0] == 'list':
+      print_list(index, prefix)
+    elif args[0] == 'stats':
+      print_stats(index, prefix)
+  except Exception as e:
+    exit('{}'.format(e))
+
+def print_usage(err=True):
+  exit('usage: practice_index.py [-h] [-f] list|stats|refresh [<path>]', err=err)
+
+def exit(message, err=True):
+  print(message)
+  sys.exit(1 if err else 0)
+
+def scope_prefix(path=None):
+  '''Returns the index key prefix for a folder, defaulting to the CWD.'''
+  path = Path(path or Path.cwd()).resolve()
+  try:
+    rel = path.relative_to(SCRIPT_PATH).as_posix()
+  except ValueError:
+    raise ValueError('{} is not inside the practice folder.'.format(path))
+  return '' if rel == '.' else rel
+
+def print_list(index, prefix=''):
+  for key, record in index.select(prefix):
+    print('{:<50} in:{:>9} out:{:>9}  {}'.format(key, _size(record['tests_in']), _size(record['tests_out']),
+                                                 'interactive' if record['interactive'] else ''))
+
+def print_stats(index, prefix=''):
+  records = index.select(prefix)
+  parts = [key.split('/') for key, _ in records]
+  print('competitions: {}'.format(len({p[0] for p in parts})))
+  print('years:        {}'.format(len({tuple(p[:2]) for p in parts})))
+  print('rounds:       {}'.format(len({tuple(p[:3]) for p in parts})))
+  print('problems:     {}'.format(len(parts)))
+  print('interactive:  {}'.format(sum(r['interactive'] for _, r in records)))
+  print('with tests:   {}'.format(sum(bool(r['tests_in']) for _, r in records)))
+  print('test bytes:   {}'.format(sum((r['tests_in'] or 0) + (r['tests_out'] or 0) for _, r in records)))
+
+def _size(size):
+  return '-' if size is None else str(size)
+
+
+class PracticeIndex:
+  '''PracticeIndex is the in-memory form of the index file.
+
+  Args:
+    path (Path): The index file.
+    root (Path): The practice root the index describes.
+
+  Attributes:
+    problems (dict): Maps `competition/year/round/problem` to a record with the
+      folder's mtime, whether it is interactive (i.e. has the
+      `interactive_runner.py` that `new_problem.py -i` copies), and the sizes
+      of `tests.in` and `tests.out` (None if missing).
+    folders (dict): Maps every folder above problem level ('' for the root) to
+      its mtime and the names of its subfolders.
+
+  '''
+
+  def __init__(self, path=INDEX_PATH, root=SCRIPT_PATH):
+    self.path     = Path(path)
+    self.root     = Path(root)
+    self.problems = {}
+    self.folders  = {}
+
+  @classmethod
+  def load(cls, path=INDEX_PATH, root=SCRIPT_PATH):
+    '''Reads the index file, or returns an empty index if there isn't one.'''
+    index = cls(path, root)
+    try:
+      with open(str(index.path)) as f:
+        data = json.load(f)
+    except (OSError, ValueError):
+      return index
+    if data.get('version') == INDEX_VERSION:
+      index.problems = data['problems']
+      index.folders = data['folders']
+    return index
+
+  def save(self):
+    '''Writes the index file atomically.'''
+    data = {'version': INDEX_VERSION, 'problems': self.problems, 'folders': self.folders}
+    # A temporary file of its own, so concurrent saves don't write into each other's.
+    f = tempfile.NamedTemporaryFile('w', dir=str(self.path.parent), prefix=self.path.name + '.',
+                                    suffix='.tmp', delete=False)
+    try:
+      with f:
+        json.dump(data, f, separators=(',', ':'), sort_keys=True)
+      os.replace(f.name, str(self.path))
+    except BaseException:
+      os.unlink(f.name)
+      raise
+
+  def select(self, prefix=''):
+    '''Returns sorted (key, record) pairs for problems under `prefix`.'''
+    prefix = prefix.strip('/')
+    return [(key, record) for key, record in sorted(self.problems.items())
+            if not prefix or key == prefix or key.startswith(prefix + '/')]
+
+  def refresh(self, full=False):
+    '''Brings the index up to date with the practice tree.
+
+    Args:
+      full (bool): If True, ignore mtimes and re-read everything.
+
+    '''
+    problems, folders = {}, {}
+    self._scan('', 0, full, problems, folders)
+    self.problems, self.folders = problems, folders
+
+  def add_problems(self, paths):
+    '''Records newly created problem folders without a refresh.'''
+    for path in paths:
+      path = Path(path)
+      key = path.relative_to(self.root).as_posix()
+      self.problems[key] = self._describe(path)
+      # Record the new folders in their parents, up to the root. Their mtimes
+      # are cleared since other changes may have happened since the last
+      # refresh, so the next refresh lists them again.
+      parts = key.split('/')
+      for depth in range(PROBLEM_DEPTH):
+        folder = '/'.join(parts[:depth])
+        entry = self.folders.setdefault(folder, {'mtime': 0, 'children': []})
+        if parts[depth] not in entry['children']:
+          entry['children'] = sorted(entry['children'] + [parts[depth]])
+        entry['mtime'] = 0
+
+  def _scan(self, key, depth, full, problems, folders):
+    path = self.root / key
+    try:
+      mtime = os.stat(str(path)).st_mtime_ns
+    except OSError:
+      return
+    if depth == PROBLEM_DEPTH:
+      old = self.problems.get(key)
+      if old is not None and old['mtime'] == mtime and not full:
+        problems[key] = old
+      elif solution_file(path) is not None:
+        problems[key] = self._describe(path)
+      return
+    old = self.folders.get(key)
+    if old is not None and old['mtime'] == mtime and not full:
+      children = old['children']
+    else:
+      children = tree_children(path, depth)
+    folders[key] = {'mtime': mtime, 'children': children}
+    for child in children:
+      self._scan(key + '/' + child if key else child, depth + 1, full, problems, folders)
+
+  def _describe(self, path):
+    return {
+      'mtime':       os.stat(str(path)).st_mtime_ns,
+      'interactive': (path / 'interactive_runner.py').is_file(),
+      'tests_in':    _file_size(path / 'tests.in'),
+      'tests_out':   _file_size(path / 'tests.out'),
+    }
+
+def _file_size(path):
+  try:
+    return os.stat(str(path)).st_size
+  except OSError:
+    return None
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,406 @@
+#!/usr/bin/python
+'''Probe script.
+
+This script looks inside a solution built from one of the templates, one test
+case at a time. It loads the problem's `main.py` as a module, wraps its
+`solve_problem` function and runs its `main` on `tests.in`, so the cases are
+split up by the solution's own input parsing. This works the same way for
+`template.py` solutions, which read stdin, and for `pre2018-template.py`
+solutions, which read `FILENAME.in` (a copy of the output is written in a
+temporary folder, so `tests.out` isn't touched).
+
+By default it prints the time taken by each of the slowest cases. With
+`--profile` it also runs the slowest cases again under cProfile and prints a
+table of the functions taking the most time, and traces them once more to
+write `profile.folded` to the problem folder. That file has one line per call
+stack with the microseconds spent in it, the collapsed stack format read by
+flamegraph tools, e.g. `flamegraph.pl profile.folded > profile.svg`.
+
+The arguments of every case are pickled before it is solved so that the
+slowest ones can be replayed, which slows down the first run a little.
+
+With `--memory` the solution is run a second time under tracemalloc. The peak
+traced memory of each case is recorded and the cases with the highest peaks
+are listed, flagging the ones over the `--budget` (in MiB). While it runs the
+traced memory is checked on every function call and return, and a snapshot is
+taken whenever it has grown by 10% since the last one; the source lines with
+the most memory allocated in the last snapshot are printed, followed by the
+process's peak RSS from the first run, since tracing itself takes memory.
+Tracing memory makes the solution several times slower.
+
+Example::
+
+    $ python3 probe.py --profile -k 3 CodeJam/2020/Round1A/Pascal
+
+    $ python3 probe.py --memory -b 256
+
+'''
+
+import cProfile, heapq, importlib.util, io, linecache, os, pickle, pstats, resource, sys, sysconfig, tempfile, time
+import tracemalloc
+from collections import Counter
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+# cProfile's own entry, left over from stopping it.
+_PROFILER_DISABLE = "<method 'disable' of '_lsprof.Profiler' objects>"
+
+# A new memory snapshot is taken when traced memory grows by this factor.
+SNAPSHOT_GROWTH = 1.1
+
+MIB = 1 << 20
+
+def main(argv):
+  try:
+    opts = process_input(argv)
+    if opts == 'help':
+      print_usage(err=False)
+    probe(**opts)
+  except Exception as e:
+    exit('{}'.format(e))
+
+def print_usage(err=True):
+  exit('usage: probe.py [-h] [-p] [-m] [-b <MiB>] [-k <slowest>] [-l <rows>] [<path>]', err=err)
+
+def exit(message, err=True):
+  print(message)
+  sys.exit(1 if err else 0)
+
+def process_input(argv):
+  try:
+    opts, args = getopt(argv, 'hpmb:k:l:', ['profile', 'memory', 'budget=', 'slowest=', 'limit='])
+  except GetoptError:
+    print_usage()
+  if len(args) > 1:
+    print_usage()
+  result = {'path': Path(args[0]) if args else Path.cwd(), 'profile': False, 'memory': False,
+            'budget': 1024.0, 'slowest': 5, 'limit': 20}
+  try:
+    for opt, arg in opts:
+      if opt == '-h':
+        return 'help'
+      elif opt in ('-p', '--profile'):
+        result['profile'] = True
+      elif opt in ('-m', '--memory'):
+        result['memory'] = True
+      elif opt in ('-b', '--budget'):
+        result['budget'] = float(arg)
+      elif opt in ('-k', '--slowest'):
+        result['slowest'] = int(arg)
+      elif opt in ('-l', '--limit'):
+        result['limit'] = int(arg)
+  except ValueError as e:
+    raise ValueError('The number of cases and rows must be integers, and the budget a number.') from e
+  return result
+
+def probe(path, profile=False, memory=False, budget=1024.0, slowest=5, limit=20, out=sys.stdout):
+  '''Times each case of a problem's solution, and optionally profiles it.
+
+  Returns:
+    The CaseRecorder with the case times, and the MemoryRecorder with the case
+    peaks if `memory` is set.
+
+  '''
+  path = Path(path).resolve()
+  module = load_solution(path / 'main.py')
+  recorder = CaseRecorder(module.solve_problem, slowest)
+  run_cases(module, recorder, path / 'tests.in')
+  times = recorder.times
+  print('{} cases in {:.3f}s, mean {:.4f}s.'.format(len(times), sum(times), sum(times) / max(1, len(times))), file=out)
+  print('{:>6} {:>10} {:>7}'.format('case', 'time', 'share'), file=out)
+  for elapsed, index, _ in recorder.slowest():
+    print('{:>6} {:>9.4f}s {:>6.1f}%'.format(index + 1, elapsed, 100 * elapsed / max(sum(times), 1e-9)), file=out)
+  if profile:
+    replays = [(index, data) for _, index, data in recorder.slowest() if data is not None]
+    if not replays:
+      raise ValueError('The slowest cases could not be pickled, so they cannot be profiled.')
+    stats = profile_cases(module.solve_problem, replays)
+    print('', file=out)
+    print_hotspots(stats, limit, out)
+    folded = path / 'profile.folded'
+    write_folded(trace_cases(module.solve_problem, replays), folded)
+    print('', file=out)
+    print('Collapsed stacks written to {}.'.format(folded), file=out)
+  if not memory:
+    return recorder
+  rss = peak_rss()
+  memory_recorder = MemoryRecorder(module.solve_problem)
+  memory_recorder.start()
+  try:
+    run_cases(module, memory_recorder, path / 'tests.in')
+  finally:
+    memory_recorder.stop()
+  print('', file=out)
+  print_memory(memory_recorder, budget * MIB, rss, slowest, limit, out)
+  return recorder, memory_recorder
+
+def load_solution(main_path):
+  '''Imports a solution file as a module, without running its main.'''
+  if not Path(main_path).is_file():
+    raise FileNotFoundError('No solution {}.'.format(main_path))
+  spec = importlib.util.spec_from_file_location('solution', str(main_path))
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  if not hasattr(module, 'solve_problem') or not hasattr(module, 'main'):
+    raise AttributeError('{} has no solve_problem or no main function.'.format(main_path))
+  return module
+
+def run_cases(module, wrapper, input_path):
+  '''Runs a solution's main with `solve_problem` replaced by `wrapper`.
+
+  Standard solutions read `input_path` as stdin and their output is discarded.
+  Pre-2018 solutions, which have a FILENAME, are run in a temporary folder
+  where FILENAME.in is a link to `input_path`.
+  '''
+  input_path = Path(input_path).resolve()
+  if not input_path.is_file():
+    raise FileNotFoundError('No input {}.'.format(input_path))
+  solve = module.solve_problem
+  module.solve_problem = wrapper
+  # The parallel mode of the standard template would solve cases elsewhere.
+  parallel = getattr(module, 'PARALLEL', None)
+  module.PARALLEL = False
+  old_cwd, old_stdin, old_stdout = os.getcwd(), sys.stdin, sys.stdout
+  try:
+    with tempfile.TemporaryDirectory() as tmp, open(str(input_path), 'rb') as stdin, open(os.devnull, 'w') as devnull:
+      if hasattr(module, 'FILENAME'):
+        os.chdir(tmp)
+        os.symlink(str(input_path), module.FILENAME + '.in')
+      sys.stdin = io.TextIOWrapper(stdin)
+      sys.stdout = devnull
+      try:
+        module.main()
+      except SystemExit:
+        pass
+  finally:
+    sys.stdin, sys.stdout = old_stdin, old_stdout
+    os.chdir(old_cwd)
+    module.solve_problem = solve
+    if parallel is None:
+      del module.PARALLEL
+    else:
+      module.PARALLEL = parallel
+
+def profile_cases(solve, replays):
+  '''Solves the pickled cases under cProfile and returns the combined pstats.Stats.'''
+  stats = None
+  for _, data in replays:
+    profiler = cProfile.Profile()
+    profiler.runcall(solve, *pickle.loads(data))
+    if stats is None:
+      stats = pstats.Stats(profiler)
+    else:
+      stats.add(profiler)
+  return stats
+
+def print_hotspots(stats, limit=20, out=sys.stdout):
+  '''Prints the functions with the most time spent in their own code.'''
+  rows = sorted(((func, row) for func, row in stats.stats.items() if func[2] != _PROFILER_DISABLE),
+                key=lambda item: item[1][2], reverse=True)
+  total = sum(row[2] for _, row in rows) or 1e-9
+  print('{:>9} {:>10} {:>10} {:>7}  {}'.format('calls', 'own', 'total', 'own%', 'function'), file=out)
+  for (filename, line, name), (_, calls, own, cumulative, _) in rows[:limit]:
+    print('{:>9} {:>9.4f}s {:>9.4f}s {:>6.1f}%  {}'.format(calls, own, cumulative, 100 * own / total,
+                                                           _function_name(filename, line, name)), file=out)
+
+def trace_cases(solve, replays):
+  '''Solves the pickled cases under a StackTracer and returns its counts.'''
+  tracer = StackTracer()
+  for _, data in replays:
+    args = pickle.loads(data)
+    tracer.start()
+    try:
+      solve(*args)
+    finally:
+      tracer.stop()
+  return tracer.counts
+
+def write_folded(counts, path):
+  '''Writes collapsed stacks, with times in whole microseconds.'''
+  with open(str(path), 'w') as f:
+    for stack, seconds in sorted(counts.items()):
+      micros = int(round(seconds * 1e6))
+      if micros:
+        f.write('{} {}\n'.format(stack, micros))
+
+def print_memory(recorder, budget, rss, slowest=5, limit=20, out=sys.stdout):
+  '''Prints the cases with the highest peaks, the top lines and the peak RSS.'''
+  peaks = recorder.peaks
+  over = [i for i, peak in enumerate(peaks) if peak > budget]
+  print('Peak traced memory {:.1f} MiB, {} of {} cases over the {:.0f} MiB budget.'.format(
+        max(peaks, default=0) / MIB, len(over), len(peaks), budget / MIB), file=out)
+  print('{:>6} {:>11} {:>11}'.format('case', 'peak', 'growth'), file=out)
+  for index in sorted(range(len(peaks)), key=lambda i: peaks[i], reverse=True)[:slowest]:
+    print('{:>6} {:>7.1f} MiB {:>7.1f} MiB{}'.format(index + 1, peaks[index] / MIB, recorder.growths[index] / MIB,
+                                                     '  OVER BUDGET' if index in over else ''), file=out)
+  if recorder.snapshot is not None:
+    print('', file=out)
+    print('Top allocating lines at {:.1f} MiB, in case {}:'.format(recorder.snapshot_size / MIB,
+                                                                   recorder.snapshot_case + 1), file=out)
+    stats = recorder.snapshot.filter_traces([
+      tracemalloc.Filter(False, tracemalloc.__file__),
+      tracemalloc.Filter(False, __file__),
+      # The standard library's own allocations, e.g. tempfile's and importlib's.
+      tracemalloc.Filter(False, os.path.join(sysconfig.get_paths()['stdlib'], '*')),
+      tracemalloc.Filter(False, '<frozen *>'),
+      tracemalloc.Filter(False, '<unknown>'),
+    ]).statistics('lineno')
+    # Leave out lines holding a negligible share, mostly this script's own.
+    stats = [stat for stat in stats[:limit] if stat.size * 1000 >= recorder.snapshot_size]
+    for stat in stats:
+      frame = stat.traceback[0]
+      print('{:>7.1f} MiB {:>9} blocks  {}:{}  {}'.format(stat.size / MIB, stat.count, os.path.basename(frame.filename),
+            frame.lineno, linecache.getline(frame.filename, frame.lineno).strip()), file=out)
+  print('', file=out)
+  print('Peak RSS {:.1f} MiB.'.format(rss / MIB), file=out)
+
+def peak_rss():
+  '''Returns this process's peak resident set size in bytes.'''
+  maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # Linux reports kilobytes, macOS bytes.
+  return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+def _function_name(filename, line, name):
+  if filename == '~':
+    # Built in functions.
+    return name
+  return '{} ({}:{})'.format(name, os.path.basename(filename), line)
+
+
+class CaseRecorder:
+  '''CaseRecorder wraps `solve_problem` to time each call.
+
+  It also keeps the pickled arguments of the `keep` slowest calls, so that they
+  can be replayed.
+
+  Args:
+    solve (function): The solution's solve_problem function.
+    keep (int): How many of the slowest cases to keep.
+
+  Attributes:
+    times (list): The time taken by each call, in order.
+
+  '''
+
+  def __init__(self, solve, keep):
+    self.times    = []
+    self._solve   = solve
+    self._keep    = keep
+    self._slowest = []
+
+  def __call__(self, *args):
+    try:
+      data = pickle.dumps(args)
+    except Exception:
+      data = None
+    start = time.perf_counter()
+    result = self._solve(*args)
+    elapsed = time.perf_counter() - start
+    index = len(self.times)
+    self.times.append(elapsed)
+    entry = (elapsed, index, data)
+    if len(self._slowest) < self._keep:
+      heapq.heappush(self._slowest, entry)
+    elif self._keep and elapsed > self._slowest[0][0]:
+      heapq.heapreplace(self._slowest, entry)
+    return result
+
+  def slowest(self):
+    '''Returns (time, index, pickled arguments) for the slowest cases, slowest first.'''
+    return sorted(self._slowest, reverse=True)
+
+
+class MemoryRecorder:
+  '''MemoryRecorder wraps `solve_problem` to measure each call's peak memory.
+
+  Between `start` and `stop` tracemalloc is running, and a profile hook
+  snapshots the traced memory whenever it grows by SNAPSHOT_GROWTH past the
+  last snapshot, so that the snapshot shows the largest allocations seen.
+
+  Args:
+    solve (function): The solution's solve_problem function.
+
+  Attributes:
+    peaks (list): The peak traced memory of each call, in bytes, including the
+      memory still held from before it such as the parsed input.
+    growths (list): How much each call's peak exceeded the memory at its start.
+    snapshot (tracemalloc.Snapshot): The last snapshot taken, or None.
+    snapshot_size (int): The traced memory when it was taken.
+    snapshot_case (int): The index of the call it was taken in.
+
+  '''
+
+  def __init__(self, solve):
+    self.peaks         = []
+    self.growths       = []
+    self.snapshot      = None
+    self.snapshot_size = 0
+    self.snapshot_case = None
+    self._solve        = solve
+
+  def start(self):
+    tracemalloc.start()
+
+  def stop(self):
+    sys.setprofile(None)
+    tracemalloc.stop()
+
+  def __call__(self, *args):
+    start, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    sys.setprofile(self._event)
+    try:
+      return self._solve(*args)
+    finally:
+      sys.setprofile(None)
+      _, peak = tracemalloc.get_traced_memory()
+      self.peaks.append(peak)
+      self.growths.append(peak - start)
+
+  def _event(self, frame, event, arg):
+    current, _ = tracemalloc.get_traced_memory()
+    if current > self.snapshot_size * SNAPSHOT_GROWTH:
+      self.snapshot      = tracemalloc.take_snapshot()
+      self.snapshot_size = current
+      self.snapshot_case = len(self.peaks)
+
+
+class StackTracer:
+  '''StackTracer measures the time spent in each call stack.
+
+  It uses `sys.setprofile`, so it sees every Python and built in function call,
+  and charges the time between two events to the stack that was running.
+
+  Attributes:
+    counts (Counter): Maps `outer;...;inner` stacks to seconds.
+
+  '''
+
+  def __init__(self):
+    self.counts = Counter()
+    self._stack = []
+    self._last  = None
+
+  def start(self):
+    self._stack = []
+    self._last  = time.perf_counter()
+    sys.setprofile(self._event)
+
+  def stop(self):
+    sys.setprofile(None)
+
+  def _event(self, frame, event, arg):
+    now = time.perf_counter()
+    if self._stack:
+      self.counts[';'.join(self._stack)] += now - self._last
+    if event == 'call':
+      code = frame.f_code
+      self._stack.append('{} ({}:{})'.format(code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+    elif event == 'c_call':
+      self._stack.append(getattr(arg, '__qualname__', None) or repr(arg))
+    elif self._stack and event in ('return', 'c_return', 'c_exception'):
+      self._stack.pop()
+    self._last = time.perf_counter()
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,186 @@
+'''Problems module.
+
+Helpers shared by the scripts that work on existing problem folders, i.e. the
+`<competition>/<year>/<round>/<problem>` folders created by `new_problem.py`.
+
+It knows how to find problem folders below a given folder and how to run a
+problem's solution on an input file while measuring wall time, CPU time and
+peak memory. A solution is usually `main.py`, but a folder without one can have
+a `main` source in a compiled language instead, such as `main.cpp`, which is
+built once through the build cache (see `build_cache.py`).
+'''
+
+import os, signal, subprocess, tempfile, threading, time
+from collections import namedtuple
+from pathlib import Path
+
+from build_cache import LANGUAGES, solution_command
+from new_problem import SCRIPT_PATH
+
+# Problem folders live exactly this many levels below the practice root.
+PROBLEM_DEPTH = 4
+
+# Solution extensions, in order of preference.
+SOURCE_SUFFIXES = ('.py',) + tuple(sorted(LANGUAGES))
+
+RunResult = namedtuple('RunResult', ['returncode', 'wall', 'cpu', 'maxrss', 'stdout', 'stderr', 'timed_out'])
+RunResult.__doc__ = '''The outcome of a single solution run.
+
+  Attributes:
+    returncode (int): Exit code of the process, negative if killed by a signal.
+    wall (float): Wall-clock time in seconds.
+    cpu (float): User plus system CPU time in seconds.
+    maxrss (int): Peak resident set size in kilobytes.
+    stdout (bytes): Everything the process wrote to stdout.
+    stderr (bytes): Everything the process wrote to stderr.
+    timed_out (bool): True if the process was killed for exceeding the timeout.
+
+'''
+
+def scope_depth(path):
+  '''Returns how many levels `path` is below the practice root.
+
+  Raises:
+    ValueError: If `path` is not inside the practice root.
+
+  '''
+  return len(Path(path).resolve().relative_to(SCRIPT_PATH).parts)
+
+def find_problems(path=None):
+  '''Finds all problem folders at or below `path`.
+
+  Args:
+    path (Path): A competition, year, round or problem folder, or the practice
+      root itself. Defaults to the current working directory.
+
+  Returns:
+    A sorted list of paths to folders containing a `main.py`, or a `main`
+    source in another language.
+
+  Raises:
+    ValueError: If `path` is not inside the practice root.
+
+  '''
+  path = Path(path or Path.cwd()).resolve()
+  depth = scope_depth(path)
+  if depth > PROBLEM_DEPTH:
+    raise ValueError('{} is not inside a problem folder.'.format(path))
+  return sorted(folder for folder, d in walk_tree(path, depth)
+                if d == PROBLEM_DEPTH and solution_file(folder) is not None)
+
+def solution_file(folder, name='main'):
+  '''Returns the solution called `name` in a folder, e.g. `main.py` or `main.cpp`.
+
+  Returns:
+    The path of the first of `SOURCE_SUFFIXES` that exists, or None.
+
+  '''
+  for suffix in SOURCE_SUFFIXES:
+    path = Path(folder) / (name + suffix)
+    if path.is_file():
+      return path
+  return None
+
+def walk_tree(path, depth):
+  '''Yields `(folder, depth)` for `path` and the tree folders below it.
+
+  Args:
+    path (Path): A folder in the practice tree.
+    depth (int): How many levels `path` is below the practice root.
+
+  '''
+  yield path, depth
+  if depth == PROBLEM_DEPTH:
+    return
+  for name in tree_children(path, depth):
+    yield from walk_tree(path / name, depth + 1)
+
+def tree_children(path, depth):
+  '''Returns the sorted names of the tree folders directly inside `path`.
+
+  Hidden folders, caches and the templates folder at the root are skipped.
+
+  Args:
+    path (Path): A folder in the practice tree, above problem level.
+    depth (int): How many levels `path` is below the practice root.
+
+  '''
+  try:
+    entries = list(os.scandir(str(path)))
+  except OSError:
+    return []
+  return sorted(entry.name for entry in entries
+                if not entry.name.startswith(('.', '_')) and entry.is_dir()
+                and not (depth == 0 and entry.name == 'templates'))
+
+def problem_name(path):
+  '''Returns the `competition/year/round/problem` name of a problem folder.'''
+  return Path(path).resolve().relative_to(SCRIPT_PATH).as_posix()
+
+def run_solution(main_path, input_path=None, timeout=None, args=None):
+  '''Runs a solution and measures it.
+
+  The process is reaped with `os.wait4`, so the CPU time and peak memory are
+  those of the solution alone. Sources in compiled languages are built first,
+  or taken from the build cache, and the build isn't part of the measurement.
+
+  Args:
+    main_path (Path): The solution file, Python or one of the build cache's
+      languages.
+    input_path (Path): File fed to the solution's stdin, or None for no input.
+    timeout (float): Seconds of wall time before the process is killed.
+    args (list): Command line arguments for the solution.
+
+  Returns:
+    A RunResult.
+
+  Raises:
+    CompileError: If a compiled solution fails to build.
+
+  '''
+  main_path = Path(main_path).resolve()
+  command = solution_command(main_path)
+  with _open_input(input_path) as stdin, _spool() as stdout, _spool() as stderr:
+    start = time.perf_counter()
+    p = subprocess.Popen(command + list(args or []), stdin=stdin, stdout=stdout,
+                         stderr=stderr, cwd=str(main_path.parent))
+    killed = threading.Event()
+    lock = threading.Lock()
+    killer = None
+    if timeout is not None:
+      killer = threading.Timer(timeout, _kill, [p, killed, lock])
+      killer.start()
+    # Wait for the exit without reaping, so the pid can't be reused before the
+    # killer sees that the process is gone.
+    os.waitid(os.P_PID, p.pid, os.WEXITED | os.WNOWAIT)
+    wall = time.perf_counter() - start
+    with lock:
+      _, status, usage = os.wait4(p.pid, 0)
+      # Tell Popen the process has been reaped so it doesn't try again.
+      p.returncode = os.waitstatus_to_exitcode(status)
+    if killer is not None:
+      killer.cancel()
+    stdout.seek(0)
+    stderr.seek(0)
+    return RunResult(p.returncode, wall, usage.ru_utime + usage.ru_stime, usage.ru_maxrss,
+                     stdout.read(), stderr.read(), killed.is_set())
+
+def _open_input(input_path):
+  if input_path is None:
+    return open(os.devnull, 'rb')
+  return open(str(input_path), 'rb')
+
+def _spool():
+  return tempfile.TemporaryFile()
+
+def _kill(p, killed, lock):
+  # A process that has already exited, in time, isn't killed or marked.
+  with lock:
+    if p.returncode is not None or os.waitid(os.P_PID, p.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT):
+      return
+    killed.set()
+    # Not p.kill(), whose poll() would reap the process under run_solution.
+    try:
+      os.kill(p.pid, signal.SIGKILL)
+    except OSError:
+      pass
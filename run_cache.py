@@ -0,0 +1,151 @@
+'''Run Cache module.
+
+A cache of solution runs, so that a solution whose source and input haven't
+changed isn't run again.
+
+Each run is keyed on a SHA-256 hash of the solution's source, its input, its
+command line arguments and the version and path of the Python interpreter
+running it, and for a compiled solution the compiler command and the resolved
+path, size and modification time of the compiler, so upgrading it reruns
+solutions. Entries are pickled RunResults, one file per key, in a `.run_cache`
+folder in the practice root. Reading an entry updates its modification time,
+and `evict` deletes the least recently used entries until the cache fits in
+its size cap.
+
+Only runs that finished in time are stored, since a timed out run says nothing
+about a longer timeout. Solutions which read other files, such as a module next
+to `main.py`, aren't rerun when only those files change.
+'''
+
+import hashlib, os, pickle, shutil, sys, tempfile
+from pathlib import Path
+
+from build_cache import compile_command
+from new_problem import SCRIPT_PATH
+from problems import run_solution
+
+CACHE_PATH = SCRIPT_PATH / '.run_cache'
+
+# The default size cap, in bytes.
+MAX_BYTES = 256 << 20
+
+# Files are hashed in chunks of this many bytes.
+CHUNK_SIZE = 1 << 20
+
+def cached_run(cache, main_path, input_path=None, timeout=None, args=None):
+  '''Runs a solution like `run_solution`, unless the cache has the result.
+
+  Args:
+    cache (RunCache): The cache to use, or None to always run.
+    main_path (Path): The solution file.
+    input_path (Path): File fed to the solution's stdin, or None for no input.
+    timeout (float): Seconds of wall time before the process is killed.
+    args (list): Command line arguments for the solution.
+
+  Returns:
+    A RunResult, and whether it came from the cache.
+
+  '''
+  if cache is None:
+    return run_solution(main_path, input_path, timeout, args), False
+  key = cache.key(main_path, input_path, args)
+  result = cache.get(key)
+  # A cached run slower than the timeout would have been killed.
+  if result is not None and (timeout is None or result.wall <= timeout):
+    return result, True
+  result = run_solution(main_path, input_path, timeout, args)
+  if not result.timed_out:
+    cache.put(key, result)
+  return result, False
+
+
+class RunCache:
+  '''RunCache stores RunResults on disk by content hash.
+
+  Args:
+    path (Path): The cache folder. It is created when the first entry is put.
+    max_bytes (int): The size cap used by `evict`.
+
+  '''
+
+  def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES):
+    self.path      = Path(path)
+    self.max_bytes = max_bytes
+
+  def key(self, main_path, input_path=None, args=None):
+    '''Returns the hex key for running `main_path` on `input_path`.'''
+    h = hashlib.sha256()
+    for part in (sys.version, sys.executable, '\0'.join(args or [])) + _compiler(main_path):
+      h.update(part.encode())
+      h.update(b'\0')
+    _hash_file(h, main_path)
+    if input_path is not None:
+      _hash_file(h, input_path)
+    return h.hexdigest()
+
+  def get(self, key):
+    '''Returns the cached RunResult for `key`, or None.'''
+    entry = self.path / key
+    try:
+      with open(str(entry), 'rb') as f:
+        result = pickle.load(f)
+      os.utime(str(entry))
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+      return None
+    return result
+
+  def put(self, key, result):
+    '''Stores a RunResult atomically, so concurrent readers never see half of it.'''
+    self.path.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(self.path), prefix='.tmp-')
+    try:
+      with os.fdopen(fd, 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+      os.replace(tmp, str(self.path / key))
+    except BaseException:
+      os.unlink(tmp)
+      raise
+
+  def evict(self):
+    '''Deletes the least recently used entries until the cache fits its cap.
+
+    Returns:
+      The number of entries deleted.
+
+    '''
+    try:
+      entries = [(e.stat().st_mtime_ns, e.stat().st_size, e.path) for e in os.scandir(str(self.path))
+                 if e.is_file() and not e.name.startswith('.')]
+    except OSError:
+      return 0
+    total = sum(size for _, size, _ in entries)
+    deleted = 0
+    for _, size, path in sorted(entries):
+      if total <= self.max_bytes:
+        break
+      try:
+        os.unlink(path)
+      except OSError:
+        continue
+      total -= size
+      deleted += 1
+    return deleted
+
+def _compiler(main_path):
+  # The compiler command and which compiler it runs, for a compiled solution.
+  suffix = Path(main_path).suffix
+  if suffix == '.py':
+    return ()
+  command = compile_command(suffix)
+  compiler = shutil.which(command[0])
+  if compiler is None:
+    return tuple(command)
+  compiler = os.path.realpath(compiler)
+  st = os.stat(compiler)
+  return tuple(command) + (compiler, str(st.st_size), str(st.st_mtime_ns))
+
+def _hash_file(h, path):
+  with open(str(path), 'rb') as f:
+    h.update('{}\0'.format(os.fstat(f.fileno()).st_size).encode())
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+      h.update(chunk)
@@ -0,0 +1,267 @@
+#!/usr/bin/python
+'''Stress script.
+
+This script looks for a small input on which a problem's `main.py` disagrees
+with a brute force solution. Besides `main.py` the problem folder needs:
+
+  * `brute.py`, a slow but obviously correct solution.
+  * `gen.py`, a random input generator, run as `python3 gen.py <seed> <n>`,
+    the same as for `bench.py`. Small sizes find most bugs.
+
+Any of the three can instead be a source in a compiled language, such as
+`main.cpp` or `brute.c`, which is built once before the seeds are checked and
+kept in the build cache (see `build_cache.py`). Python files are run through a
+warm fork server (see `forkserver.py`), so each run costs a fork rather than an
+interpreter startup, unless `--cold` is given.
+
+Seeds are checked in parallel in a process pool. The outputs are compared case
+by case on their `Case #i:` answers, ignoring whitespace, with floats matching
+within the tolerance of `checker.py`. When a seed fails (the answers differ, or
+`main.py` crashes while `brute.py` doesn't) the input is shrunk: first by
+looking for a smaller size that fails, then by cutting it down to the failing
+test case, and finally by deleting lines for as long as it keeps failing. The
+result is written to `stress.in` in the problem folder.
+
+Example::
+
+    $ python3 stress.py -s 0-9999 -n 8 CodeJam/2020/Round1A/Pascal
+
+'''
+
+import os, re, sys, tempfile
+from concurrent.futures import ProcessPoolExecutor
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+from build_cache import solution_command
+from checker import close
+from forkserver import run_warm
+from problems import run_solution, solution_file
+
+CASE = re.compile(rb'Case #(\d+):')
+
+# Seeds tried at each smaller size while shrinking.
+SHRINK_SEEDS = 32
+
+# Statuses of a checked input. Only FAIL and CRASH are counterexamples.
+OK, FAIL, CRASH, BRUTE_ERROR, GEN_ERROR = 'OK', 'FAIL', 'CRASH', 'BRUTE ERROR', 'GEN ERROR'
+
+def main(argv):
+  try:
+    opts = process_input(argv)
+    if opts == 'help':
+      print_usage(err=False)
+    failure = stress(**opts)
+  except Exception as e:
+    exit('{}'.format(e))
+  exit('', err=failure is not None)
+
+def print_usage(err=True):
+  exit('usage: stress.py [-h] [-s <seeds>] [-n <size>] [-j <jobs>] [-t <seconds>] [--cold] [<path>]', err=err)
+
+def exit(message, err=True):
+  if message:
+    print(message)
+  sys.exit(1 if err else 0)
+
+def process_input(argv):
+  try:
+    opts, args = getopt(argv, 'hs:n:j:t:', ['seeds=', 'size=', 'jobs=', 'timeout=', 'cold'])
+  except GetoptError:
+    print_usage()
+  if len(args) > 1:
+    print_usage()
+  result = {'path': Path(args[0]) if args else Path.cwd(), 'seeds': range(1000), 'size': 10,
+            'jobs': None, 'timeout': 10.0, 'cold': False}
+  try:
+    for opt, arg in opts:
+      if opt == '-h':
+        return 'help'
+      elif opt in ('-s', '--seeds'):
+        low, _, high = arg.partition('-')
+        result['seeds'] = range(int(low), int(high or low) + 1)
+      elif opt in ('-n', '--size'):
+        result['size'] = int(arg)
+      elif opt in ('-j', '--jobs'):
+        result['jobs'] = int(arg)
+      elif opt in ('-t', '--timeout'):
+        result['timeout'] = float(arg)
+      elif opt == '--cold':
+        result['cold'] = True
+  except ValueError as e:
+    raise ValueError('Seeds must be a number or a range like 0-999, and the other options numbers.') from e
+  return result
+
+def stress(path, seeds=range(1000), size=10, jobs=None, timeout=10.0, cold=False, out=sys.stdout):
+  '''Checks seeds until one fails, then shrinks and reports it.
+
+  Python solutions are run through fork servers, or as new processes if `cold`.
+
+  Returns:
+    The minimal failing Check, or None if every seed passed.
+
+  '''
+  path = Path(path).resolve()
+  for name in ('main', 'brute', 'gen'):
+    source = solution_file(path, name)
+    if source is None:
+      raise FileNotFoundError('No {}.py in {}.'.format(name, path))
+    # Build compiled sources once here rather than in every worker.
+    solution_command(source)
+  jobs = jobs or os.cpu_count()
+  run = run_solution if cold else run_warm
+  with ProcessPoolExecutor(max_workers=jobs) as pool:
+    failure = None
+    checked = 0
+    # Seeds are handed out in chunks so that each worker isn't waiting on IPC,
+    # and submitted in batches so that little work is left over after a failure.
+    chunksize = max(1, min(64, len(seeds) // (4 * jobs)))
+    batch = 4 * jobs * chunksize
+    for start in range(0, len(seeds), batch):
+      part = seeds[start:start + batch]
+      for check in pool.map(check_seed, [path] * len(part), part, [size] * len(part),
+                            [timeout] * len(part), [run] * len(part), chunksize=chunksize):
+        checked += 1
+        if check.status in (GEN_ERROR, BRUTE_ERROR):
+          raise RuntimeError('{} on seed {}:\n{}'.format(check.status, check.seed, check.detail))
+        if check.failed:
+          failure = check
+          break
+      if failure is not None:
+        break
+    if failure is None:
+      print('All {} seeds passed.'.format(checked), file=out)
+      return None
+    print('Seed {} failed ({}), shrinking...'.format(failure.seed, failure.detail), file=out, flush=True)
+    failure = shrink(path, failure, size, timeout, pool, run)
+  (path / 'stress.in').write_bytes(failure.data)
+  print('Minimal failing input ({}), written to stress.in:'.format(failure.detail), file=out)
+  print(failure.data.decode(errors='replace').rstrip('\n'), file=out)
+  for name, answer in (('main', failure.main_answer), ('brute', failure.brute_answer)):
+    print('{:<10}{}'.format(solution_file(path, name).name + ':', answer), file=out)
+  return failure
+
+def check_seed(path, seed, size, timeout, run=run_solution):
+  '''Generates the input for a seed and checks it, running programs with `run`.'''
+  result = run(solution_file(path, 'gen'), timeout=timeout, args=[str(seed), str(size)])
+  if result.returncode:
+    return Check(seed, size, b'', GEN_ERROR, result.stderr.decode(errors='replace'))
+  return check_input(path, result.stdout, timeout, seed, size, run)
+
+def check_input(path, data, timeout, seed=None, size=None, run=run_solution):
+  '''Runs both solutions on an input with `run` and compares their answers.'''
+  path = Path(path)
+  with tempfile.NamedTemporaryFile(suffix='.in') as f:
+    f.write(data)
+    f.flush()
+    brute = run(solution_file(path, 'brute'), f.name, timeout=timeout)
+    if brute.returncode:
+      return Check(seed, size, data, BRUTE_ERROR, brute.stderr.decode(errors='replace'))
+    main_path = solution_file(path)
+    main = run(main_path, f.name, timeout=timeout)
+  if main.returncode:
+    return Check(seed, size, data, CRASH, '{} exited with {}'.format(main_path.name, main.returncode),
+                 main_answer='\n'.join(main.stderr.decode(errors='replace').strip().splitlines()[-1:]))
+  expected, got = parse_cases(brute.stdout), parse_cases(main.stdout)
+  for case in sorted(set(expected) | set(got)):
+    if not _same(got.get(case), expected.get(case)):
+      return Check(seed, size, data, FAIL, 'Case #{} differs'.format(case), case,
+                   _text(got.get(case)), _text(expected.get(case)))
+  return Check(seed, size, data, OK)
+
+def parse_cases(output):
+  '''Maps each case number in an output to its answer, whitespace normalised.'''
+  parts = CASE.split(output)
+  return {int(parts[i]): b' '.join(parts[i + 1].split()) for i in range(1, len(parts), 2)}
+
+def _same(answer, expected):
+  if answer is None or expected is None:
+    return answer is expected
+  tokens, expected = answer.split(), expected.split()
+  return len(tokens) == len(expected) and all(map(close, tokens, expected))
+
+def _text(answer):
+  return '(missing)' if answer is None else answer.decode(errors='replace')
+
+def shrink(path, failure, size, timeout, pool, run=run_solution):
+  '''Returns a smaller failing Check, or `failure` itself.'''
+  # Look for the smallest size that fails, trying a batch of seeds per size.
+  for smaller in range(1, size):
+    seeds = range(failure.seed, failure.seed + SHRINK_SEEDS)
+    checks = pool.map(check_seed, [path] * len(seeds), seeds, [smaller] * len(seeds), [timeout] * len(seeds),
+                      [run] * len(seeds))
+    found = next((c for c in checks if c.failed), None)
+    if found is not None:
+      failure = found
+      break
+  failure = _isolate_case(path, failure, timeout, run) or failure
+  return _delete_lines(path, failure, timeout, run)
+
+def _isolate_case(path, failure, timeout, run):
+  # If the input is T followed by the same number of lines per test case, try
+  # the failing test case on its own.
+  lines = failure.data.decode(errors='replace').splitlines()
+  if failure.case is None or not lines or not lines[0].strip().isdigit():
+    return None
+  T = int(lines[0])
+  if T < 2 or (len(lines) - 1) % T:
+    return None
+  per_case = (len(lines) - 1) // T
+  start = 1 + (failure.case - 1) * per_case
+  data = '\n'.join(['1'] + lines[start:start + per_case]) + '\n'
+  check = check_input(path, data.encode(), timeout, failure.seed, failure.size, run)
+  return check if check.failed else None
+
+def _delete_lines(path, failure, timeout, run):
+  # Delta debugging on lines: try removing chunks, halving the chunk size
+  # whenever no chunk can be removed. The first line is kept, since it is
+  # usually the number of test cases.
+  lines = failure.data.splitlines(keepends=True)
+  head, body = lines[:1], lines[1:]
+  chunk = max(1, len(body) // 2)
+  while chunk >= 1 and body:
+    removed = False
+    i = 0
+    while i < len(body):
+      candidate = body[:i] + body[i + chunk:]
+      check = check_input(path, b''.join(head + candidate), timeout, failure.seed, failure.size, run)
+      if check.failed:
+        body, failure, removed = candidate, check, True
+      else:
+        i += chunk
+    if not removed:
+      chunk //= 2
+  return failure
+
+
+class Check:
+  '''The result of running both solutions on one input.
+
+  Attributes:
+    seed (int): The generator seed, or None.
+    size (int): The generator size, or None.
+    data (bytes): The input.
+    status (str): OK, FAIL, CRASH, BRUTE ERROR or GEN ERROR.
+    detail (str): What went wrong.
+    case (int): The first differing case number, for FAIL.
+    main_answer (str): main.py's answer for that case, or its error.
+    brute_answer (str): brute.py's answer for that case.
+
+  '''
+
+  def __init__(self, seed, size, data, status, detail='', case=None, main_answer=None, brute_answer=None):
+    self.seed         = seed
+    self.size         = size
+    self.data         = data
+    self.status       = status
+    self.detail       = detail
+    self.case         = case
+    self.main_answer  = main_answer
+    self.brute_answer = brute_answer
+
+  @property
+  def failed(self):
+    return self.status in (FAIL, CRASH)
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
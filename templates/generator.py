@@ -0,0 +1,237 @@
+'''Input generator template.
+
+`new_problem.py -g` copies this to the problem folder as `gen.py`. It writes a
+random input to stdout and is run as
+
+    python3 gen.py <seed> <n> [<T>]
+
+by `stress.py` and `bench.py`, which pass a seed and the size n, or by hand
+for a worst case input at the full constraints, e.g.
+
+    python3 gen.py 1 1000000 100 > tests.in
+
+Edit `write_case` for the problem. `Random` makes integer arrays,
+permutations, trees, graphs, grids and strings, vectorised with NumPy when it
+is installed, and otherwise with the `random` module's C loops, which is a few
+times slower. The same seed always gives the same input with the same backend.
+`Writer` formats numbers a chunk at a time, with NumPy a digit place at a time
+across the whole chunk, and writes large blocks, so inputs of hundreds of
+megabytes take seconds.
+'''
+import random, sys
+
+try:
+  import numpy as np
+except ImportError:
+  np = None
+
+CHUNK_SIZE = 1 << 16                                                          # Numbers formatted at a time.
+BLOCK_SIZE = 1 << 22                                                          # Bytes written at a time.
+
+def main(argv):
+  seed, n = int(argv[0]), int(argv[1])
+  T = int(argv[2]) if len(argv) > 2 else 1                                    # The number of test cases.
+  rng = Random(seed)
+  out = Writer(sys.stdout.buffer)
+  out.line(T)
+  for _ in range(T):
+    write_case(rng, out, n)
+  out.close()
+
+def write_case(rng, out, n):
+  out.line(n)                                                                 # For each test case, write the input as specified by the problem.
+  out.numbers(rng.ints(n, 1, 10 ** 9))
+
+
+class Random:
+  '''Random inputs from a seed, as NumPy arrays with NumPy and lists without.
+
+  Vertices are numbered from 1, and arrays of edges are returned as two
+  columns, which `Writer.rows` writes a pair per line.
+  '''
+
+  def __init__(self, seed):
+    if np is not None:
+      self.np = np.random.default_rng(seed)
+    else:
+      self.py = random.Random(seed)
+
+  def ints(self, n, low, high):
+    '''Returns n integers from low to high inclusive.'''
+    if np is not None:
+      return self.np.integers(low, high, size=n, endpoint=True)
+    # Uses random() * (high - low + 1), so only spans up to 2**53 are uniform.
+    return self.py.choices(range(low, high + 1), k=n)
+
+  def permutation(self, n, start=1):
+    '''Returns the numbers from start to start + n - 1 in random order.'''
+    if np is not None:
+      return self.np.permutation(n) + start
+    p = list(range(start, start + n))
+    self.py.shuffle(p)
+    return p
+
+  def tree(self, n, spread=None):
+    '''Returns the edges of a random tree on n vertices.
+
+    Each vertex is attached to one of the `spread` vertices before it, or to
+    any of them by default, so `spread=1` makes a path and small spreads make
+    deep trees. Vertices are then relabelled and the edges shuffled.
+    '''
+    if np is not None:
+      child = np.arange(1, n)
+      low = np.maximum(child - spread, 0) if spread else 0
+      parent = self.np.integers(low, child)
+      label = self.np.permutation(n) + 1
+      order = self.np.permutation(n - 1)
+      return label[child[order]], label[parent[order]]
+    randrange = self.py.randrange
+    parent = [randrange(max(i - spread, 0) if spread else 0, i) for i in range(1, n)]
+    label = self.permutation(n)
+    edges = [(label[i], label[p]) for i, p in enumerate(parent, 1)]
+    self.py.shuffle(edges)
+    return [u for u, _ in edges], [v for _, v in edges]
+
+  def graph(self, n, m, connected=True):
+    '''Returns the edges of a random simple graph with n vertices and m edges.
+
+    A connected graph is a random tree plus m - n + 1 random edges. Edges are
+    drawn until there are m distinct ones, so graphs close to complete are
+    slow.
+    '''
+    if m > n * (n - 1) // 2 or (connected and m < n - 1):
+      raise ValueError("No simple graph has {} vertices and {} edges.".format(n, m))
+    if np is not None:
+      keys = np.zeros(0, dtype=np.int64)
+      if connected:
+        u, v = self.tree(n)
+        keys = np.minimum(u, v) * (n + 1) + np.maximum(u, v)
+      while len(keys) < m:
+        need = m - len(keys)
+        u, v = self.ints(need + need // 8 + 16, 1, n), self.ints(need + need // 8 + 16, 1, n)
+        new = (np.minimum(u, v) * (n + 1) + np.maximum(u, v))[u != v]
+        # Keep the first draw of each new edge, in the order drawn.
+        new, first = np.unique(new, return_index=True)
+        new = new[np.argsort(first)]
+        keys = np.concatenate([keys, new[~np.isin(new, keys)][:need]])
+      keys = keys[self.np.permutation(m)]
+      return keys // (n + 1), keys % (n + 1)
+    edges = set()
+    if connected:
+      edges.update((min(u, v), max(u, v)) for u, v in zip(*self.tree(n)))
+    randint = self.py.randint
+    while len(edges) < m:
+      u, v = randint(1, n), randint(1, n)
+      if u != v:
+        edges.add((min(u, v), max(u, v)))
+    edges = sorted(edges)
+    self.py.shuffle(edges)
+    return [u for u, _ in edges], [v for _, v in edges]
+
+  def grid(self, rows, cols, alphabet=".#", weights=None):
+    '''Returns rows of cols characters from alphabet, as bytes.'''
+    table = alphabet.encode()
+    if np is not None:
+      p = None if weights is None else np.asarray(weights, dtype=float) / sum(weights)
+      cells = np.frombuffer(table, dtype=np.uint8)[self.np.choice(len(table), size=(rows, cols), p=p)]
+      return [row.tobytes() for row in cells]
+    return [bytes(self.py.choices(table, weights, k=cols)) for _ in range(rows)]
+
+  def string(self, n, alphabet="abcdefghijklmnopqrstuvwxyz"):
+    '''Returns n characters from alphabet, as bytes.'''
+    return self.grid(1, n, alphabet)[0]
+
+
+class Writer:
+  '''Writes lines to a binary file in blocks of about BLOCK_SIZE bytes.'''
+
+  def __init__(self, f):
+    self.f = f
+    self.parts = []
+    self.size = 0
+
+  def write(self, data):
+    self.parts.append(data)
+    self.size += len(data)
+    if self.size >= BLOCK_SIZE:
+      self.flush()
+
+  def line(self, *values):
+    '''Writes values separated by spaces, bytes as they are.'''
+    self.write(b" ".join(v if isinstance(v, bytes) else str(v).encode() for v in values) + b"\n")
+
+  def lines(self, lines):
+    '''Writes each of a list of bytes, such as a grid, on its own line.'''
+    for start in range(0, len(lines), CHUNK_SIZE):
+      self.write(b"\n".join(lines[start:start + CHUNK_SIZE]) + b"\n")
+
+  def numbers(self, values):
+    '''Writes numbers separated by spaces on one line.'''
+    for start in range(0, len(values), CHUNK_SIZE):
+      chunk = values[start:start + CHUNK_SIZE]
+      if _is_int_array(chunk):
+        text = _format([chunk], " ")
+      else:
+        text = " ".join(map(str, chunk)).encode() + b" "
+      # Every number is followed by a space, and the last one by the newline.
+      self.write(text if start + CHUNK_SIZE < len(values) else text[:-1])
+    self.write(b"\n")
+
+  def rows(self, *columns):
+    '''Writes a line per row of the columns, such as the two columns of edges.'''
+    for start in range(0, len(columns[0]), CHUNK_SIZE):
+      chunks = [c[start:start + CHUNK_SIZE] for c in columns]
+      if all(_is_int_array(c) for c in chunks):
+        self.write(_format(chunks, "\n"))
+      else:
+        self.write("\n".join(map(" ".join, zip(*(map(str, c) for c in chunks)))).encode() + b"\n")
+
+  def flush(self):
+    self.f.write(b"".join(self.parts))
+    self.parts = []
+    self.size = 0
+
+  def close(self):
+    self.flush()
+    self.f.flush()
+
+def _is_int_array(values):
+  return np is not None and isinstance(values, np.ndarray) and values.dtype.kind in "iu"
+
+def _format(columns, end):
+  '''Formats rows of integer arrays as text, with spaces between the columns and `end` after each row.
+
+  The digits of all the numbers are worked out a place at a time, into one
+  row of characters per place, and the leading zeros are masked out. This is
+  several times faster than `str` per number.
+  '''
+  parts = [_digits(c, " ") for c in columns[:-1]] + [_digits(columns[-1], end)]
+  chars = np.concatenate([c for c, _ in parts])
+  keep = np.concatenate([k for _, k in parts])
+  # Transposed, each number's characters are next to each other.
+  return chars.T.copy()[keep.T.copy()].tobytes()
+
+def _digits(values, sep):
+  x = np.abs(values)
+  width = len(str(x.max())) if len(x) else 1
+  if width < 10:
+    x = x.astype(np.int32)                                                    # Dividing int32s is much faster.
+  chars = np.empty((width + 2, len(x)), dtype=np.uint8)
+  chars[0] = ord("-")
+  chars[-1] = ord(sep)
+  digits = np.zeros(len(x), dtype=np.int8)
+  for place in range(width, 0, -1):
+    quotient = x // 10
+    chars[place] = x - quotient * 10
+    digits += x > 0
+    x = quotient
+  chars[1:-1] += ord("0")
+  keep = np.empty(chars.shape, dtype=bool)
+  keep[0] = values < 0
+  keep[-1] = True
+  # Zero still has one digit.
+  np.less_equal(np.arange(width, 0, -1)[:, None], np.maximum(digits, 1), out=keep[1:-1])
+  return chars, keep
+
+if __name__ == "__main__":
+  main(sys.argv[1:])
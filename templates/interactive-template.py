@@ -8,12 +8,17 @@ and you must determine the unique heavy ball in a limited number of guesses.
 
 At each iteration you must tell the tester which balls to weigh against
 each other, by printing two lists of indices separated by a #. The tester will
-then return an l if the first list is heavier, r if the second list is heavier, 
+then return an l if the first list is heavier, r if the second list is heavier,
 and b if they weight the same.
 
+All communication goes through `send`, `receive` and `ask`, which write bytes
+straight to stdout with one flush per message and read stdin as bytes, so
+responses are bytes (compare with b"l", and use `int(response)` for numbers).
+
 The tester typically uses "-1" to indicate malformed input or wrong answers. If
-the tester returns a "-1" it will send no more messages, so the onus is on the
-programmer to exit their program when this happens, or else it will hang.
+the tester returns a "-1" it will send no more messages, so the program must
+exit or it will hang. `receive` takes care of this, and also exits if the
+tester closes the connection.
 '''
 import sys
 
@@ -21,42 +26,40 @@ def solve(balls, guesses):
   start, end = 0, balls
   # Loop invariant: end - start is always a power of 3.
   while end - start > 1:
-    # Prepare the output.
     third = (end - start) // 3
-    left = [str(x) for x in range(start, start + third)]
-    right = [str(x) for x in range(start + third, start + 2 * third)]
-    # Print the output for the tester.
-    print(" ".join(left) + " # " + " ".join(right))
-    # Flush stdout.
-    sys.stdout.flush()
-    # Get new input.
-    s = input()
+    left = " ".join(map(str, range(start, start + third)))
+    right = " ".join(map(str, range(start + third, start + 2 * third)))
+    # Send the weighing to the tester and get its response.
+    s = ask(left + " # " + right)
     # Process response.
-    if s == "-1":
-      print("Something went wrong.")
-      sys.exit()
-    elif s == "r":
+    if s == b"r":
       start = start + third
-    elif s == "b":
+    elif s == b"b":
       start = start + 2 * third
     # New interval is a third the size of the old interval.
     end = start + third
   return start
 
 def main():
-  T = int(input())                                                            # First input is the test case, potentially with global parameters.
+  T = int(receive())                                                          # First input is the test case, potentially with global parameters.
   for _ in range(T):
-    balls, guesses = map(int, input().split())                                # Test cases might come with parameters, such as guess limits.
+    balls, guesses = map(int, receive().split())                              # Test cases might come with parameters, such as guess limits.
     heavy = solve(balls, guesses)
-    # Print.
-    print(heavy)
-    # Flush stdout.
-    sys.stdout.flush()
-    # Get new input.
-    s = input()
-    if s == "-1":
-      print("Wrong answer.")
-      sys.exit()
+    ask(str(heavy))                                                           # Send the answer; the tester says whether it was right.
+
+def send(line):
+  sys.stdout.buffer.write(line.encode() + b"\n" if isinstance(line, str) else line + b"\n") # One write and one flush per message.
+  sys.stdout.buffer.flush()
+
+def receive():
+  line = sys.stdin.buffer.readline()
+  if not line or line.strip() == b"-1":                                       # The tester has gone, or says the answer or input was wrong.
+    sys.exit()
+  return line.strip()
+
+def ask(line):
+  send(line)
+  return receive()
 
 
 if __name__ == "__main__":
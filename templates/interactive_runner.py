@@ -1,4 +1,4 @@
-# This code can be run as python2 or python3 in most systems.
+# This code needs python3 (3.5 or later) on Linux or macOS.
 #
 # This is a small program that runs two processes, connecting the stdin of each
 # one to the stdout of the other.
@@ -7,7 +7,7 @@
 # syntax) or not caught at all (e.g., if the judge or solution hangs).
 #
 # Run this as:
-# python interactive_runner.py <cmd_line_judge> -- <cmd_line_solution>
+# python interactive_runner.py [options] <cmd_line_judge> -- <cmd_line_solution>
 #
 # For example, if you have a testing_tool.py in python3 (that takes a single
 # integer as a command line parameter) to use as judge -- like one
@@ -23,8 +23,15 @@
 #   3. python interactive_runner.py python3 testing_tool.py 0 -- java solution
 #   4. python interactive_runner.py python3 testing_tool.py 0 -- my_solution.exe
 # Notice that the solution in cases 2, 3 and 4 would usually have a
-# compilation step before running, which you should run in your usual way
-# before using this tool.
+# compilation step before running. Instead of a command line, the judge or the
+# solution can be a single source file in a compiled language (.c, .cc, .cpp,
+# .go, .java or .rs), which is compiled once and run from a build cache:
+#   python interactive_runner.py python3 testing_tool.py 0 -- main.cpp
+# Builds are keyed on a hash of the compiler, its flags and the source, and
+# kept in ~/.cache/codejam-practice/builds (or below $XDG_CACHE_HOME), so an
+# unchanged source starts straight away in later runs and every pair of a sweep
+# uses the same build. The least recently used builds are deleted once the
+# cache holds more than 256MiB.
 #
 # This is only intended as a convenient tool to help contestants test solutions
 # locally. In particular, it is not identical to the implementation on our
@@ -37,86 +44,1084 @@
 #   lines prepended by "judge: " or "sol: " respectively (note, no
 #   synchronization is done so it's possible for the messages from both programs
 #   to overlap with each other).
+#
+# Both stderrs are read by a single event loop that never blocks, so a chatty
+# program can't stall on a full stderr pipe. What has been read is kept in a
+# bounded buffer per program until our own stderr can take it; if a program
+# writes faster than that, the oldest output is dropped and the number of
+# dropped bytes is reported at the end. Once both programs are done, whatever
+# our stderr still hasn't taken after a second is dropped too.
+#
+# In proxy mode the judge and solution aren't connected directly. Instead the
+# event loop forwards each line between them and reports message counts,
+# query->response round trip latencies, queries per test case and how long
+# each side spent before answering.
+#
+# A run can be recorded to a transcript, a text file with one line per
+# message: the seconds since the start, "J" for the judge or "S" for the
+# solution, and the message itself. Recording goes through the proxy. A
+# transcript can then be replayed to the solution without starting the judge:
+# each recorded judge message is sent as soon as the solution has sent every
+# message recorded before it, and the solution's messages are checked against
+# the transcript, so the solution runs exactly as it did with the judge but
+# without waiting for it. This makes it easy to profile or time the solution on
+# its own, e.g.
+#   python interactive_runner.py --record=t.txt python3 testing_tool.py 0 -- python3 my_solution.py
+#   python interactive_runner.py --replay=t.txt -- python3 my_solution.py
+#
+# Limits can be put on the solution's CPU time and address space (through
+# setrlimit) and on the wall-clock time of the whole run, after which both
+# programs are killed. Each program is reaped with wait4, which gives its CPU
+# time and peak memory, so the verdict at the end is a real Time Limit
+# Exceeded, Memory Limit Exceeded, Runtime Error, Wrong Answer or Correct.
+#
+# Sweep mode runs many judge/solution pairs at once, one per core, replacing
+# "{}" in the judge's command line with each seed (or appending the seed if
+# there is no "{}"). The programs' stderrs aren't shown; instead each pair's
+# verdict, return codes and timings are listed at the end, failures first,
+# with the end of the failing programs' stderr. For example:
+#   python interactive_runner.py --sweep=0-99 python3 testing_tool.py {} -- python3 my_solution.py
+#
+# Options:
+#   --stderr-buffer=<bytes>  size of each program's stderr buffer (default 1MiB).
+#   --time-limit=<seconds>   wall-clock limit for the whole run.
+#   --cpu-limit=<seconds>    CPU time limit for the solution.
+#   --memory-limit=<MiB>     address space limit for the solution.
+#   --sweep=<seeds>          comma separated seeds or inclusive ranges, e.g.
+#                            0-99 or 1,2,5-7.
+#   --jobs=<n>               pairs to run at once in sweep mode (default: one
+#                            per core).
+#   --proxy                  relay the exchange and report statistics.
+#   --new-case=<regex>       judge lines matching this start a new test case in
+#                            the proxy statistics, e.g. '^\d+ \d+$'. Implies
+#                            --proxy.
+#   --compile-flags=<flags>  extra compiler flags for compiled sources, e.g.
+#                            '-DLOCAL -g'.
+#   --record=<file>          write the exchange to a transcript. Implies
+#                            --proxy.
+#   --replay=<file>          play a transcript's judge messages to the
+#                            solution instead of running a judge. The judge's
+#                            command line may be left out.
+
+import getopt, hashlib, math, os, re, resource, select, selectors, shlex, shutil, signal, subprocess, sys, tempfile, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_STDERR_BUFFER = 1 << 20
+
+# Stderr kept per process for diagnosing crashes, on top of the ring buffer.
+STDERR_TAIL = 4096
+
+# Writes of at most this size to a pipe that polls as writable never block.
+WRITE_CHUNK = getattr(select, "PIPE_BUF", 512)
+
+# Once both programs have closed their stderr, buffered stderr that our own
+# stderr doesn't take within this many seconds is dropped.
+DRAIN_TIMEOUT = 1.0
+
+# Compiled sources are built here. build_cache.py in the practice repository
+# uses the same folder and keys.
+BUILD_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "codejam-practice", "builds")
+BUILD_CACHE_BYTES = 256 << 20
+
+# Compiler commands by source extension. Extra flags go before the output
+# option, and "{source}" and "{binary}" are replaced by the paths.
+LANGUAGES = {
+    ".c": ["gcc", "-std=c11", "-O2", "-o", "{binary}", "{source}", "-lm"],
+    ".cc": ["g++", "-std=c++17", "-O2", "-o", "{binary}", "{source}"],
+    ".cpp": ["g++", "-std=c++17", "-O2", "-o", "{binary}", "{source}"],
+    ".go": ["go", "build", "-o", "{binary}", "{source}"],
+    ".java": ["javac", "-d", "{binary}", "{source}"],
+    ".rs": ["rustc", "-O", "-o", "{binary}", "{source}"],
+}
+
+class RingBuffer(object):
+  """A FIFO byte buffer holding at most `capacity` bytes.
+
+  Appending to a full buffer drops the oldest bytes, which are counted in
+  `dropped`.
+  """
+
+  def __init__(self, capacity):
+    self.capacity = capacity
+    self.size = 0
+    self.dropped = 0
+    self._chunks = deque()
+
+  def __len__(self):
+    return self.size
+
+  def append(self, data):
+    if len(data) > self.capacity:
+      self.dropped += len(data) - self.capacity
+      data = data[-self.capacity:]
+    self._chunks.append(data)
+    self.size += len(data)
+    while self.size > self.capacity:
+      excess = self.size - self.capacity
+      head = self._chunks[0]
+      if len(head) <= excess:
+        self._chunks.popleft()
+        self.size -= len(head)
+        self.dropped += len(head)
+      else:
+        self._chunks[0] = head[excess:]
+        self.size -= excess
+        self.dropped += excess
+
+  def pop(self, n):
+    """Removes and returns up to `n` bytes from the front of the buffer."""
+    parts = []
+    while n > 0 and self._chunks:
+      head = self._chunks[0]
+      if len(head) <= n:
+        parts.append(self._chunks.popleft())
+      else:
+        parts.append(head[:n])
+        self._chunks[0] = head[n:]
+      n -= len(parts[-1])
+      self.size -= len(parts[-1])
+    return b"".join(parts)
+
+
+class EventLoop(object):
+  """A minimal selectors based loop.
+
+  Readers are callbacks that are called when their file descriptor is readable
+  and return False at end of file. Each iteration starts by calling the
+  `update` method of every client, which is where clients ask for write
+  readiness. Clients with a `timeout` method are updated again after at most
+  that many seconds. The loop ends when nothing is registered any more.
+  """
+
+  def __init__(self):
+    self.selector = selectors.DefaultSelector()
+    self.clients = []
+
+  def add_reader(self, fd, callback):
+    os.set_blocking(fd, False)
+    self.selector.register(fd, selectors.EVENT_READ, callback)
+
+  def set_writer(self, fd, callback):
+    """Calls `callback` whenever `fd` is writable, or stops if it is None."""
+    registered = fd in self.selector.get_map()
+    if callback is not None and not registered:
+      self.selector.register(fd, selectors.EVENT_WRITE, callback)
+    elif callback is None and registered:
+      self.selector.unregister(fd)
+
+  def run(self, deadline=None, on_deadline=None):
+    """Runs until done, calling `on_deadline` once at time `deadline`."""
+    while True:
+      for client in self.clients:
+        client.update()
+      if not self.selector.get_map():
+        break
+      timeout = None
+      if deadline is not None:
+        timeout = deadline - time.perf_counter()
+        if timeout <= 0:
+          on_deadline()
+          deadline = timeout = None
+      for client in self.clients:
+        wake = client.timeout() if hasattr(client, "timeout") else None
+        if wake is not None and (timeout is None or wake < timeout):
+          timeout = wake
+      for key, _ in self.selector.select(timeout):
+        if key.events & selectors.EVENT_READ:
+          if not key.data():
+            self.selector.unregister(key.fd)
+        else:
+          key.data()
+    self.selector.close()
+
+
+class Limits(object):
+  """Resource limits for a run. Each limit is None when there is no limit.
+
+  Attributes:
+    time: wall-clock seconds for the whole run.
+    cpu: CPU seconds for the solution.
+    memory: address space bytes for the solution.
+  """
+
+  def __init__(self, time=None, cpu=None, memory=None):
+    self.time = time
+    self.cpu = cpu
+    self.memory = memory
+
+  # Runs in the child between fork and exec.
+  def apply(self):
+    if self.cpu is not None:
+      # The soft limit sends SIGXCPU, the hard limit a second later SIGKILL.
+      seconds = int(math.ceil(self.cpu))
+      resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+    if self.memory is not None:
+      resource.setrlimit(resource.RLIMIT_AS, (self.memory, self.memory))
+
+
+class CompileError(Exception):
+  """Raised when a source can't be built. `output` is what the compiler said."""
+
+  def __init__(self, message, output=""):
+    super(CompileError, self).__init__(message)
+    self.output = output
+
+
+class BuildCache(object):
+  """A size-capped folder of builds, named by a hash of what they were built from."""
+
+  def __init__(self, path=BUILD_CACHE_PATH, max_bytes=BUILD_CACHE_BYTES):
+    self.path = path
+    self.max_bytes = max_bytes
 
-from __future__ import print_function
-import sys, subprocess, threading
+  @staticmethod
+  def compile_command(suffix, flags=()):
+    command = LANGUAGES[suffix]
+    i = command.index("{binary}") - 1
+    return command[:i] + list(flags) + command[i:]
 
-class SubprocessThread(threading.Thread):
+  def key(self, source, command):
+    h = hashlib.sha256()
+    for part in [shutil.which(command[0]) or command[0]] + command:
+      h.update(part.encode())
+      h.update(b"\0")
+    with open(source, "rb") as f:
+      h.update(f.read())
+    return h.hexdigest()
+
+  def build(self, source, flags=()):
+    """Builds `source` unless the cache has it already.
+
+    Returns:
+      The path of the build, and whether it came from the cache.
+    """
+    source = os.path.abspath(source)
+    suffix = os.path.splitext(source)[1]
+    command = self.compile_command(suffix, flags)
+    compiler = shutil.which(command[0])
+    if compiler is None:
+      raise CompileError("Can't build {}: {} is not installed.".format(
+          os.path.basename(source), command[0]))
+    build = os.path.join(self.path, self.key(source, command))
+    if os.path.exists(build):
+      os.utime(build)
+      return build, True
+    os.makedirs(self.path, exist_ok=True)
+    # Compile next to the builds, so the build can be moved into place
+    # atomically.
+    tmp = tempfile.mkdtemp(prefix=".build-", dir=self.path)
+    try:
+      output = os.path.join(tmp, "build")
+      if suffix == ".java":
+        os.mkdir(output)
+      args = [compiler] + [
+          arg.replace("{source}", source).replace("{binary}", output)
+          for arg in command[1:]]
+      p = subprocess.run(args, cwd=tmp, stdout=subprocess.PIPE,
+                         stderr=subprocess.STDOUT)
+      if p.returncode:
+        log = p.stdout.decode("UTF-8", "replace")
+        raise CompileError("{} failed to build {}:\n{}".format(
+            command[0], os.path.basename(source), log.rstrip()), log)
+      try:
+        os.replace(output, build)
+      except OSError:
+        # Another process put the same build in place first.
+        pass
+    finally:
+      shutil.rmtree(tmp, ignore_errors=True)
+    self.evict()
+    return build, False
+
+  def evict(self):
+    """Deletes the least recently used builds until the cache fits its cap."""
+    builds = []
+    for name in os.listdir(self.path):
+      if not name.startswith("."):
+        path = os.path.join(self.path, name)
+        builds.append((os.stat(path).st_mtime, _tree_size(path), path))
+    builds.sort()
+    total = sum(size for _, size, _ in builds)
+    for _, size, path in builds:
+      if total <= self.max_bytes:
+        break
+      if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+      else:
+        os.unlink(path)
+      total -= size
+
+
+def _tree_size(path):
+  if not os.path.isdir(path):
+    return os.stat(path).st_size
+  return sum(os.stat(os.path.join(root, name)).st_size
+             for root, _, names in os.walk(path) for name in names)
+
+
+def build_args(args, flags=(), cache=None, name="solution"):
+  """Replaces a single compiled source in a command line with its build.
+
+  Command lines that aren't a source file in one of the LANGUAGES, followed by
+  its arguments, are returned unchanged.
+  """
+  if not args or os.path.splitext(args[0])[1] not in LANGUAGES or (
+      not os.path.isfile(args[0])):
+    return args
+  source = args[0]
+  build, cached = (cache or BuildCache()).build(source, flags)
+  print("{} {}: {}".format("Cached" if cached else "Compiled", name, source),
+        file=sys.stderr)
+  if source.endswith(".java"):
+    # Java needs the file to be named after its public class.
+    run_args = ["java", "-cp", build,
+                os.path.splitext(os.path.basename(source))[0]]
+  else:
+    run_args = [build]
+  return run_args + args[1:]
+
+
+class Subprocess(object):
   def __init__(self,
                args,
                stdin_pipe=subprocess.PIPE,
                stdout_pipe=subprocess.PIPE,
-               stderr_prefix=None):
-    threading.Thread.__init__(self)
-    self.stderr_prefix = stderr_prefix
+               stderr_prefix=None,
+               stderr_buffer=DEFAULT_STDERR_BUFFER,
+               limits=None):
+    self.stderr_prefix = (stderr_prefix or "").encode("UTF-8")
+    self.stderr_buffer = RingBuffer(stderr_buffer)
+    self.stderr_tail = b""
+    self.return_code = None
+    self.error_message = None
+    self.killed = False
+    self.cpu_time = None
+    self.wall_time = None
+    self.peak_rss = None
+    self._new_line = True
+    self._start = time.perf_counter()
+    self._stderr_closed = None
     self.p = subprocess.Popen(
-        args, stdin=stdin_pipe, stdout=stdout_pipe, stderr=subprocess.PIPE)
+        args, stdin=stdin_pipe, stdout=stdout_pipe, stderr=subprocess.PIPE,
+        preexec_fn=limits.apply if limits is not None else None)
+
+  # Reads whatever is available on the process's stderr into the buffer,
+  # prepending lines with self.stderr_prefix. Returns False at end of file.
+  @property
+  def stderr_closed(self):
+    return self._stderr_closed is not None
 
-  def run(self):
+  # We are not reading by lines to guard against the case when EOL is never
+  # found in the stream.
+  def read_stderr(self):
     try:
-      self.pipeToStdErr(self.p.stderr)
-      self.return_code = self.p.wait()
-      self.error_message = None
+      chunk = os.read(self.p.stderr.fileno(), 1 << 16)
+    except BlockingIOError:
+      return True
+    if not chunk:
+      # Usually the process has just exited.
+      self._stderr_closed = time.perf_counter()
+      return False
+    self.stderr_tail = (self.stderr_tail + chunk)[-STDERR_TAIL:]
+    if self.stderr_prefix:
+      ends_line = chunk.endswith(b"\n")
+      if ends_line:
+        chunk = chunk[:-1]
+      chunk = chunk.replace(b"\n", b"\n" + self.stderr_prefix)
+      if self._new_line:
+        chunk = self.stderr_prefix + chunk
+      if ends_line:
+        chunk += b"\n"
+      self._new_line = ends_line
+    self.stderr_buffer.append(chunk)
+    return True
+
+  # Kills the process unless it has already exited. It is left for wait() to
+  # reap, which is why this doesn't go through Popen.
+  def kill(self):
+    try:
+      if os.waitid(os.P_PID, self.p.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT):
+        return
+      os.kill(self.p.pid, signal.SIGKILL)
+      self.killed = True
+    except OSError:
+      pass
+
+  # Reaps the process, killing it if it is still running at `deadline`.
+  def wait(self, deadline=None):
+    try:
+      while deadline is not None:
+        pid, status, usage = os.wait4(self.p.pid, os.WNOHANG)
+        if pid:
+          break
+        if time.perf_counter() >= deadline:
+          self.kill()
+          deadline = None
+        else:
+          time.sleep(0.01)
+      else:
+        pid, status, usage = os.wait4(self.p.pid, 0)
     except (SystemError, OSError):
       self.return_code = -1
       self.error_message = "The process crashed or produced too much output."
+      return
+    self.wall_time = (self._stderr_closed or time.perf_counter()) - self._start
+    if os.WIFSIGNALED(status):
+      self.return_code = -os.WTERMSIG(status)
+    else:
+      self.return_code = os.WEXITSTATUS(status)
+    # Tell Popen the process has been reaped so it doesn't try again.
+    self.p.returncode = self.return_code
+    self.cpu_time = usage.ru_utime + usage.ru_stime
+    # Linux reports kilobytes, macOS bytes.
+    self.peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
 
-  # Reads bytes from the stream and writes them to sys.stderr prepending lines
-  # with self.stderr_prefix.
-  # We are not reading by lines to guard against the case when EOL is never
-  # found in the stream.
-  def pipeToStdErr(self, stream):
-    new_line = True
-    while True:
-      chunk = stream.readline(1024)
-      if not chunk:
-        return
-      chunk = chunk.decode("UTF-8")
-      if new_line and self.stderr_prefix:
-        chunk = self.stderr_prefix + chunk
-        new_line = False
-      sys.stderr.write(chunk)
-      if chunk.endswith("\n"):
-        new_line = True
+
+class StderrWriter(object):
+  """Copies the processes' buffered stderr to our own stderr without blocking.
+
+  If our stderr can't be polled (e.g. it is a regular file) writes go straight
+  through, since they can't block for long anyway.
+  """
+
+  def __init__(self, processes, loop):
+    self.processes = processes
+    self.loop = loop
+    self._next = 0
+    self._drain_deadline = None
+    try:
+      self.fd = sys.stderr.fileno()
       sys.stderr.flush()
+      loop.set_writer(self.fd, self.write_some)
+      loop.set_writer(self.fd, None)
+      self.pollable = True
+    except (AttributeError, OSError, ValueError):
+      self.pollable = False
+
+  def pending(self):
+    return any(len(proc.stderr_buffer) for proc in self.processes)
+
+  def update(self):
+    if not self.pollable:
+      self.flush()
+      return
+    if self.pending() and all(proc.stderr_closed for proc in self.processes):
+      # Don't wait forever on a stderr nobody reads once the programs are done.
+      now = time.perf_counter()
+      if self._drain_deadline is None:
+        self._drain_deadline = now + DRAIN_TIMEOUT
+      elif now >= self._drain_deadline:
+        self.drop()
+    self.loop.set_writer(self.fd, self.write_some if self.pending() else None)
+
+  def timeout(self):
+    if self._drain_deadline is None or not self.pending():
+      return None
+    return max(0.0, self._drain_deadline - time.perf_counter())
+
+  def drop(self):
+    for proc in self.processes:
+      proc.stderr_buffer.dropped += len(proc.stderr_buffer.pop(proc.stderr_buffer.size))
+
+  # Writes one chunk, taking turns between the processes.
+  def write_some(self):
+    for i in range(len(self.processes)):
+      proc = self.processes[(self._next + i) % len(self.processes)]
+      if len(proc.stderr_buffer):
+        self._next = (self._next + i + 1) % len(self.processes)
+        os.write(self.fd, proc.stderr_buffer.pop(WRITE_CHUNK))
+        return
+
+  def flush(self):
+    for proc in self.processes:
+      data = proc.stderr_buffer.pop(proc.stderr_buffer.size)
+      if data:
+        out = getattr(sys.stderr, "buffer", None)
+        if out is not None:
+          out.write(data)
+        else:
+          sys.stderr.write(data.decode("UTF-8", "replace"))
+    sys.stderr.flush()
+
+
+class Proxy(object):
+  """Relays one program's stdout to the other's stdin a line at a time.
+
+  Complete lines are reported to `stats` when they are read. Unlike stderr,
+  nothing is ever dropped, and end of file is passed on once everything has
+  been written.
+  """
+
+  def __init__(self, source, dest, direction, stats, loop):
+    self.source = source
+    self.dest = dest
+    self.direction = direction
+    self.stats = stats
+    self.loop = loop
+    self.buffer = bytearray()
+    self.partial = b""
+    self.eof = False
+    loop.add_reader(source.fileno(), self.read)
+    os.set_blocking(dest.fileno(), False)
+
+  def read(self):
+    try:
+      chunk = os.read(self.source.fileno(), 1 << 16)
+    except BlockingIOError:
+      return True
+    if not chunk:
+      self.eof = True
+      return False
+    now = time.perf_counter()
+    self.buffer += chunk
+    lines = (self.partial + chunk).split(b"\n")
+    self.partial = lines.pop()
+    for line in lines:
+      self.stats.message(self.direction, line, now)
+    return True
+
+  def write(self):
+    try:
+      written = os.write(self.dest.fileno(), self.buffer)
+    except BlockingIOError:
+      return
+    except OSError:
+      # The reader has gone away, so the rest can never be delivered.
+      written = len(self.buffer)
+    del self.buffer[:written]
+
+  def update(self):
+    if self.dest.closed:
+      return
+    self.loop.set_writer(self.dest.fileno(), self.write if self.buffer else None)
+    if self.eof and not self.buffer:
+      self.dest.close()
+
+
+class ExchangeStats(object):
+  """Statistics about the messages passing through the proxies.
+
+  Time between two consecutive messages is charged to the side that sent the
+  second one, since that is the side that was working. A query's round trip is
+  the time from a solution message to the judge's next message.
+  """
+
+  SOLUTION = "sol"
+  JUDGE = "judge"
+
+  def __init__(self, new_case=None, transcript=None):
+    self.new_case = re.compile(new_case) if new_case else None
+    self.transcript = transcript
+    self.start = time.perf_counter()
+    self.messages = {self.SOLUTION: 0, self.JUDGE: 0}
+    self.busy = {self.SOLUTION: 0.0, self.JUDGE: 0.0}
+    self.latencies = []
+    self.queries_per_case = [0]
+    self._last = self.start
+    self._query_time = None
+
+  def message(self, direction, line, now):
+    if self.transcript is not None:
+      self.transcript.write(direction, line, now - self.start)
+    self.messages[direction] += 1
+    self.busy[direction] += now - self._last
+    self._last = now
+    if direction == self.SOLUTION:
+      self.queries_per_case[-1] += 1
+      if self._query_time is None:
+        self._query_time = now
+    else:
+      if self._query_time is not None:
+        self.latencies.append(now - self._query_time)
+        self._query_time = None
+      if self.new_case and self.new_case.search(line.decode("UTF-8", "replace")):
+        self.queries_per_case.append(0)
+
+  def report(self):
+    print("Messages from solution: {}, from judge: {}".format(
+        self.messages[self.SOLUTION], self.messages[self.JUDGE]))
+    print("Time before solution messages: {:.3f}s, before judge messages: {:.3f}s".format(
+        self.busy[self.SOLUTION], self.busy[self.JUDGE]))
+    if self.new_case:
+      # The first bucket holds queries before the first test case started.
+      cases = self.queries_per_case[1:]
+      print("Queries per test case:", " ".join(str(q) for q in cases) or "none")
+    if not self.latencies:
+      return
+    latencies = sorted(self.latencies)
+    def percentile(p):
+      return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+    print("Round trips: {}, p50 {}, p90 {}, p99 {}, max {}".format(
+        len(latencies), format_duration(percentile(0.5)),
+        format_duration(percentile(0.9)), format_duration(percentile(0.99)),
+        format_duration(latencies[-1])))
+    # Histogram with power of two buckets, starting at 16us.
+    buckets = {}
+    for latency in latencies:
+      bucket = 16e-6
+      while latency >= bucket * 2:
+        bucket *= 2
+      buckets[bucket] = buckets.get(bucket, 0) + 1
+    width = max(buckets.values())
+    for bucket in sorted(buckets):
+      count = buckets[bucket]
+      print("  <{:>8} {:>7} {}".format(format_duration(bucket * 2), count,
+                                       "#" * max(1, 40 * count // width)))
+
+
+# Transcript tags of each side.
+TRANSCRIPT_TAGS = {ExchangeStats.JUDGE: b"J", ExchangeStats.SOLUTION: b"S"}
+
+
+class TranscriptWriter(object):
+  """Writes messages to a transcript as "<seconds> <J or S> <message>" lines."""
+
+  def __init__(self, path, judge_args, sol_args):
+    self.f = open(path, "wb")
+    self.f.write("# {} -- {}\n".format(
+        " ".join(shlex.quote(a) for a in judge_args),
+        " ".join(shlex.quote(a) for a in sol_args)).encode("UTF-8"))
+
+  def write(self, direction, line, seconds):
+    self.f.write(b"%.6f %s %s\n" % (seconds, TRANSCRIPT_TAGS[direction], line))
+
+  def close(self):
+    self.f.close()
+
+
+def read_transcript(path):
+  """Returns a transcript's messages as (direction, line) pairs."""
+  directions = {tag: direction for direction, tag in TRANSCRIPT_TAGS.items()}
+  messages = []
+  with open(path, "rb") as f:
+    for number, line in enumerate(f, 1):
+      if line.startswith(b"#"):
+        continue
+      parts = line[:-1].split(b" ", 2) if line.endswith(b"\n") else line.split(b" ", 2)
+      if len(parts) < 3 or parts[1] not in directions:
+        raise ValueError("Line {} of {} isn't a transcript message.".format(
+            number, path))
+      messages.append((directions[parts[1]], parts[2]))
+  return messages
+
+
+class Replayer(object):
+  """Plays the judge's side of a transcript to the solution.
+
+  Recorded judge messages are written as soon as the solution has sent every
+  message recorded before them. The solution's messages are compared with the
+  transcript, and after the first difference nothing more is sent and the
+  solution's stdin is closed, as if the judge had given up.
+  """
+
+  def __init__(self, messages, t_sol, stats, loop):
+    self.messages = deque(messages)
+    self.judge_messages = sum(1 for d, _ in messages if d == ExchangeStats.JUDGE)
+    self.sent = 0
+    self.received = 0
+    self.divergence = None
+    self.source = t_sol.p.stdout
+    self.dest = t_sol.p.stdin
+    self.stats = stats
+    self.loop = loop
+    self.buffer = bytearray()
+    self.partial = b""
+    loop.add_reader(self.source.fileno(), self.read)
+    os.set_blocking(self.dest.fileno(), False)
+    self.feed()
+
+  @property
+  def missing(self):
+    """The number of recorded solution messages that weren't sent."""
+    return sum(1 for d, _ in self.messages if d == ExchangeStats.SOLUTION)
+
+  # Queues the judge messages that are due.
+  def feed(self):
+    now = time.perf_counter()
+    while (self.divergence is None and self.messages and
+           self.messages[0][0] == ExchangeStats.JUDGE):
+      line = self.messages.popleft()[1]
+      self.buffer += line + b"\n"
+      self.sent += 1
+      self.stats.message(ExchangeStats.JUDGE, line, now)
+
+  def check(self, line):
+    self.received += 1
+    if self.divergence is not None:
+      return
+    if not self.messages:
+      self.divergence = "The solution sent message {} ({}) after the end of the transcript.".format(
+          self.received, _shorten(line))
+    elif self.messages[0][1] != line:
+      self.divergence = "The solution's message {} ({}) differs from the transcript's ({}).".format(
+          self.received, _shorten(line), _shorten(self.messages[0][1]))
+    else:
+      self.messages.popleft()
+      self.feed()
+
+  def read(self):
+    try:
+      chunk = os.read(self.source.fileno(), 1 << 16)
+    except BlockingIOError:
+      return True
+    now = time.perf_counter()
+    if not chunk:
+      if self.partial:
+        self.stats.message(ExchangeStats.SOLUTION, self.partial, now)
+        self.check(self.partial)
+      return False
+    lines = (self.partial + chunk).split(b"\n")
+    self.partial = lines.pop()
+    for line in lines:
+      self.stats.message(ExchangeStats.SOLUTION, line, now)
+      self.check(line)
+    return True
+
+  def write(self):
+    try:
+      written = os.write(self.dest.fileno(), self.buffer)
+    except BlockingIOError:
+      return
+    except OSError:
+      written = len(self.buffer)
+    del self.buffer[:written]
+
+  def update(self):
+    if self.dest.closed:
+      return
+    self.loop.set_writer(self.dest.fileno(), self.write if self.buffer else None)
+    done = self.divergence is not None or self.sent == self.judge_messages
+    if done and not self.buffer:
+      self.dest.close()
+
+
+def _shorten(line, width=40):
+  text = line.decode("UTF-8", "replace")
+  return repr(text if len(text) <= width else text[:width - 3] + "...")
+
+
+def format_duration(seconds):
+  if seconds < 1e-3:
+    return "{:.0f}us".format(seconds * 1e6)
+  if seconds < 1:
+    return "{:.1f}ms".format(seconds * 1e3)
+  return "{:.2f}s".format(seconds)
+
+
+def run_event_loop(processes, relays=(), deadline=None, quiet=False,
+                   replay=None):
+  """Pumps stderrs and relays until everything is closed, then reaps.
+
+  Args:
+    processes: the Subprocess objects.
+    relays: (source, dest, direction, stats) tuples, each of which becomes a
+      Proxy.
+    deadline: time.perf_counter() value at which all processes are killed.
+    quiet: if True stderr is only kept in the processes' ring buffers.
+    replay: a (messages, t_sol, stats) tuple, which becomes a Replayer.
+
+  Returns:
+    The Replayer, or None.
+  """
+  def kill_all():
+    for proc in processes:
+      proc.kill()
+
+  loop = EventLoop()
+  for proc in processes:
+    loop.add_reader(proc.p.stderr.fileno(), proc.read_stderr)
+  if not quiet:
+    loop.clients.append(StderrWriter(processes, loop))
+  for source, dest, direction, stats in relays:
+    loop.clients.append(Proxy(source, dest, direction, stats, loop))
+  replayer = None
+  if replay is not None:
+    replayer = Replayer(replay[0], replay[1], replay[2], loop)
+    loop.clients.append(replayer)
+  loop.run(deadline, kill_all)
+  for proc in processes:
+    proc.wait(deadline)
+  return replayer
+
+
+def parse_args(argv):
+  opts, args = getopt.getopt(argv, "", [
+      "stderr-buffer=", "proxy", "new-case=", "time-limit=", "cpu-limit=",
+      "memory-limit=", "sweep=", "jobs=", "compile-flags=", "record=",
+      "replay="])
+  limits = Limits()
+  options = {"stderr_buffer": DEFAULT_STDERR_BUFFER, "proxy": False,
+             "new_case": None, "limits": limits, "sweep": None, "jobs": None,
+             "compile_flags": [], "record": None, "replay": None}
+  for opt, arg in opts:
+    if opt == "--record":
+      options["proxy"] = True
+      options["record"] = arg
+    elif opt == "--replay":
+      options["replay"] = arg
+    elif opt == "--compile-flags":
+      options["compile_flags"] = shlex.split(arg)
+    elif opt == "--sweep":
+      options["sweep"] = parse_seeds(arg)
+    elif opt == "--jobs":
+      options["jobs"] = int(arg)
+    elif opt == "--time-limit":
+      limits.time = float(arg)
+    elif opt == "--cpu-limit":
+      limits.cpu = float(arg)
+    elif opt == "--memory-limit":
+      limits.memory = int(float(arg) * (1 << 20))
+    elif opt == "--stderr-buffer":
+      options["stderr_buffer"] = int(arg)
+    elif opt == "--proxy":
+      options["proxy"] = True
+    elif opt == "--new-case":
+      options["proxy"] = True
+      options["new_case"] = arg
+  assert options["sweep"] is None or not (options["record"] or options["replay"]), (
+      "A sweep can't be recorded or replayed.")
+  if options["replay"] is not None and "--" not in args:
+    return options, [], args
+  assert args.count("--") == 1, (
+      "There should be exactly one instance of '--' in the command line.")
+  sep_index = args.index("--")
+  return options, args[:sep_index], args[sep_index + 1:]
+
+
+def parse_seeds(arg):
+  """Parses "0-3,7" into ["0", "1", "2", "3", "7"]."""
+  seeds = []
+  for item in arg.split(","):
+    match = re.match(r"^(-?\d+)-(-?\d+)$", item)
+    if match:
+      low, high = int(match.group(1)), int(match.group(2))
+      seeds.extend(str(seed) for seed in range(low, high + 1))
+    elif item:
+      seeds.append(item)
+  return seeds
+
+
+def run(judge_args, sol_args, stderr_buffer=DEFAULT_STDERR_BUFFER, proxy=False,
+        new_case=None, limits=None, quiet=False, record=None, replay=None):
+  """Runs the judge and solution together.
+
+  With `record`, the exchange is relayed by the proxy and written to that
+  transcript file. With `replay`, the judge isn't run, and a Replayer plays
+  that transcript's judge messages instead.
+
+  Returns:
+    The judge Subprocess (or the Replayer), the solution Subprocess, and the
+    ExchangeStats if running in proxy or replay mode, otherwise None.
+  """
+  limits = limits or Limits()
+  proxy = proxy or record is not None
+  deadline = None
+  if limits.time is not None:
+    deadline = time.perf_counter() + limits.time
+  # A bad transcript is reported before anything starts.
+  messages = read_transcript(replay) if replay is not None else None
+  t_sol = Subprocess(sol_args, stderr_prefix="  sol: ",
+                     stderr_buffer=stderr_buffer, limits=limits)
+  transcript = None
+  if record is not None:
+    transcript = TranscriptWriter(record, judge_args, sol_args)
+  stats = None
+  if proxy or replay is not None:
+    stats = ExchangeStats(new_case, transcript)
+  try:
+    if replay is not None:
+      t_judge = run_event_loop([t_sol], deadline=deadline, quiet=quiet,
+                               replay=(messages, t_sol, stats))
+    elif not proxy:
+      t_judge = Subprocess(
+          judge_args,
+          stdin_pipe=t_sol.p.stdout,
+          stdout_pipe=t_sol.p.stdin,
+          stderr_prefix="judge: ",
+          stderr_buffer=stderr_buffer)
+      # The judge holds the other ends now; closing ours lets each program see
+      # EOF when the other one exits.
+      t_sol.p.stdin.close()
+      t_sol.p.stdout.close()
+      run_event_loop([t_judge, t_sol], deadline=deadline, quiet=quiet)
+    else:
+      t_judge = Subprocess(judge_args, stderr_prefix="judge: ",
+                           stderr_buffer=stderr_buffer)
+      run_event_loop([t_judge, t_sol], [
+          (t_sol.p.stdout, t_judge.p.stdin, ExchangeStats.SOLUTION, stats),
+          (t_judge.p.stdout, t_sol.p.stdin, ExchangeStats.JUDGE, stats)],
+          deadline, quiet)
+  finally:
+    if transcript is not None:
+      transcript.close()
+  return t_judge, t_sol, stats
+
+
+# Stderr messages that mean an allocation failed.
+MEMORY_ERRORS = (b"MemoryError", b"std::bad_alloc", b"OutOfMemoryError",
+                 b"out of memory")
+
+
+def verdict(t_judge, t_sol, limits=None):
+  """Returns the verdict for a finished run, along with an explanation.
+
+  In replay mode `t_judge` is the Replayer, and the solution's messages
+  differing from the transcript is a Wrong Answer.
+  """
+  limits = limits or Limits()
+  replay = isinstance(t_judge, Replayer)
+  if t_sol.killed:
+    return ("Time Limit Exceeded",
+            "The solution was stopped after the {}s wall-clock limit.".format(
+                limits.time))
+  if t_sol.error_message:
+    # wait() failed, so there are no CPU time or memory figures to check.
+    return ("Runtime Error", t_sol.error_message)
+  if replay and t_judge.divergence:
+    return ("Wrong Answer", t_judge.divergence)
+  # The soft CPU limit sends SIGXCPU and the hard one SIGKILL, but SIGKILL can
+  # also come from the OOM killer or by hand, so it only counts with the time.
+  if limits.cpu is not None and (t_sol.cpu_time >= limits.cpu or
+                                 t_sol.return_code == -signal.SIGXCPU):
+    return ("Time Limit Exceeded",
+            "The solution used {:.2f}s of CPU time, over the {}s limit.".format(
+                t_sol.cpu_time, limits.cpu))
+  if t_sol.return_code and limits.memory is not None and (
+      t_sol.peak_rss >= limits.memory or
+      any(e in t_sol.stderr_tail for e in MEMORY_ERRORS)):
+    return ("Memory Limit Exceeded",
+            "The solution failed to allocate memory under the {}MiB limit.".format(
+                limits.memory >> 20))
+  if t_sol.return_code:
+    return ("Runtime Error",
+            "A solution finishing with exit code other than 0 is interpreted "
+            "as a Runtime Error.")
+  if replay:
+    if t_judge.missing:
+      return ("Wrong Answer",
+              "The solution finished without sending the last {} recorded "
+              "messages.".format(t_judge.missing))
+    return ("Correct",
+            "A solution sending the recorded messages and finishing with exit "
+            "code 0 is interpreted as Correct.")
+  if t_judge.killed:
+    return ("Time Limit Exceeded",
+            "The judge was stopped after the {}s wall-clock limit.".format(
+                limits.time))
+  if t_judge.return_code:
+    return ("Wrong Answer",
+            "A solution finishing with exit code 0 and a judge finishing with "
+            "exit code other than 0 are interpreted as a Wrong Answer.")
+  return ("Correct",
+          "A solution and judge both finishing with exit code 0 are "
+          "interpreted as Correct.")
+
+
+def report(t_judge, t_sol, stats=None, limits=None):
+  # Print an empty line to handle the case when stderr doesn't print EOL.
+  print()
+  for name, t in (("Judge", t_judge), ("Solution", t_sol)):
+    if isinstance(t, Replayer):
+      print("Judge messages replayed: {} of {}".format(t.sent, t.judge_messages))
+      continue
+    print(name, "return code:", t.return_code)
+    if t.error_message:
+      print(name, "error message:", t.error_message)
+    if t.cpu_time is not None:
+      print("{} wall time: {:.3f}s, CPU time: {:.3f}s, peak RSS: {:.1f}MiB".format(
+          name, t.wall_time, t.cpu_time, t.peak_rss / (1 << 20)))
+    if t.stderr_buffer.dropped:
+      print(name, "stderr bytes dropped:", t.stderr_buffer.dropped)
+  if stats is not None:
+    stats.report()
+  result, explanation = verdict(t_judge, t_sol, limits)
+  print("Verdict:", result)
+  print(explanation)
+
+
+class SweepResult(object):
+  """The outcome of one judge/solution pair in a sweep."""
+
+  def __init__(self, seed, t_judge, t_sol, limits):
+    self.seed = seed
+    self.verdict = verdict(t_judge, t_sol, limits)[0]
+    self.judge_return_code = t_judge.return_code
+    self.sol_return_code = t_sol.return_code
+    self.wall_time = t_sol.wall_time
+    self.cpu_time = t_sol.cpu_time
+    self.peak_rss = t_sol.peak_rss
+    self.judge_stderr = t_judge.stderr_tail
+    self.sol_stderr = t_sol.stderr_tail
+
+  @property
+  def failed(self):
+    return self.verdict != "Correct"
+
+
+def seed_args(judge_args, seed):
+  """Puts `seed` in place of "{}" in the judge's arguments, or at the end."""
+  if any("{}" in arg for arg in judge_args):
+    return [arg.replace("{}", seed) for arg in judge_args]
+  return judge_args + [seed]
+
+
+def run_seed(judge_args, sol_args, seed, options):
+  t_judge, t_sol, _ = run(seed_args(judge_args, seed), sol_args, quiet=True,
+                          **options)
+  return SweepResult(seed, t_judge, t_sol, options.get("limits"))
+
+
+def sweep(judge_args, sol_args, seeds, jobs=None, **options):
+  """Runs a pair per seed, `jobs` at a time, and returns their SweepResults."""
+  options["proxy"] = False
+  with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+    futures = [pool.submit(run_seed, judge_args, sol_args, seed, options)
+               for seed in seeds]
+    return [future.result() for future in futures]
+
+
+def report_sweep(results, tail_lines=5):
+  results = sorted(results, key=lambda r: not r.failed)
+  print("{:>10} {:<22} {:>5} {:>5} {:>9} {:>9} {:>9}".format(
+      "seed", "verdict", "judge", "sol", "wall", "cpu", "rss"))
+  for r in results:
+    if r.cpu_time is None:
+      usage = "{:>9} {:>9} {:>9}".format("-", "-", "-")
+    else:
+      usage = "{:>8.3f}s {:>8.3f}s {:>7.1f}MiB".format(
+          r.wall_time, r.cpu_time, r.peak_rss / (1 << 20))
+    print("{:>10} {:<22} {:>5} {:>5} {}".format(
+        r.seed, r.verdict, r.judge_return_code, r.sol_return_code, usage))
+  failed = [r for r in results if r.failed]
+  for r in failed:
+    for name, tail in (("judge", r.judge_stderr), ("sol", r.sol_stderr)):
+      lines = tail.decode("UTF-8", "replace").splitlines()[-tail_lines:]
+      for line in lines:
+        print("{:>10} {:>5}: {}".format(r.seed, name, line))
+  print("{} of {} seeds failed.".format(len(failed), len(results)))
+
+
+def main(argv):
+  options, judge_args, sol_args = parse_args(argv)
+  seeds, jobs = options.pop("sweep"), options.pop("jobs")
+  flags = options.pop("compile_flags")
+  # Sources are built once here, so every pair of a sweep runs the same build.
+  try:
+    judge_args = build_args(judge_args, flags, name="judge")
+    sol_args = build_args(sol_args, flags)
+  except CompileError as e:
+    print(e, file=sys.stderr)
+    sys.exit(1)
+  if seeds is not None:
+    results = sweep(judge_args, sol_args, seeds, jobs, **options)
+    report_sweep(results)
+    sys.exit(1 if any(r.failed for r in results) else 0)
+  t_judge, t_sol, stats = run(judge_args, sol_args, **options)
+  report(t_judge, t_sol, stats, options["limits"])
 
 
-assert sys.argv.count("--") == 1, (
-    "There should be exactly one instance of '--' in the command line.")
-sep_index = sys.argv.index("--")
-judge_args = sys.argv[1:sep_index]
-sol_args = sys.argv[sep_index + 1:]
-
-t_sol = SubprocessThread(sol_args, stderr_prefix="  sol: ")
-t_judge = SubprocessThread(
-    judge_args,
-    stdin_pipe=t_sol.p.stdout,
-    stdout_pipe=t_sol.p.stdin,
-    stderr_prefix="judge: ")
-t_sol.start()
-t_judge.start()
-t_sol.join()
-t_judge.join()
-
-# Print an empty line to handle the case when stderr doesn't print EOL.
-print()
-print("Judge return code:", t_judge.return_code)
-if t_judge.error_message:
-  print("Judge error message:", t_judge.error_message)
-
-print("Solution return code:", t_sol.return_code)
-if t_sol.error_message:
-  print("Solution error message:", t_sol.error_message)
-
-if t_sol.return_code:
-  print("A solution finishing with exit code other than 0 (without exceeding "
-        "time or memory limits) would be interpreted as a Runtime Error "
-        "in the system.")
-elif t_judge.return_code:
-  print("A solution finishing with exit code 0 (without exceeding time or "
-        "memory limits) and a judge finishing with exit code other than 0 "
-        "would be interpreted as a Wrong Answer in the system.")
-else:
-  print("A solution and judge both finishing with exit code 0 (without "
-        "exceeding time or memory limits) would be interpreted as Correct "
-        "in the system.")
\ No newline at end of file
+if __name__ == "__main__":
+  main(sys.argv[1:])
@@ -0,0 +1,69 @@
+'''Fenwick tree.
+
+Point updates and prefix sums in O(log n), stored in a flat `array` of 64 bit
+integers rather than a list of Python ints. Sums outside the 64 bit range
+raise OverflowError; use a list instead of the array if they can occur.
+'''
+from array import array
+
+
+class Fenwick:
+  '''Sums of integer values at positions 0 to n - 1.
+
+  Args:
+    values: The initial values, or an int n for n zeros.
+
+  '''
+
+  __slots__ = ('n', 'tree')
+
+  def __init__(self, values):
+    if isinstance(values, int):
+      values = [0] * values
+    n = len(values)
+    tree = array('q', [0])
+    tree.extend(values)
+    # Build in O(n) by pushing each partial sum up to its parent once.
+    for i in range(1, n + 1):
+      j = i + (i & -i)
+      if j <= n:
+        tree[j] += tree[i]
+    self.n = n
+    self.tree = tree
+
+  def add(self, i, delta):
+    '''Adds `delta` to the value at position `i`.'''
+    tree, n = self.tree, self.n
+    i += 1
+    while i <= n:
+      tree[i] += delta
+      i += i & -i
+
+  def prefix(self, i):
+    '''Returns the sum of positions 0 to i - 1.'''
+    tree = self.tree
+    total = 0
+    while i > 0:
+      total += tree[i]
+      i &= i - 1
+    return total
+
+  def range_sum(self, lo, hi):
+    '''Returns the sum of positions lo to hi - 1.'''
+    return self.prefix(hi) - self.prefix(lo)
+
+  def lower_bound(self, target):
+    '''Returns the smallest i with prefix(i + 1) >= target, or n if there is none.
+
+    The values must all be non-negative.
+    '''
+    tree, n = self.tree, self.n
+    pos = 0
+    step = 1 << n.bit_length()
+    while step:
+      nxt = pos + step
+      if nxt <= n and tree[nxt] < target:
+        pos = nxt
+        target -= tree[nxt]
+      step >>= 1
+    return pos
@@ -0,0 +1,28 @@
+'''Integer heap.
+
+A priority queue of (key, value) pairs of integers packed into single ints, so
+`heapq` compares ints instead of tuples and stores no tuples at all. Keys can be
+any integers, including negative ones; values must be in 0 to 2**VALUE_BITS - 1,
+e.g. node numbers in Dijkstra's algorithm. Ties on key pop the smallest value.
+'''
+from heapq import heappop, heappush
+
+VALUE_BITS = 32
+VALUE_MASK = (1 << VALUE_BITS) - 1
+
+
+class IntHeap(list):
+  '''A min-heap of (key, value) pairs.
+
+  It is a list, so `len(heap)` and `while heap:` cost no Python calls.
+  '''
+
+  __slots__ = ()
+
+  def push(self, key, value):
+    heappush(self, key << VALUE_BITS | value)
+
+  def pop(self):
+    '''Removes and returns the (key, value) pair with the smallest key.'''
+    item = heappop(self)
+    return item >> VALUE_BITS, item & VALUE_MASK
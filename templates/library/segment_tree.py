@@ -0,0 +1,59 @@
+'''Segment tree.
+
+Point updates and range queries in O(log n) for any associative operation, e.g.
+min, max, gcd or addition. It is iterative and bottom up over a flat list of
+2n nodes, with no recursion and no padding to a power of two.
+'''
+
+
+class SegmentTree:
+  '''Range queries of `op` over positions 0 to n - 1.
+
+  Args:
+    values (list): The initial values.
+    op (function): An associative function of two values.
+    identity: The value x with op(identity, x) == x, e.g. inf for min.
+
+  '''
+
+  __slots__ = ('n', 'op', 'identity', 'tree')
+
+  def __init__(self, values, op, identity):
+    n = len(values)
+    tree = [identity] * n + list(values)
+    for i in range(n - 1, 0, -1):
+      tree[i] = op(tree[2 * i], tree[2 * i + 1])
+    self.n = n
+    self.op = op
+    self.identity = identity
+    self.tree = tree
+
+  def __getitem__(self, i):
+    return self.tree[i + self.n]
+
+  def update(self, i, value):
+    '''Sets position `i` to `value`.'''
+    tree, op = self.tree, self.op
+    i += self.n
+    tree[i] = value
+    i >>= 1
+    while i:
+      tree[i] = op(tree[2 * i], tree[2 * i + 1])
+      i >>= 1
+
+  def query(self, lo, hi):
+    '''Returns op over positions lo to hi - 1, in order, or identity if empty.'''
+    tree, op = self.tree, self.op
+    left = right = self.identity
+    lo += self.n
+    hi += self.n
+    while lo < hi:
+      if lo & 1:
+        left = op(left, tree[lo])
+        lo += 1
+      if hi & 1:
+        hi -= 1
+        right = op(tree[hi], right)
+      lo >>= 1
+      hi >>= 1
+    return op(left, right)
@@ -0,0 +1,47 @@
+'''Union-find.
+
+Disjoint sets of the elements 0 to n - 1 in two flat lists, with union by size
+and path halving, so that every operation is effectively O(1).
+'''
+
+
+class UnionFind:
+  '''Disjoint sets of 0 to n - 1, starting as singletons.
+
+  Attributes:
+    parent (list): Each element's parent; roots are their own parent.
+    size (list): The size of each root's set.
+    components (int): The number of sets.
+
+  '''
+
+  __slots__ = ('parent', 'size', 'components')
+
+  def __init__(self, n):
+    self.parent = list(range(n))
+    self.size = [1] * n
+    self.components = n
+
+  def find(self, x):
+    '''Returns the root of x's set.'''
+    parent = self.parent
+    while parent[x] != x:
+      # Path halving: point every other node on the path at its grandparent.
+      parent[x] = x = parent[parent[x]]
+    return x
+
+  def union(self, a, b):
+    '''Merges the sets of a and b. Returns False if they were already one set.'''
+    a, b = self.find(a), self.find(b)
+    if a == b:
+      return False
+    size = self.size
+    if size[a] < size[b]:
+      a, b = b, a
+    self.parent[b] = a
+    size[a] += size[b]
+    self.components -= 1
+    return True
+
+  def same(self, a, b):
+    return self.find(a) == self.find(b)
@@ -3,19 +3,40 @@
 Before 2018, solutions were submitted in text files with the extention `.out`.
 Download the approprite input files from the problem description and put them
 in the problem folder, then change the FILENAME variable appropriately.
+
+The large datasets could be hundreds of megabytes, so the input is streamed:
+the file is memory-mapped and split into whitespace separated tokens a chunk at
+a time, and results go through one large output buffer. Tokens are bytes, so
+`int(token)` and `float(token)` work directly but strings need
+`token.decode()`.
 '''
+import mmap, os
+
 FILENAME = "tests"
+CHUNK_SIZE = 1 << 22                                                          # Bytes of input split into tokens at a time.
+BUFFER_SIZE = 1 << 20                                                         # Bytes of output buffered before each write.
 
 def main():
-  with open(FILENAME + ".in") as in_file, open(FILENAME + ".out", 'w') as out_file: # Input and output filenames are determined by FILENAME variable.
-    T = int(read(in_file))                                                    # First line of input is the number of test cases.
+  with open(FILENAME + ".in", 'rb') as in_file, open(FILENAME + ".out", 'wb', BUFFER_SIZE) as out_file: # Input and output filenames are determined by FILENAME variable.
+    tokens = read_tokens(in_file)                                             # All of the input, as a lazy iterator over tokens.
+    T = int(next(tokens))                                                     # The first input is the number of test cases.
     for i in range(1, T + 1):
-      n, m = [int(s) for s in read(in_file).split(" ")]                       # Get input as specified by the problem.
+      n, m = int(next(tokens)), int(next(tokens))                             # Get input as specified by the problem.
       result = solve_problem(n, m)                                            # Solve problem for given input.
-      out_file.write("Case #{}: {}".format(i, result))                        # Print result to output file.
+      out_file.write("Case #{}: {}\n".format(i, result).encode())             # Print result to output file.
 
-def read(in_file):
-  return in_file.readline().strip()
+def read_tokens(in_file):
+  if os.fstat(in_file.fileno()).st_size == 0:                                 # Empty files can't be mapped.
+    return
+  with mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+    rest = b""
+    for start in range(0, len(data), CHUNK_SIZE):
+      chunk = data[start:start + CHUNK_SIZE]
+      tokens = (rest + chunk).split()
+      rest = b"" if chunk[-1:].isspace() else tokens.pop()                    # The last token may go on in the next chunk.
+      yield from tokens
+    if rest:
+      yield rest
 
 def solve_problem(a, b):
   return a + b
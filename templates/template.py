@@ -1,14 +1,51 @@
 '''Standard template.
 
-This template is suitable for Python3 solutions to standard problems in 
+This template is suitable for Python3 solutions to standard problems in
 Google's CodeJame and Kickstart competitions.
+
+Input is read from stdin in one go and split into whitespace separated tokens,
+and the output is collected and written in one go at the end. Tokens are bytes,
+so `int(token)` and `float(token)` work directly but strings need
+`token.decode()`. Don't mix `print` with `write_lines`, or output may come out
+of order.
+
+All test cases are parsed before any are solved. Setting PARALLEL to True
+solves them on all cores, which helps with heavy local stress tests. The judge
+only gives you one core, so leave it off when submitting.
 '''
+import sys
+
+PARALLEL = False                                                              # Solve test cases in a multiprocessing pool.
+MIN_PARALLEL_CASES = 32                                                       # Fewer cases than this are always solved serially.
+
 def main():
-  T = int(input())                                                            # The first input is the number of test cases.
-  for i in range(1, T + 1):                                                   # Test cases are numbered starting with 1.
-    n, m = [int(s) for s in input().split(" ")]                               # For each test case, read the input as specified by the problem.
-    result = solve_problem(n, m)                                              # Solve the problem for this input.
-    print("Case #{}: {}".format(i, result))                                   # Print the result.
+  tokens = read_tokens()                                                      # All of the input, as an iterator over tokens.
+  T = int(next(tokens))                                                       # The first input is the number of test cases.
+  cases = []
+  for _ in range(T):
+    n, m = int(next(tokens)), int(next(tokens))                               # For each test case, read the input as specified by the problem.
+    cases.append((n, m))                                                      # Arguments for solve_problem.
+  results = solve_all(cases)                                                  # Solve the problem for each input.
+  write_lines("Case #{}: {}".format(i, result)                                # Test cases are numbered starting with 1.
+              for i, result in enumerate(results, 1))
+
+def solve_all(cases):
+  if not PARALLEL or len(cases) < MIN_PARALLEL_CASES:
+    return [solve_problem(*case) for case in cases]
+  from multiprocessing import Pool, cpu_count
+  workers = cpu_count()
+  if workers < 2:
+    return [solve_problem(*case) for case in cases]
+  # A few chunks per worker balances uneven cases without paying IPC per case.
+  chunksize = max(1, len(cases) // (4 * workers))
+  with Pool(workers) as pool:
+    return pool.starmap(solve_problem, cases, chunksize)                      # Results come back in input order.
+
+def read_tokens():
+  return iter(sys.stdin.buffer.read().split())
+
+def write_lines(lines):
+  sys.stdout.write("\n".join(lines) + "\n")
 
 def solve_problem(a, b):
   return a + b
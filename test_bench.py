@@ -0,0 +1,59 @@
+import io
+import math
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from bench import bench, fit, process_input
+
+GEN = '''import sys
+seed, n = int(sys.argv[1]), int(sys.argv[2])
+print(n)
+'''
+
+QUADRATIC = '''n = int(input())
+total = 0
+for i in range(n):
+  for j in range(n):
+    total += 1
+print("Case #1:", total)
+'''
+
+
+class TestFit(TestCase):
+
+  def test_fit(self):
+    sizes = [1000, 3000, 10000, 30000, 100000, 300000, 1000000]
+    # Startup plus a known growth rate is recognised.
+    for name, f in [("O(n)", lambda n: n), ("O(n log n)", lambda n: n * math.log(n)), ("O(n^2)", lambda n: n * n)]:
+      times = [0.02 + f(n) * 1e-9 for n in sizes]
+      fits = fit(sizes, times)
+      assert(fits[0].name == name)
+      assert(fits[0].error < 1e-6)
+      assert(abs(fits[0].predict(10 ** 7) - (0.02 + f(10 ** 7) * 1e-9)) < 1e-6)
+    # Pure startup time is constant.
+    assert(fit(sizes, [0.02] * len(sizes))[0].name == "O(1)")
+
+
+class TestBench(TestCase):
+
+  def test_bench(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "gen.py").write_text(GEN)
+      (path / "main.py").write_text(QUADRATIC)
+      out = io.StringIO()
+      fits = bench(path, sizes=[100, 400, 1000, 2000], repeats=1, max_n=4000, out=out)
+      assert(fits[0].name in ("O(n^2)", "O(n^3)"))
+      assert("Best fit" in out.getvalue())
+      (path / "gen.py").unlink()
+      with self.assertRaises(FileNotFoundError):
+        bench(path, repeats=1, out=out)
+
+  def test_process_input(self):
+    opts = process_input(['-n', '10,1e3,100', '-r', '2', '-m', '1e6'])
+    assert(opts['sizes'] == [10, 100, 1000])
+    assert(opts['repeats'] == 2)
+    assert(opts['max_n'] == 10 ** 6)
+    with self.assertRaises(ValueError):
+      process_input(['-n', '10,100'])
@@ -0,0 +1,135 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+import build_cache
+from build_cache import BuildCache, CompileError, compile_command, solution_command
+from grade import grade
+from history import History, solution_hash
+from problems import find_problems, run_solution, solution_file
+from test_grade import ECHO_SUM, problem_tree, write_problem
+from test_new_problem import TestFolders
+from test_watch import save_later
+from watch import watch
+
+sys.path.insert(0, str(Path(__file__).parent.resolve() / "templates"))
+
+import interactive_runner
+
+ECHO_SUM_C = '''#include <stdio.h>
+int main(void) {
+  int t, a, b;
+  scanf("%d", &t);
+  for (int i = 1; i <= t; i++) {
+    scanf("%d %d", &a, &b);
+    printf("Case #%d: %d\\n", i, a + b);
+  }
+  return 0;
+}
+'''
+
+
+@skipUnless(shutil.which("gcc"), "gcc is not installed")
+class TestBuildCache(TestCase):
+
+  def test_build(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.c").write_text(ECHO_SUM_C)
+      cache = BuildCache(path / "cache")
+      build, cached = cache.build(path / "main.c")
+      assert(not cached and os.access(str(build), os.X_OK))
+      assert(cache.build(path / "main.c") == (build, True))
+      # Other flags or another source make another build.
+      other, cached = cache.build(path / "main.c", ["-O0"])
+      assert(other != build and not cached)
+      (path / "main.c").write_text(ECHO_SUM_C + "\n")
+      assert(cache.build(path / "main.c")[0] not in (build, other))
+      assert(solution_command(path / "main.c", cache=cache) == [str(cache.build(path / "main.c")[0])])
+      assert(solution_command(path / "main.py") == [sys.executable, str(path / "main.py")])
+
+  def test_compile_error(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.c").write_text("int main(void) { return x; }\n")
+      cache = BuildCache(path / "cache")
+      with self.assertRaises(CompileError) as e:
+        cache.build(path / "main.c")
+      assert("undeclared" in e.exception.output)
+      assert(list((path / "cache").iterdir()) == [])
+      with patch.dict(build_cache.LANGUAGES, {".zz": ["no-such-compiler", "-o", "{binary}", "{source}"]}):
+        (path / "main.zz").write_text("")
+        with self.assertRaises(CompileError):
+          cache.build(path / "main.zz")
+      with self.assertRaises(ValueError):
+        compile_command(".txt")
+
+  def test_evict(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      cache = BuildCache(Path(tmp), max_bytes=2500)
+      for i, key in enumerate(["a", "b", "c"]):
+        (Path(tmp) / key).write_bytes(b"x" * 1000)
+        os.utime(str(Path(tmp) / key), ns=(i * 10**9, i * 10**9))
+      (Path(tmp) / "d").mkdir()
+      (Path(tmp) / "d" / "Main.class").write_bytes(b"x" * 1000)
+      assert(cache.evict() == 2)
+      assert(sorted(p.name for p in Path(tmp).iterdir()) == ["c", "d"])
+
+  def test_runner_shares_builds(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.c").write_text(ECHO_SUM_C)
+      build, _ = BuildCache(path / "cache").build(path / "main.c", ["-DLOCAL"])
+      runner_cache = interactive_runner.BuildCache(str(path / "cache"))
+      assert(runner_cache.build(str(path / "main.c"), ["-DLOCAL"]) == (str(build), True))
+
+
+@skipUnless(shutil.which("gcc"), "gcc is not installed")
+class TestCompiledProblems(TestCase):
+
+  def test_grade(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root), tempfile.TemporaryDirectory() as tmp, patch.object(build_cache, "CACHE_PATH", Path(tmp)):
+      write_problem(probs[0].path, ECHO_SUM, "1\n1 2\n", "Case #1: 3\n")
+      (probs[1].path / "main.c").write_text(ECHO_SUM_C)
+      (probs[1].path / "tests.in").write_text("2\n1 2\n3 4\n")
+      (probs[1].path / "tests.out").write_text("Case #1: 3\nCase #2: 7\n")
+      (probs[2].path / "main.c").write_text("int main(void) { return x; }\n")
+      (probs[2].path / "tests.in").write_text("")
+      # main.py wins over other languages.
+      (probs[0].path / "main.c").write_text("")
+      assert(solution_file(probs[0].path).name == "main.py")
+      assert(solution_file(probs[1].path).name == "main.c")
+      assert(find_problems(rnd.path) == [p.path for p in probs])
+      result = run_solution(probs[1].path / "main.c", probs[1].path / "tests.in")
+      assert(result.stdout == b"Case #1: 3\nCase #2: 7\n")
+      verdicts = grade(rnd.path, jobs=2, out=io.StringIO())
+      assert([v.status for v in verdicts] == ["AC", "AC", "CE"])
+      assert(len(list(Path(tmp).iterdir())) == 1)
+
+  def test_watch(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root), tempfile.TemporaryDirectory() as tmp, patch.object(build_cache, "CACHE_PATH", Path(tmp)):
+      (probs[0].path / "main.c").write_text(ECHO_SUM_C)
+      (probs[0].path / "tests.in").write_text("1\n1 2\n")
+      (probs[0].path / "tests.out").write_text("Case #1: 3\n")
+      history = History(Path(tmp) / "history.sqlite")
+      try:
+        # Saving the C source rebuilds and reruns it, and a broken one is a CE.
+        timers = [save_later(probs[0].path / "main.c", ECHO_SUM_C + "\n", 0.3),
+                  save_later(probs[0].path / "main.c", "int main(void) { return x; }\n", 3.0)]
+        out = io.StringIO()
+        verdicts = watch(rnd.path, debounce=0.05, runs=2, history=history, out=out)
+        for timer in timers:
+          timer.join()
+        assert([v.status for v in verdicts] == ["AC", "CE"] and "undeclared" in out.getvalue())
+        entries = history.entries(verdicts[0].name)
+        (Path(tmp) / "saved.c").write_text(ECHO_SUM_C + "\n")
+        assert(len(entries) == 1 and entries[0].solution == solution_hash(Path(tmp) / "saved.c"))
+      finally:
+        history.close()
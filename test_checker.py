@@ -0,0 +1,78 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import checker
+from checker import check, close, process_input
+
+def lines(*answers):
+  return "".join("Case #{}: {}\n".format(i, a) for i, a in enumerate(answers, 1)).encode()
+
+def run_check(output, expected, **kwargs):
+  return check(io.BytesIO(output), io.BytesIO(expected), **kwargs)
+
+
+class TestChecker(TestCase):
+
+  def test_close(self):
+    assert(close(b"0.3333333", b"0.333333333"))
+    assert(close(b"1000000.5", b"1e6"))
+    assert(not close(b"0.34", b"0.333333333"))
+    assert(not close(b"0.3333333", b"0.333333333", abs_tol=0, rel_tol=0))
+    # Integers and words are compared exactly.
+    assert(not close(b"123456789012345678", b"123456789012345679"))
+    assert(not close(b"POSSIBLE", b"IMPOSSIBLE"))
+
+  def test_check(self):
+    assert(run_check(lines(1, 2), b"Case #1:   1\nCase #2:\n2").passed)
+    assert(run_check(lines("0.5000000001 2.0"), lines("0.5 2")).passed is False)
+    assert(run_check(lines("0.5000000001 2.0"), lines("0.5 2.0")).passed)
+    # NaN and inf after a close float are still wrong.
+    for bad in ("nan", "inf", "-inf"):
+      assert(not run_check(lines("1.0000001 " + bad), lines("1.0 2.0")).passed)
+    result = run_check(lines(1, 5, 3), lines(1, 2, 3))
+    assert([m.case for m in result.mismatches] == ["#2"])
+    assert(result.mismatches[0].got == "1 Case #2: [5] Case #3: 3")
+    assert(result.mismatches[0].expected == "1 Case #2: [2] Case #3: 3")
+    assert(not result.truncated)
+    with tempfile.TemporaryDirectory() as tmp:
+      (Path(tmp) / "out").write_bytes(lines(1, 2))
+      (Path(tmp) / "expected").write_bytes(lines(1, 2))
+      assert(check(Path(tmp) / "out", Path(tmp) / "expected").passed)
+
+  def test_resync(self):
+    # A short answer only costs one mismatch.
+    result = run_check(lines(1, 5, 3), lines("1 2", 5, 3))
+    assert([m.case for m in result.mismatches] == ["#1"])
+    # So does a missing or an extra case.
+    result = run_check(lines(1, 2, 3).replace(b"Case #2: 2\n", b""), lines(1, 2, 3))
+    assert([m.case for m in result.mismatches] == ["#2"])
+    result = run_check(lines(1, 2, 3), lines(1, 2, 3).replace(b"Case #2: 2\n", b""))
+    assert([m.case for m in result.mismatches] == ["#3"])
+    result = run_check(lines(1), lines(1, 2))
+    assert(result.mismatches[0].got == "(end of file)")
+
+  def test_max_mismatches(self):
+    result = run_check(lines(*range(1, 100)), lines(*range(2, 101)), max_mismatches=3)
+    assert([m.case for m in result.mismatches] == ["#1", "#2", "#3"])
+    assert(result.truncated)
+    assert(str(result).endswith("3 mismatches, stopped early."))
+
+  def test_small_chunks(self):
+    # Tokens and cases split across chunks and blocks.
+    output = lines(*("{:.7f}".format(i / 7) for i in range(200))) + lines(1, 2)
+    expected = lines(*("{:.9f}".format(i / 7) for i in range(200))) + lines(1, 3)
+    with patch.object(checker, "CHUNK_SIZE", 7), patch.object(checker, "BLOCK_SIZE", 5):
+      result = run_check(output, expected)
+    assert([m.case for m in result.mismatches] == ["#2"])
+    assert(result.mismatches[0].got.startswith("[2]"))
+
+  def test_process_input(self):
+    opts = process_input(["-a", "1e-9", "-k", "2", "out", "tests.out"])
+    assert(opts["abs_tol"] == 1e-9 and opts["rel_tol"] == 1e-6 and opts["max_mismatches"] == 2)
+    assert(opts["output"] == Path("out") and opts["expected"] == Path("tests.out"))
+    assert(process_input(["-h"]) == "help")
+    with self.assertRaises(ValueError):
+      process_input(["-k", "x", "a", "b"])
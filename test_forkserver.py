@@ -0,0 +1,64 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from forkserver import ForkServer, close_servers, run_warm, top_level_imports
+
+ECHO = '''import sys
+from collections import Counter
+words = sys.stdin.read().split()
+print(__name__, sys.argv[1:], len(Counter(words)))
+if sys.argv[1:] == ["exit"]:
+  sys.exit(3)
+elif sys.argv[1:] == ["crash"]:
+  raise ValueError("boom")
+elif sys.argv[1:] == ["spin"]:
+  while True: pass
+'''
+
+
+class TestForkServer(TestCase):
+
+  def test_top_level_imports(self):
+    source = ("import os, sys\nfrom collections import deque\nfrom . import sibling\n"
+              "try:\n  import numpy\nexcept ImportError:\n  import array\n"
+              "def f():\n  import json\n")
+    assert(top_level_imports(source) == ["os", "sys", "collections", "numpy", "array"])
+
+  def test_run(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.py").write_text(ECHO)
+      (path / "tests.in").write_text("a b a\n")
+      with ForkServer(path / "main.py") as server:
+        result = server.run(path / "tests.in")
+        assert(result.returncode == 0 and not result.timed_out)
+        assert(result.stdout == b"__main__ [] 2\n")
+        assert(result.cpu > 0 and result.maxrss > 0)
+        assert(server.run(args=["x"]).stdout == b"__main__ ['x'] 0\n")
+        assert(server.run(args=["exit"]).returncode == 3)
+        result = server.run(args=["crash"])
+        assert(result.returncode == 1)
+        assert(result.stderr.decode().splitlines()[1].strip().startswith('File "{}"'.format(path / "main.py")))
+        assert(result.stderr.endswith(b"ValueError: boom\n"))
+        result = server.run(timeout=0.5, args=["spin"])
+        assert(result.timed_out and result.returncode != 0)
+        # Runs are independent of each other.
+        assert(server.run(path / "tests.in").stdout == b"__main__ [] 2\n")
+
+  def test_run_warm(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.py").write_text("print(1)\n")
+      try:
+        assert(run_warm(path / "main.py").stdout == b"1\n")
+        (path / "main.py").write_text("print(22)\n")
+        # A new modification time makes sure the change is seen.
+        os.utime(str(path / "main.py"), ns=(0, 0))
+        assert(run_warm(path / "main.py").stdout == b"22\n")
+        (path / "main.py").write_text("print(\n")
+        result = run_warm(path / "main.py")
+        assert(result.returncode == 1 and b"SyntaxError" in result.stderr)
+      finally:
+        close_servers()
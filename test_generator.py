@@ -0,0 +1,110 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+GENERATOR_PATH = Path(__file__).parent.resolve() / "templates" / "generator.py"
+sys.path.insert(0, str(GENERATOR_PATH.parent))
+
+import generator
+from generator import Random, Writer, _digits, _format
+
+def connected(n, u, v):
+  parent = list(range(n + 1))
+  def find(x):
+    while parent[x] != x:
+      parent[x] = parent[parent[x]]
+      x = parent[x]
+    return x
+  for a, b in zip(u, v):
+    parent[find(int(a))] = find(int(b))
+  return len({find(x) for x in range(1, n + 1)}) == 1
+
+def edge_set(u, v):
+  return {(min(int(a), int(b)), max(int(a), int(b))) for a, b in zip(u, v)}
+
+def backends():
+  # The fallback is always tested, and NumPy too if it is installed.
+  yield
+  if generator.np is not None:
+    with patch.object(generator, "np", None):
+      yield
+
+
+class TestGenerator(TestCase):
+
+  def test_random(self):
+    for _ in backends():
+      rng = Random(5)
+      values = [int(x) for x in rng.ints(1000, -3, 3)]
+      assert(min(values) == -3 and max(values) == 3)
+      assert(sorted(int(x) for x in rng.permutation(100)) == list(range(1, 101)))
+      for spread in (None, 1, 3):
+        u, v = rng.tree(300, spread)
+        assert(len(u) == 299 and connected(300, u, v))
+      u, v = rng.tree(1)
+      assert(len(u) == 0)
+      u, v = rng.graph(100, 2000)
+      edges = edge_set(u, v)
+      assert(len(edges) == 2000 and all(1 <= a < b <= 100 for a, b in edges) and connected(100, u, v))
+      assert(len(edge_set(*rng.graph(10, 45, connected=False))) == 45)
+      with self.assertRaises(ValueError):
+        rng.graph(10, 46)
+      grid = rng.grid(3, 5, ".#", [1, 3])
+      assert(len(grid) == 3 and all(len(row) == 5 and set(row) <= set(b".#") for row in grid))
+      assert(len(rng.string(50, "ab")) == 50)
+
+  def test_writer(self):
+    for _ in backends():
+      rng = Random(1)
+      values = rng.ints(100, -50, 50)
+      u, v = rng.tree(10)
+      with patch.object(generator, "CHUNK_SIZE", 7):
+        out = io.BytesIO()
+        writer = Writer(out)
+        writer.line(3, b"x")
+        writer.numbers(values)
+        writer.numbers([])
+        writer.rows(u, v)
+        writer.lines([b"ab", b"cd"])
+        writer.close()
+      values, u, v = [[int(x) for x in c] for c in (values, u, v)]
+      expected = ("3 x\n" + " ".join(map(str, values)) + "\n\n" +
+                  "".join("{} {}\n".format(a, b) for a, b in zip(u, v)) + "ab\ncd\n")
+      assert(out.getvalue() == expected.encode())
+
+  def test_main(self):
+    run = lambda *args: subprocess.run([sys.executable, str(GENERATOR_PATH)] + list(args),
+                                       stdout=subprocess.PIPE, check=True).stdout
+    output = run("7", "1000", "3")
+    lines = output.split(b"\n")
+    assert(lines[0] == b"3" and lines[1] == b"1000" and len(lines[2].split()) == 1000 and len(lines) == 8)
+    # The same seed gives the same input.
+    assert(run("7", "1000", "3") == output and run("8", "1000", "3") != output)
+
+
+@skipIf(generator.np is None, "NumPy is not installed, so the vectorised generator isn't tested")
+class TestNumPyGenerator(TestCase):
+
+  def test_format(self):
+    np = generator.np
+    values = np.array([0, 7, -12, 305, -9, 10 ** 12], dtype=np.int64)
+    assert(_format([values], " ") == b"0 7 -12 305 -9 1000000000000 ")
+    assert(_format([np.array([1, -2]), np.array([30, 0], dtype=np.uint32)], "\n") == b"1 30\n-2 0\n")
+    assert(_format([np.array([], dtype=np.int64)], " ") == b"")
+    chars, keep = _digits(np.array([5, -40]), " ")
+    # A row for the sign, one per digit place and one for the separator.
+    assert(chars.shape == keep.shape == (4, 2))
+    assert(chars.T[keep.T].tobytes() == b"5 -40 ")
+
+  def test_random(self):
+    # The vectorised helpers return arrays, which Writer formats with _format.
+    rng = Random(3)
+    values = rng.ints(10 ** 5, -10 ** 9, 10 ** 9)
+    assert(isinstance(values, generator.np.ndarray) and _format([values], " ") ==
+           (" ".join(map(str, values.tolist())) + " ").encode())
+    u, v = rng.graph(50, 300)
+    assert(isinstance(u, generator.np.ndarray) and len(edge_set(u, v)) == 300 and connected(50, u, v))
+
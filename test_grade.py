@@ -0,0 +1,143 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase
+
+import problems
+from grade import grade, grade_problem, process_input
+from problems import find_problems, run_solution
+from run_cache import RunCache
+from test_new_problem import Node, TestFolders
+
+ECHO_SUM = '''T = int(input())
+for i in range(1, T + 1):
+  a, b = map(int, input().split())
+  print("Case #{}: {}".format(i, a + b))
+'''
+
+def problem_tree():
+  probs = [Node("Prob", []) for _ in range(3)]
+  rnd = Node("Round", probs)
+  year = Node("2020", [rnd])
+  comp = Node("Comp", [year])
+  return Node("root", [comp]), comp, rnd, probs
+
+def write_problem(path, source, tests_in=None, tests_out=None):
+  (path / "main.py").write_text(source)
+  if tests_in is not None:
+    (path / "tests.in").write_text(tests_in)
+  if tests_out is not None:
+    (path / "tests.out").write_text(tests_out)
+
+
+class TestFindProblems(TestCase):
+
+  def test_find_problems(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root):
+      write_problem(probs[0].path, ECHO_SUM)
+      write_problem(probs[2].path, ECHO_SUM)
+      # Only folders with a main.py at problem depth are found.
+      assert(find_problems(comp.path) == [probs[0].path, probs[2].path])
+      assert(find_problems(rnd.path) == [probs[0].path, probs[2].path])
+      assert(find_problems(probs[0].path) == [probs[0].path])
+      assert(find_problems(probs[1].path) == [])
+      with self.assertRaises(ValueError):
+        find_problems(probs[0].path / "main.py" / "deeper")
+
+
+class TestRunSolution(TestCase):
+
+  def test_run_solution(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root):
+      path = probs[0].path
+      write_problem(path, ECHO_SUM, "2\n1 2\n3 4\n")
+      result = run_solution(path / "main.py", path / "tests.in")
+      assert(result.returncode == 0)
+      assert(result.stdout == b"Case #1: 3\nCase #2: 7\n")
+      assert(result.wall >= result.cpu * 0.5)
+      assert(result.maxrss > 0)
+      assert(not result.timed_out)
+      write_problem(path, "while True: pass\n")
+      result = run_solution(path / "main.py", timeout=0.5)
+      assert(result.timed_out)
+      assert(result.returncode != 0)
+
+  def test_late_kill(self):
+    # A timeout firing after the exit but before the reap changes nothing.
+    p = subprocess.Popen([sys.executable, "-c", ""])
+    os.waitid(os.P_PID, p.pid, os.WEXITED | os.WNOWAIT)
+    killed = threading.Event()
+    problems._kill(p, killed, threading.Lock())
+    assert(not killed.is_set())
+    assert(os.waitstatus_to_exitcode(os.wait4(p.pid, 0)[1]) == 0)
+    p.returncode = 0
+
+
+class TestGrade(TestCase):
+
+  def test_grade_problem(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root):
+      write_problem(probs[0].path, ECHO_SUM, "1\n1 2\n", "Case #1: 3\n")
+      assert(grade_problem(probs[0].path).status == "AC")
+      write_problem(probs[0].path, ECHO_SUM, "1\n1 2\n", "Case #1: 4\n")
+      assert(grade_problem(probs[0].path).status == "WA")
+      # Floats in tests.out are compared with a tolerance.
+      write_problem(probs[0].path, ECHO_SUM, "1\n1 2\n", "Case #1: 3.0000001\n")
+      assert(grade_problem(probs[0].path).status == "AC")
+      write_problem(probs[1].path, ECHO_SUM, "1\n1 2\n")
+      assert(grade_problem(probs[1].path).status == "OK")
+      write_problem(probs[2].path, "raise ValueError()\n", "")
+      assert(grade_problem(probs[2].path).status == "RE")
+      (probs[2].path / "tests.in").unlink()
+      assert(grade_problem(probs[2].path).status == "SKIP")
+
+  def test_grade(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root):
+      write_problem(probs[0].path, ECHO_SUM, "1\n1 2\n", "Case #1: 3\n")
+      write_problem(probs[1].path, ECHO_SUM, "1\n1 2\n", "Case #1:    3")
+      write_problem(probs[2].path, "raise ValueError()\n", "")
+      out = io.StringIO()
+      verdicts = grade(comp.path, jobs=2, out=out)
+      assert([v.status for v in verdicts] == ["AC", "AC", "RE"])
+      assert([v.failed for v in verdicts] == [False, False, True])
+      assert(out.getvalue().count("\n") == 5)
+
+
+class TestProcessInput(TestCase):
+
+  def test_grade_cached(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root), tempfile.TemporaryDirectory() as tmp:
+      write_problem(probs[0].path, ECHO_SUM, "1\n1 2\n", "Case #1: 3\n")
+      write_problem(probs[1].path, ECHO_SUM, "1\n2 1\n", "Case #1: 3\n")
+      cache = RunCache(Path(tmp))
+      verdicts = grade(rnd.path, cache=cache, out=io.StringIO())
+      assert([v.cached for v in verdicts] == [False, False])
+      # Only the changed problem is run again.
+      (probs[1].path / "tests.in").write_text("1\n1 3\n")
+      out = io.StringIO()
+      verdicts = grade(rnd.path, cache=cache, out=out)
+      assert([(v.status, v.cached) for v in verdicts] == [("AC", True), ("WA", False)])
+      assert("1 failed, 1 cached." in out.getvalue())
+
+  def test_process_input(self):
+    opts = process_input(['-j', '4', '-t', '2.5', 'Comp'])
+    assert(opts['jobs'] == 4)
+    assert(opts['timeout'] == 2.5)
+    assert(str(opts['path']) == 'Comp')
+    assert(process_input(['-h']) == 'help')
+    with self.assertRaises(ValueError):
+      process_input(['-j', 'many'])
+    with self.assertRaises(ValueError):
+      process_input(['-t', '0'])
+    assert(process_input([])['cache'] is not None)
+    assert(process_input(['--no-cache'])['cache'] is None)
+    assert(process_input(['--no-history'])['history'] is None)
@@ -0,0 +1,85 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from grade import grade
+from history import Entry, History, Version, process_input, regression, regressions, show, summarize
+from problems import RunResult
+from test_grade import ECHO_SUM, problem_tree, write_problem
+from test_new_problem import TestFolders
+
+def entry(solution, cpu, status="AC"):
+  return Entry(0.0, solution, status, cpu, cpu, 1024)
+
+
+class TestHistory(TestCase):
+
+  def test_regression(self):
+    versions = summarize([entry("a", 1.0), entry("a", 1.2), entry("b", 0.5), entry("c", 0.1, "WA")])
+    assert([(v.solution, v.runs) for v in versions] == [("a", 2), ("b", 1)])
+    assert(abs(versions[0].stdev - 0.1414) < 1e-3 and versions[1].stdev == 0)
+    # The floor of 5% of the best mean applies to a single run.
+    assert(regression(entry("d", 0.57), versions) is None)
+    found = regression(entry("d", 1.5), versions)
+    assert(found.best.solution == "b" and str(found).startswith("3.0x slower than b"))
+    assert(regression(entry("d", 1.5, "WA"), versions) is None)
+    assert(regression(entry("d", 1.5), []) is None)
+    # Tiny times are compared with a floor in seconds.
+    assert(regression(entry("b", 0.015), [Version.of([entry("a", 0.005)])]) is None)
+
+  def test_regressions(self):
+    entries = [entry("a", 1.0), entry("a", 1.01), entry("b", 3.0), entry("b", 3.0, "TLE"), entry("c", 0.9)]
+    assert([r is not None for r in regressions(entries)] == [False, False, True, False, False])
+
+  def test_record(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      tmp = Path(tmp)
+      (tmp / "main.py").write_text("print(1)\n")
+      history = History(tmp / "history.sqlite")
+      try:
+        assert(history.record("C/2020/R/A", tmp / "main.py", RunResult(0, 1.1, 1.0, 9000, b"", b"", False), "AC")
+               is None)
+        (tmp / "main.py").write_text("print(2)\n")
+        found = history.record("C/2020/R/A", tmp / "main.py", RunResult(0, 3.1, 3.0, 9000, b"", b"", False), "AC")
+        assert(found is not None and found.cpu == 3.0)
+        history.record("C/2020/R/B", tmp / "main.py", RunResult(1, 0.1, 0.1, 9000, b"", b"", False), "RE")
+        entries = history.entries("C/2020/R/A")
+        assert([e.cpu for e in entries] == [1.0, 3.0] and entries[0].solution != entries[1].solution)
+        assert(history.problems() == ["C/2020/R/A", "C/2020/R/B"])
+        assert(history.problems("C/2020/R/B") == ["C/2020/R/B"])
+        assert(history.problems("C/2020/R/") == [] and history.problems("C/2020") == history.problems())
+      finally:
+        history.close()
+
+  def test_grade_and_show(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root), tempfile.TemporaryDirectory() as tmp:
+      write_problem(probs[0].path, ECHO_SUM, "1\n1 2\n", "Case #1: 3\n")
+      write_problem(probs[1].path, ECHO_SUM, "1\n1 2\n")
+      history = History(Path(tmp) / "history.sqlite")
+      try:
+        grade(rnd.path, history=history, out=io.StringIO())
+        # A version far slower than the first is flagged.
+        write_problem(probs[0].path, "import time\nwhile time.process_time() < 0.5: pass\n" + ECHO_SUM)
+        out = io.StringIO()
+        grade(probs[0].path, history=history, out=out)
+        assert("! " in out.getvalue() and "slower than" in out.getvalue())
+        out = io.StringIO()
+        assert(len(show(rnd.path, history=history, out=out)) == 2)
+        assert(out.getvalue().count("\n") == 3)
+        out = io.StringIO()
+        show(probs[0].path, runs=1, history=history, out=out)
+        lines = out.getvalue().splitlines()
+        assert(len(lines) == 7 and "slower than" in lines[-1])
+        with self.assertRaises(FileNotFoundError):
+          show(probs[2].path, history=history, out=out)
+      finally:
+        history.close()
+
+  def test_process_input(self):
+    opts = process_input(["-n", "5", "Comp"])
+    assert(opts["runs"] == 5 and str(opts["path"]) == "Comp")
+    assert(process_input(["-h"]) == "help")
+    with self.assertRaises(ValueError):
+      process_input(["-n", "few"])
@@ -0,0 +1,116 @@
+import io
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from interactive_harness import Channel, TextChannel, harness, process_input
+
+TEST_PATH = Path(__file__).parent.resolve()
+TEMPLATE_PATH = TEST_PATH / "templates" / "interactive-template.py"
+JUDGE_PATH = TEST_PATH / "benchmarks" / "heavy_ball_judge.py"
+
+# The heavy ball solution written with input() and print().
+PRINT_INPUT = '''import sys
+
+def main():
+  T = int(input())
+  for _ in range(T):
+    n, k = map(int, input().split())
+    start, end = 0, n
+    while end - start > 1:
+      third = (end - start) // 3
+      print(" ".join(map(str, range(start, start + third))), "#",
+            " ".join(map(str, range(start + third, start + 2 * third))), flush=True)
+      s = input()
+      if s == "r":
+        start += third
+      elif s == "b":
+        start += 2 * third
+      end = start + third
+    print(start, flush=True)
+    if input() == "-1":
+      sys.exit()
+'''
+
+
+# The heavy ball judge, printing whenever it reads from the solution.
+CHATTY_JUDGE = '''import sys
+sys.path.insert(0, {!r})
+from heavy_ball_judge import Judge as Base
+
+class Chatty:
+  def __init__(self, infile):
+    self.infile = infile
+  def readline(self):
+    line = self.infile.readline()
+    print("judge read", len(line))
+    return line
+
+class Judge(Base):
+  def run(self, infile, outfile):
+    return super().run(Chatty(infile), outfile)
+'''
+
+
+class TestHarness(TestCase):
+
+  def play(self, source, games=20, timeout=10.0):
+    with tempfile.TemporaryDirectory() as tmp:
+      solution = Path(tmp) / "main.py"
+      solution.write_text(source)
+      out = io.StringIO()
+      results = harness(JUDGE_PATH, solution, [5, 4], games=games, timeout=timeout, out=out)
+      return results, out.getvalue()
+
+  def test_template(self):
+    results, out = self.play(TEMPLATE_PATH.read_text())
+    assert(len(results) == 20 and all(r.passed for r in results))
+    assert("20 games" in out and "0 failed" in out)
+    # The real stdin and stdout are back.
+    assert(sys.stdout is not None and not isinstance(sys.stdout, TextChannel))
+
+  def test_print_input(self):
+    results, _ = self.play(PRINT_INPUT)
+    assert(all(r.passed for r in results))
+
+  def test_failures(self):
+    results, out = self.play(TEMPLATE_PATH.read_text().replace("return start", "return start + 1"), games=3)
+    assert([r.status for r in results] == ["WA"] * 3)
+    assert("guessed" in out)
+    results, out = self.play("def main():\n  raise ValueError('oops')\n", games=2)
+    assert([r.status for r in results] == ["RE"] * 2 and "ValueError: oops" in out)
+    # A solution waiting for input that never comes is stopped by closing its input.
+    results, _ = self.play("import sys\ndef main():\n  sys.stdin.readline()\n  sys.stdin.readline()\n  input()\n",
+                           games=2, timeout=0.5)
+    assert([r.status for r in results] == ["TLE"] * 2 and not results[-1].stuck)
+
+  def test_judge_prints(self):
+    # The judge's prints during the game go to the real stdout, not the solution.
+    with tempfile.TemporaryDirectory() as tmp:
+      judge, solution = Path(tmp) / "judge.py", Path(tmp) / "main.py"
+      judge.write_text(CHATTY_JUDGE.format(str(JUDGE_PATH.parent)))
+      solution.write_text(TEMPLATE_PATH.read_text())
+      out, stdout = io.StringIO(), io.StringIO()
+      with patch.object(sys, "stdout", stdout):
+        results = harness(judge, solution, [5, 4], games=5, out=out)
+      assert(all(r.passed for r in results))
+      assert(stdout.getvalue().count("judge read") >= 5 and sys.stdout is not stdout)
+
+  def test_channel(self):
+    channel = Channel()
+    lines = []
+    reader = threading.Thread(target=lambda: lines.extend([channel.readline(), channel.readline(), channel.readline()]))
+    reader.start()
+    channel.write(b"ab")
+    channel.write(b"c\nde")
+    channel.close()
+    reader.join(5)
+    assert(lines == [b"abc\n", b"de", b""])
+
+  def test_process_input(self):
+    opts = process_input(["-g", "50", "judge.py", "main.py", "3", "x"])
+    assert(opts["games"] == 50 and opts["judge_args"] == [3, "x"] and opts["solution_path"] == Path("main.py"))
+    assert(process_input(["-h"]) == "help")
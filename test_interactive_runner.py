@@ -0,0 +1,278 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+TEST_PATH = Path(__file__).parent.resolve()
+sys.path.insert(0, str(TEST_PATH / "templates"))
+
+import interactive_runner
+from interactive_runner import (DRAIN_TIMEOUT, BuildCache, Limits, RingBuffer, Subprocess, build_args, parse_args,
+                                parse_seeds, read_transcript, run, seed_args, sweep, verdict)
+
+TEMPLATE_PATH = TEST_PATH / "templates" / "interactive-template.py"
+HEAVY_BALL_JUDGE_PATH = TEST_PATH / "benchmarks" / "heavy_ball_judge.py"
+
+# A judge for the heavy ball problem in the interactive template.
+JUDGE = '''import random, sys
+random.seed(int(sys.argv[1]))
+T = 3
+print(T, flush=True)
+for _ in range(T):
+  n = 3 ** random.randint(1, 5)
+  heavy = random.randrange(n)
+  print(n, 10, flush=True)
+  while True:
+    line = input()
+    if "#" not in line:
+      break
+    left, right = (set(map(int, half.split())) for half in line.split("#"))
+    print("l" if heavy in left else "r" if heavy in right else "b", flush=True)
+  if int(line) != heavy:
+    print(-1, flush=True)
+    sys.exit(1)
+  print(1, flush=True)
+print("judge done", file=sys.stderr)
+'''
+
+
+# A solution that misbehaves in the way given by its argument.
+HOG = '''import sys
+input()
+if sys.argv[1] == "mem":
+  a = [0] * (10 ** 9)
+elif sys.argv[1] == "cpu":
+  while True: pass
+elif sys.argv[1] == "hang":
+  input()
+elif sys.argv[1] == "crash":
+  sys.exit(3)
+elif sys.argv[1] == "sigkill":
+  import os, signal
+  os.kill(os.getpid(), signal.SIGKILL)
+'''
+
+# The interactive template's solution in C.
+HEAVY_BALL_C = '''#include <stdio.h>
+int main(void) {
+  int t, n, k;
+  char r[16];
+  scanf("%d", &t);
+  while (t--) {
+    scanf("%d %d", &n, &k);
+    int start = 0, end = n;
+    while (end - start > 1) {
+      int third = (end - start) / 3;
+      for (int i = start; i < start + third; i++) printf("%d ", i);
+      printf("#");
+      for (int i = start + third; i < start + 2 * third; i++) printf(" %d", i);
+      printf("\\n");
+      fflush(stdout);
+      scanf("%15s", r);
+      if (r[0] == 'r') start += third;
+      else if (r[0] == 'b') start += 2 * third;
+      end = start + third;
+    }
+    printf("%d\\n", start);
+    fflush(stdout);
+    scanf("%15s", r);
+  }
+  return 0;
+}
+'''
+
+# A judge that sends one line and then stalls.
+SLOW_JUDGE = '''import time
+print(1, flush=True)
+time.sleep(30)
+'''
+
+
+class TestRingBuffer(TestCase):
+
+  def test_ring_buffer(self):
+    buf = RingBuffer(8)
+    buf.append(b"abc")
+    buf.append(b"defg")
+    assert(len(buf) == 7 and buf.dropped == 0)
+    buf.append(b"hij")
+    assert(len(buf) == 8 and buf.dropped == 2)
+    assert(buf.pop(3) == b"cde")
+    assert(buf.pop(100) == b"fghij")
+    assert(len(buf) == 0)
+    buf.append(b"0123456789")
+    assert(buf.pop(100) == b"23456789")
+    assert(buf.dropped == 4)
+
+
+class TestRun(TestCase):
+
+  def test_run(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      judge = Path(tmp) / "judge.py"
+      judge.write_text(JUDGE)
+      t_judge, t_sol, _ = run([sys.executable, str(judge), "0"], [sys.executable, str(TEMPLATE_PATH)])
+      assert(t_judge.return_code == 0)
+      assert(t_sol.return_code == 0)
+
+  def test_heavy_ball_judge(self):
+    t_judge, t_sol, _ = run([sys.executable, str(HEAVY_BALL_JUDGE_PATH), "1", "40", "4"],
+                            [sys.executable, str(TEMPLATE_PATH)], quiet=True)
+    assert(t_judge.return_code == 0 and t_sol.return_code == 0)
+    # A wrong answer gets -1, and the template exits instead of hanging.
+    with tempfile.TemporaryDirectory() as tmp:
+      wrong = Path(tmp) / "wrong.py"
+      wrong.write_text(TEMPLATE_PATH.read_text().replace("return start", "return start + 1"))
+      t_judge, t_sol, _ = run([sys.executable, str(HEAVY_BALL_JUDGE_PATH), "1", "40", "4"],
+                              [sys.executable, str(wrong)], quiet=True)
+      assert(t_judge.return_code == 1 and t_sol.return_code == 0)
+
+  @skipUnless(shutil.which("gcc"), "gcc is not installed")
+  def test_compiled_solution(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      source = Path(tmp) / "main.c"
+      source.write_text(HEAVY_BALL_C)
+      cache = BuildCache(str(Path(tmp) / "cache"))
+      sol_args = build_args([str(source)], cache=cache)
+      assert(build_args([str(source)], cache=cache) == sol_args)
+      assert(len(list((Path(tmp) / "cache").iterdir())) == 1)
+      # Other command lines are left alone.
+      assert(build_args([sys.executable, str(source)], cache=cache) == [sys.executable, str(source)])
+      results = sweep([sys.executable, str(HEAVY_BALL_JUDGE_PATH), "{}", "20", "4"], sol_args,
+                      parse_seeds("0-3"), jobs=2)
+      assert(not any(r.failed for r in results))
+
+  def test_chatty_stderr(self):
+    # Output past the buffer size is dropped rather than blocking the programs.
+    # Our stderr is a full pipe, so nothing can be written out.
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(write_fd, False)
+    try:
+      while True:
+        os.write(write_fd, b"." * 4096)
+    except BlockingIOError:
+      pass
+    with tempfile.TemporaryDirectory() as tmp, os.fdopen(read_fd, "rb") as reader, \
+         os.fdopen(write_fd, "w") as stderr, patch.object(sys, "stderr", stderr):
+      chatty = Path(tmp) / "chatty.py"
+      chatty.write_text('import sys\nsys.stderr.write("x" * 100000)\n')
+      start = time.perf_counter()
+      t_judge, t_sol, _ = run([sys.executable, str(chatty)], [sys.executable, str(chatty)], stderr_buffer=16)
+      assert(t_judge.return_code == 0 and t_sol.return_code == 0)
+      # The last 16 bytes are given DRAIN_TIMEOUT to be written, then dropped too.
+      assert(time.perf_counter() - start < DRAIN_TIMEOUT + 5)
+      for t in (t_judge, t_sol):
+        assert(len(t.stderr_buffer) == 0 and t.stderr_buffer.dropped == 100000 + len(t.stderr_prefix))
+
+  def test_proxy(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      judge = Path(tmp) / "judge.py"
+      judge.write_text(JUDGE)
+      t_judge, t_sol, stats = run([sys.executable, str(judge), "0"], [sys.executable, str(TEMPLATE_PATH)],
+                                  proxy=True, new_case=r"^\d+ \d+$")
+      assert(t_judge.return_code == 0)
+      assert(t_sol.return_code == 0)
+      # Each case has one answer after its queries, and the judge replies to everything.
+      queries = stats.queries_per_case[1:]
+      assert(len(queries) == 3)
+      assert(stats.messages["sol"] == sum(queries))
+      assert(stats.messages["judge"] == 1 + 3 + sum(queries))
+      assert(len(stats.latencies) == sum(queries))
+
+  def test_record_replay(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      judge, transcript = Path(tmp) / "judge.py", Path(tmp) / "transcript.txt"
+      judge.write_text(JUDGE)
+      t_judge, t_sol, stats = run([sys.executable, str(judge), "0"], [sys.executable, str(TEMPLATE_PATH)],
+                                  record=str(transcript), quiet=True)
+      assert(verdict(t_judge, t_sol)[0] == "Correct")
+      messages = read_transcript(str(transcript))
+      assert(len(messages) == stats.messages["sol"] + stats.messages["judge"])
+      assert(messages[0] == ("judge", b"3") and messages[-1][0] == "judge")
+      # The judge isn't needed to replay the exchange.
+      judge.unlink()
+      replayer, t_sol, stats = run([], [sys.executable, str(TEMPLATE_PATH)], replay=str(transcript), quiet=True)
+      assert(verdict(replayer, t_sol)[0] == "Correct")
+      assert(replayer.sent == replayer.judge_messages == stats.messages["judge"])
+      # A solution that asks something else is stopped at the first difference.
+      wrong = Path(tmp) / "wrong.py"
+      wrong.write_text(TEMPLATE_PATH.read_text().replace("return start", "return start + 1"))
+      replayer, t_sol, _ = run([], [sys.executable, str(wrong)], replay=str(transcript), quiet=True)
+      result, explanation = verdict(replayer, t_sol)
+      assert(result == "Wrong Answer" and "differs from the transcript" in explanation)
+      assert(replayer.sent < replayer.judge_messages)
+      transcript.write_bytes(b"0.1 X 3\n")
+      with self.assertRaises(ValueError):
+        run([], [sys.executable, str(TEMPLATE_PATH)], replay=str(transcript))
+
+  def test_parse_args(self):
+    options, judge_args, sol_args = parse_args(["--record=t.txt", "judge", "0", "--", "sol"])
+    assert(options["proxy"] and options["record"] == "t.txt")
+    assert(judge_args == ["judge", "0"] and sol_args == ["sol"])
+    options, judge_args, sol_args = parse_args(["--replay=t.txt", "sol", "1"])
+    assert(options["replay"] == "t.txt" and judge_args == [] and sol_args == ["sol", "1"])
+    with self.assertRaises(AssertionError):
+      parse_args(["--sweep=0-3", "--replay=t.txt", "--", "sol"])
+
+
+class TestLimits(TestCase):
+
+  def hog(self, mode, limits):
+    with tempfile.TemporaryDirectory() as tmp:
+      judge, hog = Path(tmp) / "judge.py", Path(tmp) / "hog.py"
+      judge.write_text(SLOW_JUDGE)
+      hog.write_text(HOG)
+      t_judge, t_sol, _ = run([sys.executable, str(judge)], [sys.executable, str(hog), mode], limits=limits)
+      return verdict(t_judge, t_sol, limits)[0], t_sol
+
+  def test_verdicts(self):
+    limits = Limits(time=2, cpu=0.5, memory=200 << 20)
+    assert(self.hog("mem", limits)[0] == "Memory Limit Exceeded")
+    result, t_sol = self.hog("cpu", limits)
+    assert(result == "Time Limit Exceeded")
+    assert(t_sol.cpu_time >= 0.5)
+    result, t_sol = self.hog("hang", limits)
+    assert(result == "Time Limit Exceeded")
+    assert(t_sol.killed)
+    result, t_sol = self.hog("crash", limits)
+    assert(result == "Runtime Error")
+    assert(t_sol.return_code == 3)
+    assert(t_sol.peak_rss > 0)
+    # SIGKILL well under the CPU limit isn't a Time Limit Exceeded.
+    result, t_sol = self.hog("sigkill", limits)
+    assert(result == "Runtime Error" and t_sol.return_code == -9)
+
+  def test_failed_wait(self):
+    t_judge, t_sol = Subprocess([sys.executable, "-c", ""]), Subprocess([sys.executable, "-c", ""])
+    t_judge.wait()
+    # Without usage figures the limits can't be checked, and it is an error.
+    with patch.object(interactive_runner.os, "wait4", side_effect=OSError):
+      t_sol.wait()
+    t_sol.p.wait()
+    assert(t_sol.cpu_time is None and t_sol.peak_rss is None)
+    result, explanation = verdict(t_judge, t_sol, Limits(time=2, cpu=0.5, memory=200 << 20))
+    assert(result == "Runtime Error" and explanation == t_sol.error_message)
+
+
+class TestSweep(TestCase):
+
+  def test_parse_seeds(self):
+    assert(parse_seeds("0-3,7") == ["0", "1", "2", "3", "7"])
+    assert(parse_seeds("easy,hard") == ["easy", "hard"])
+    assert(seed_args(["judge", "{}", "x"], "5") == ["judge", "5", "x"])
+    assert(seed_args(["judge"], "5") == ["judge", "5"])
+
+  def test_sweep(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      judge = Path(tmp) / "judge.py"
+      # Seed 2 makes the judge fail.
+      judge.write_text(JUDGE + "sys.exit(sys.argv[1] == '2')\n")
+      results = sweep([sys.executable, str(judge), "{}"], [sys.executable, str(TEMPLATE_PATH)],
+                      parse_seeds("0-3"), jobs=2, limits=Limits(time=10))
+      assert([r.seed for r in results] == ["0", "1", "2", "3"])
+      assert([r.failed for r in results] == [False, False, True, False])
+      assert(results[2].verdict == "Wrong Answer")
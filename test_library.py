@@ -0,0 +1,78 @@
+import random
+import sys
+from pathlib import Path
+from unittest import TestCase
+
+sys.path.insert(0, str(Path(__file__).parent.resolve() / "templates" / "library"))
+
+from fenwick import Fenwick
+from int_heap import IntHeap
+from segment_tree import SegmentTree
+from trie import Trie
+from union_find import UnionFind
+
+
+class TestLibrary(TestCase):
+
+  def test_fenwick(self):
+    rng = random.Random(1)
+    values = [rng.randrange(100) for _ in range(37)]
+    tree = Fenwick(values)
+    for _ in range(200):
+      i, delta = rng.randrange(37), rng.randrange(100)
+      values[i] += delta
+      tree.add(i, delta)
+      lo, hi = sorted(rng.sample(range(38), 2))
+      assert(tree.range_sum(lo, hi) == sum(values[lo:hi]))
+      target = rng.randrange(sum(values) + 10)
+      expected = next((j for j in range(37) if sum(values[:j + 1]) >= target), 37)
+      assert(tree.lower_bound(target) == expected)
+    assert(Fenwick(5).prefix(5) == 0)
+
+  def test_segment_tree(self):
+    rng = random.Random(2)
+    values = [rng.randrange(1000) for _ in range(23)]
+    tree = SegmentTree(values, min, float("inf"))
+    # Concatenation isn't commutative, so this checks the order is kept.
+    strings = SegmentTree([str(i) for i in range(23)], lambda a, b: a + b, "")
+    for _ in range(200):
+      i, value = rng.randrange(23), rng.randrange(1000)
+      values[i] = value
+      tree.update(i, value)
+      lo, hi = sorted(rng.sample(range(24), 2))
+      assert(tree.query(lo, hi) == min(values[lo:hi]))
+      assert(strings.query(lo, hi) == "".join(str(j) for j in range(lo, hi)))
+    assert(tree[5] == values[5] and tree.query(3, 3) == float("inf"))
+
+  def test_union_find(self):
+    rng = random.Random(3)
+    uf = UnionFind(50)
+    labels = list(range(50))
+    for _ in range(40):
+      a, b = rng.randrange(50), rng.randrange(50)
+      assert(uf.union(a, b) == (labels[a] != labels[b]))
+      old = labels[a]
+      labels = [labels[b] if label == old else label for label in labels]
+      assert(uf.components == len(set(labels)))
+    for a in range(50):
+      for b in range(50):
+        assert(uf.same(a, b) == (labels[a] == labels[b]))
+
+  def test_trie(self):
+    words = ["code", "coder", "jam", "code", "co"]
+    trie = Trie(words)
+    assert(trie.count("code") == 2 and trie.count("cod") == 0 and trie.count("x") == 0)
+    assert(trie.count_prefix("co") == 4 and trie.count_prefix("") == 5 and trie.count_prefix("jams") == 0)
+    assert(not hasattr(trie.root, "__dict__"))
+
+  def test_int_heap(self):
+    rng = random.Random(4)
+    items = [(rng.randrange(-50, 50), rng.randrange(1 << 32)) for _ in range(300)]
+    heap = IntHeap()
+    for key, value in items:
+      heap.push(key, value)
+    assert(len(heap) == 300)
+    popped = []
+    while heap:
+      popped.append(heap.pop())
+    assert(popped == sorted(items))
@@ -3,7 +3,10 @@ import shutil
 from pathlib import Path
 from unittest import TestCase
 
-from new_problem import Args, FolderMaker, process_input
+from unittest import mock
+
+from new_problem import (Args, BatchFolderMaker, FolderMaker, inline_library, library_names, process_input,
+                         read_manifest, read_template)
 
 TEST_PATH = Path(__file__).parent.resolve()
 
@@ -259,6 +262,109 @@ class TestFolderMaker(TestCase):
       with self.assertRaises(FileExistsError):
         fm.make_folder()
 
+  def test_library(self):
+    comp = Node("Comp", [])
+    root = Node("root", [comp])
+    with TestFolders(root) as test_tree:
+      comp_name = comp.path.parts[-1]
+      with self.assertRaises(ValueError):
+        Args(comp_name, "2020", "TestRound", "TestProblem", False, ["no_such_library"])
+      args = Args(comp_name, "2020", "TestRound", "TestProblem", False, ["union_find", "int_heap"])
+      new_folder = FolderMaker(args, test_mode=True).make_folder()
+      source = (new_folder / "main.py").read_text()
+      assert(source.startswith("\'\'\'Standard template."))
+      # The library goes after the imports, and the template is unchanged after it.
+      assert(source.index("import sys") < source.index("from heapq import") < source.index("class UnionFind")
+             < source.index("class IntHeap") < source.index("def main():"))
+      assert(source.endswith(read_template("template.py").decode()[-200:]))
+      namespace = {}
+      exec(compile(source, "main.py", "exec"), namespace)
+      uf = namespace["UnionFind"](3)
+      uf.union(0, 2)
+      assert(uf.same(2, 0) and not uf.same(1, 0))
+      # Every library module can be inlined into every template.
+      for template in ("template.py", "interactive-template.py", "pre2018-template.py"):
+        compile(inline_library(read_template(template), library_names()), template, "exec")
+
+  def test_generator(self):
+    comp = Node("Comp", [])
+    root = Node("root", [comp])
+    with TestFolders(root) as test_tree:
+      comp_name = comp.path.parts[-1]
+      args = Args(comp_name, "2020", "TestRound", "TestProblem", False, generator=True)
+      new_folder = FolderMaker(args, test_mode=True).make_folder()
+      assert((new_folder / "gen.py").read_bytes() == read_template("generator.py"))
+      args = Args(comp_name, "2020", "TestRound", "Other", False)
+      assert(not (FolderMaker(args, test_mode=True).make_folder() / "gen.py").exists())
+
+class TestBatchFolderMaker(TestCase):
+
+  def test_read_manifest(self):
+    lines = [
+      "# A comment, then a blank line.",
+      "",
+      "Comp,2019,Round,A",
+      "Comp,2019,Round,B,true",
+      '{"competition": "Comp", "year": 2020, "round": "Round", "problem": "C", "interactive": true}',
+    ]
+    args = read_manifest(lines)
+    assert([a.prob_name for a in args] == ["A", "B", "C"])
+    assert([a.year for a in args] == [2019, 2019, 2020])
+    assert([a.interactive for a in args] == [False, True, True])
+    args = read_manifest(['Comp,2019,Round,A,,fenwick trie', '{"competition": "Comp", "year": 2019, "round": "R", '
+                          '"problem": "B", "library": ["trie"]}'])
+    assert([a.library for a in args] == [["fenwick", "trie"], ["trie"]])
+    args = read_manifest(['Comp,2019,Round,A,,,yes', '{"competition": "Comp", "year": 2019, "round": "R", '
+                          '"problem": "B", "generator": true}', 'Comp,2019,Round,C'])
+    assert([a.generator for a in args] == [True, True, False])
+    with self.assertRaises(ValueError):
+      read_manifest(["Comp,2017,Round,A,true"])
+    with self.assertRaises(KeyError):
+      read_manifest(["Comp,2019,Round"])
+
+  def test_batch_folder_making(self):
+    comp = Node("Comp", [])
+    root = Node("root", [comp])
+    with TestFolders(root) as test_tree:
+      comp_name = comp.path.parts[-1]
+      args = read_manifest(["{},2019,R1,A".format(comp_name), "{},2019,R1,B,1".format(comp_name),
+                            "{},2020,R2,C".format(comp_name)])
+      paths = BatchFolderMaker(args, test_mode=True).make_folders()
+      assert(len(paths) == 3)
+      for path in paths:
+        assert(path / "main.py").exists()
+        assert(path / "tests.in").exists()
+      assert(paths[1] / "interactive_runner.py").exists()
+      # Nothing is left behind in the practice root.
+      assert(not list(TEST_PATH.glob(".staging-*")))
+      # Existing or repeated problems are refused up front.
+      with self.assertRaises(FileExistsError):
+        BatchFolderMaker(args[:1], test_mode=True).make_folders()
+      more = read_manifest(["{},2021,R,D".format(comp_name)] * 2)
+      with self.assertRaises(FileExistsError):
+        BatchFolderMaker(more, test_mode=True).make_folders()
+      assert(not (comp.path / "2021").exists())
+
+  def test_batch_rollback(self):
+    comp = Node("Comp", [])
+    root = Node("root", [comp])
+    with TestFolders(root) as test_tree:
+      comp_name = comp.path.parts[-1]
+      args = read_manifest(["{},2019,R1,A".format(comp_name), "{},2020,R2,B".format(comp_name)])
+      # Fail while moving the second folder into place.
+      real_rename = os.rename
+      calls = []
+      def failing_rename(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+          raise OSError("disk on fire")
+        real_rename(src, dst)
+      with mock.patch("new_problem.os.rename", failing_rename):
+        with self.assertRaises(OSError):
+          BatchFolderMaker(args, test_mode=True).make_folders()
+      assert(list(comp.path.iterdir()) == [])
+      assert(not list(TEST_PATH.glob(".staging-*")))
+
 class TestProcessInput(TestCase):
 
   def test_process_input(self):
@@ -273,5 +379,18 @@ class TestProcessInput(TestCase):
       args = ['-c', comp_name, '-y', 'blah', '-r', 'TestRound', '-p', 'TestProblem']
       with self.assertRaises(ValueError):
         process_input(args)
+      a = process_input(['-c', comp_name, '-y', '2017', '-r', 'TestRound', '-p', 'TestProblem3', '-l', 'trie,fenwick'])
+      assert(a.library == ['trie', 'fenwick'])
+      a = process_input(['-c', comp_name, '-y', '2017', '-r', 'TestRound', '-p', 'TestProblem4', '-g'])
+      assert(a.generator and not a.interactive)
       args = ['-c', comp_name, '-y', '2017', '-r', 'TestRound', '-p', 'TestProblem', '-h']
       assert(process_input(args) == "help")
+
+  def test_process_manifest(self):
+    comp = Node("Comp", [])
+    root = Node("root", [comp])
+    with TestFolders(root) as test_folders:
+      manifest = comp.path / "manifest.csv"
+      manifest.write_text("{},2019,R1,A\n{},2019,R1,B\n".format(comp.path.name, comp.path.name))
+      args = process_input(['-m', str(manifest)])
+      assert([a.prob_name for a in args] == ["A", "B"])
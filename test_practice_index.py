@@ -0,0 +1,78 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from practice_index import PracticeIndex
+from test_new_problem import Node, TestFolders
+
+def practice_tree():
+  probs = [Node("Prob", []) for _ in range(2)]
+  rnd = Node("Round", probs)
+  year = Node("2020", [rnd])
+  comp = Node("Comp", [year])
+  practice = Node("Practice", [comp])
+  return Node("root", [practice]), practice, rnd, probs
+
+
+class TestPracticeIndex(TestCase):
+
+  def test_refresh(self):
+    root, practice, rnd, probs = practice_tree()
+    with TestFolders(root), tempfile.TemporaryDirectory() as tmp:
+      # The runner marks an interactive problem, whatever main.py's docstring says.
+      (probs[0].path / "main.py").write_text("'''My solution.\n")
+      (probs[0].path / "interactive_runner.py").write_text("")
+      (probs[0].path / "tests.in").write_text("12345")
+      (probs[1].path / "main.cpp").write_text("int main() {}\n")
+      index = PracticeIndex(Path(tmp) / "index.json", practice.path)
+      index.refresh()
+      keys = [key for key, _ in index.select()]
+      assert(len(keys) == 2)
+      first = index.problems[keys[0]]
+      assert(first["interactive"])
+      assert(first["tests_in"] == 5 and first["tests_out"] is None)
+      second = index.problems[keys[1]]
+      assert(not second["interactive"])
+      # Saved indexes load back the same.
+      index.save()
+      loaded = PracticeIndex.load(Path(tmp) / "index.json", practice.path)
+      assert(loaded.problems == index.problems)
+      assert(loaded.select(keys[0].rsplit("/", 1)[0]) == loaded.select())
+      assert(loaded.select(keys[1]) == [(keys[1], second)])
+      assert([p.name for p in Path(tmp).iterdir()] == ["index.json"])
+
+  def test_incremental_refresh(self):
+    root, practice, rnd, probs = practice_tree()
+    with TestFolders(root), tempfile.TemporaryDirectory() as tmp:
+      (probs[0].path / "main.py").write_text("")
+      index = PracticeIndex(Path(tmp) / "index.json", practice.path)
+      index.refresh()
+      assert(len(index.problems) == 1)
+      # Unchanged folders keep their records, even when stale.
+      key = index.select()[0][0]
+      index.problems[key]["tests_in"] = 99
+      index.refresh()
+      assert(index.problems[key]["tests_in"] == 99)
+      index.refresh(full=True)
+      assert(index.problems[key]["tests_in"] is None)
+      # New problems are picked up from the round folder's new mtime.
+      new_prob = rnd.path / "NewProb"
+      new_prob.mkdir()
+      (new_prob / "main.py").write_text("")
+      index.refresh()
+      assert(len(index.problems) == 2)
+
+  def test_add_problems(self):
+    root, practice, rnd, probs = practice_tree()
+    with TestFolders(root), tempfile.TemporaryDirectory() as tmp:
+      index = PracticeIndex(Path(tmp) / "index.json", practice.path)
+      index.refresh()
+      assert(index.problems == {})
+      (probs[1].path / "main.py").write_text("")
+      index.add_problems([probs[1].path])
+      assert(len(index.problems) == 1)
+      # The next refresh agrees with what was added.
+      added = dict(index.problems)
+      index.refresh()
+      assert(index.problems == added)
@@ -0,0 +1,99 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from probe import process_input, probe
+
+SOLUTION = '''import sys
+
+def main():
+  T = int(input())
+  for i in range(1, T + 1):
+    n = int(input())
+    print("Case #{}: {}".format(i, solve_problem(n)))
+
+def solve_problem(n):
+  return sum(square(i) for i in range(n))
+
+def square(i):
+  return i * i
+'''
+
+PRE2018_SOLUTION = '''FILENAME = "tests"
+
+def main():
+  with open(FILENAME + ".in") as f_in, open(FILENAME + ".out", "w") as f_out:
+    T = int(f_in.readline())
+    for i in range(1, T + 1):
+      f_out.write("Case #{}: {}\\n".format(i, solve_problem(int(f_in.readline()))))
+
+def solve_problem(n):
+  return sum(range(n))
+'''
+
+
+# Case 2 builds a large list of lists.
+MEMORY_SOLUTION = '''def main():
+  T = int(input())
+  for i in range(1, T + 1):
+    print("Case #{}: {}".format(i, solve_problem(int(input()))))
+
+def solve_problem(n):
+  grid = [[0] * n for _ in range(n)]
+  return len(grid)
+'''
+
+
+class TestProbe(TestCase):
+
+  def test_process_input(self):
+    opts = process_input(["-p", "-k", "3", "some/path"])
+    assert(opts["profile"] and opts["slowest"] == 3 and opts["path"] == Path("some/path"))
+    opts = process_input(["--memory", "-b", "64"])
+    assert(opts["memory"] and opts["budget"] == 64 and not opts["profile"])
+    assert(process_input(["-h"]) == "help")
+    with self.assertRaises(ValueError):
+      process_input(["-k", "many"])
+
+  def test_probe(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.py").write_text(SOLUTION)
+      (path / "tests.in").write_text("4\n10\n20000\n5\n30\n")
+      out = io.StringIO()
+      recorder = probe(path, profile=True, slowest=2, out=out)
+      assert(len(recorder.times) == 4)
+      assert([index for _, index, _ in recorder.slowest()][0] == 1)
+      assert("square (main.py:12)" in out.getvalue())
+      folded = (path / "profile.folded").read_text().splitlines()
+      assert(any(line.startswith("solve_problem (main.py:9);") for line in folded))
+      assert(all(int(line.rsplit(" ", 1)[1]) > 0 for line in folded))
+
+  def test_probe_pre2018(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.py").write_text(PRE2018_SOLUTION)
+      (path / "tests.in").write_text("3\n1\n2\n3\n")
+      recorder = probe(path, out=io.StringIO())
+      assert(len(recorder.times) == 3)
+      # The output goes to a temporary folder.
+      assert(not (path / "tests.out").exists())
+
+  def test_probe_memory(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.py").write_text(MEMORY_SOLUTION)
+      (path / "tests.in").write_text("3\n10\n1000\n20\n")
+      out = io.StringIO()
+      _, memory = probe(path, memory=True, budget=4, out=out)
+      assert(len(memory.peaks) == 3)
+      # A 1000x1000 grid of pointers takes about 8 MB.
+      assert(memory.growths[1] > 7 * 10**6 and memory.growths[0] < 10**5)
+      assert(memory.snapshot_case == 1)
+      report = out.getvalue()
+      assert("1 of 3 cases over" in report and "OVER BUDGET" in report)
+      assert("grid = [[0] * n for _ in range(n)]" in report)
+      # Only the solution's own lines are listed, not the standard library's.
+      lines = report.split("Top allocating lines")[1].split("Peak RSS")[0].strip().splitlines()[1:]
+      assert(lines and all("main.py:" in line for line in lines))
@@ -0,0 +1,69 @@
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+import run_cache
+from run_cache import RunCache, cached_run
+
+COUNTER = '''import sys
+with open("runs.txt", "a") as f:
+  f.write("x")
+print(sys.stdin.read().upper(), end="")
+'''
+
+
+class TestRunCache(TestCase):
+
+  def test_cached_run(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.py").write_text(COUNTER)
+      (path / "tests.in").write_text("abc")
+      cache = RunCache(path / "cache")
+      result, cached = cached_run(cache, path / "main.py", path / "tests.in")
+      assert(result.stdout == b"ABC" and not cached)
+      result, cached = cached_run(cache, path / "main.py", path / "tests.in")
+      assert(result.stdout == b"ABC" and cached)
+      assert((path / "runs.txt").read_text() == "x")
+      # Changing the input or the source runs it again.
+      (path / "tests.in").write_text("abd")
+      result, cached = cached_run(cache, path / "main.py", path / "tests.in")
+      assert(result.stdout == b"ABD" and not cached)
+      (path / "main.py").write_text(COUNTER + "\n")
+      assert(not cached_run(cache, path / "main.py", path / "tests.in")[1])
+      # Without a cache it always runs.
+      assert(not cached_run(None, path / "main.py", path / "tests.in")[1])
+      assert((path / "runs.txt").read_text() == "xxxx")
+
+  def test_compiler_key(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      (path / "main.c").write_text("int main(void) { return 0; }\n")
+      (path / "gcc").write_bytes(b"old")
+      (path / "gcc-new").write_bytes(b"newer")
+      cache = RunCache(path / "cache")
+      with patch.object(run_cache.shutil, "which", return_value=str(path / "gcc")):
+        key = cache.key(path / "main.c")
+        assert(cache.key(path / "main.c") == key)
+        # Upgrading the compiler in place, or pointing at another one, changes the key.
+        (path / "gcc").write_bytes(b"upgraded")
+        upgraded = cache.key(path / "main.c")
+        assert(upgraded != key)
+        (path / "gcc").unlink()
+        (path / "gcc").symlink_to(path / "gcc-new")
+        assert(cache.key(path / "main.c") not in (key, upgraded))
+
+  def test_evict(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      cache = RunCache(Path(tmp), max_bytes=2500)
+      for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, b"x" * 1000)
+        os.utime(str(Path(tmp) / key), ns=(i * 10**9, i * 10**9))
+      # Reading an entry makes it the most recently used.
+      assert(cache.get("a") == b"x" * 1000)
+      assert(cache.evict() == 1)
+      assert(cache.get("b") is None)
+      assert(cache.get("a") is not None and cache.get("c") is not None)
+      assert(cache.evict() == 0)
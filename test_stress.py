@@ -0,0 +1,76 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from stress import CRASH, FAIL, check_input, parse_cases, process_input, stress
+
+GEN = '''import random, sys
+seed, n = int(sys.argv[1]), int(sys.argv[2])
+r = random.Random(seed)
+T = 4
+print(T)
+for _ in range(T):
+  k = r.randint(1, n)
+  print(k)
+  print(" ".join(str(r.randint(-5, 5)) for _ in range(k)))
+'''
+
+BRUTE = '''T = int(input())
+for i in range(1, T + 1):
+  input()
+  print("Case #{}: {}".format(i, max(map(int, input().split()))))
+'''
+
+# Wrong when every number is negative.
+BUGGY = '''T = int(input())
+for i in range(1, T + 1):
+  input()
+  print("Case #{}: {}".format(i, max([0] + list(map(int, input().split())))))
+'''
+
+def write_folder(path, main):
+  (path / "gen.py").write_text(GEN)
+  (path / "brute.py").write_text(BRUTE)
+  (path / "main.py").write_text(main)
+
+
+class TestStress(TestCase):
+
+  def test_parse_cases(self):
+    assert(parse_cases(b"Case #1: 1  2\nCase #2:\n3\n") == {1: b"1 2", 2: b"3"})
+
+  def test_check_input(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      write_folder(path, BUGGY)
+      assert(not check_input(path, b"2\n1\n3\n2\n1 2\n", 10).failed)
+      check = check_input(path, b"2\n1\n3\n2\n-1 -2\n", 10)
+      assert(check.status == FAIL and check.case == 2)
+      assert(check.main_answer == "0" and check.brute_answer == "-1")
+      (path / "main.py").write_text("raise ValueError('oops')\n")
+      check = check_input(path, b"1\n1\n3\n", 10)
+      assert(check.status == CRASH)
+      assert("oops" in check.main_answer)
+
+  def test_stress(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      path = Path(tmp)
+      write_folder(path, BRUTE)
+      out = io.StringIO()
+      assert(stress(path, seeds=range(5), size=3, jobs=2, out=out) is None)
+      write_folder(path, BUGGY)
+      failure = stress(path, seeds=range(50), size=3, jobs=2, out=out)
+      # The failing input shrinks down to a single negative number.
+      assert(failure.data.split() == [b"1", b"1", failure.data.split()[2]])
+      assert(int(failure.data.split()[2]) < 0)
+      assert((path / "stress.in").read_bytes() == failure.data)
+
+  def test_process_input(self):
+    opts = process_input(['-s', '5-9', '-n', '3'])
+    assert(opts['seeds'] == range(5, 10))
+    assert(opts['size'] == 3)
+    assert(not opts['cold'] and process_input(['--cold'])['cold'])
+    assert(process_input(['-s', '7'])['seeds'] == range(7, 8))
+    with self.assertRaises(ValueError):
+      process_input(['-s', 'a-b'])
@@ -0,0 +1,34 @@
+import io
+import multiprocessing
+import sys
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.resolve() / "templates"))
+
+import template
+
+def run_template(data):
+  stdin, stdout = io.TextIOWrapper(io.BytesIO(data)), io.StringIO()
+  with patch.object(sys, "stdin", stdin), patch.object(sys, "stdout", stdout):
+    template.main()
+  return stdout.getvalue()
+
+
+class TestTemplate(TestCase):
+
+  def test_parallel(self):
+    T = 4 * template.MIN_PARALLEL_CASES + 3
+    data = "{}\n{}".format(T, "".join("{} {}\n".format(i, i * i) for i in range(T))).encode()
+    serial = run_template(data)
+    assert(serial.splitlines()[-1] == "Case #{}: {}".format(T, (T - 1) * T))
+    # The pool is used even on one core, and the cases still come out in order.
+    with patch.object(template, "PARALLEL", True), patch.object(multiprocessing, "cpu_count", return_value=2), \
+         patch.object(multiprocessing, "Pool", wraps=multiprocessing.Pool) as pool:
+      assert(run_template(data) == serial)
+      assert(pool.call_count == 1)
+      # Too few cases are solved serially.
+      few = template.MIN_PARALLEL_CASES - 1
+      assert(template.solve_all([(1, 2)] * few) == [3] * few)
+      assert(pool.call_count == 1)
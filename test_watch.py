@@ -0,0 +1,86 @@
+import io
+import sys
+import threading
+import time
+from unittest import TestCase
+
+from test_grade import ECHO_SUM, problem_tree, write_problem
+from test_new_problem import TestFolders
+from watch import InotifyWatcher, PollWatcher, process_input, watch
+
+def save_later(path, text, delay=0.5):
+  timer = threading.Timer(delay, path.write_text, [text])
+  timer.start()
+  return timer
+
+
+class TestWatch(TestCase):
+
+  def check_watcher(self, make):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root):
+      write_problem(probs[0].path, ECHO_SUM, "1\n1 2\n")
+      write_problem(probs[1].path, ECHO_SUM, "1\n1 2\n")
+      watcher = make(comp.path)
+      try:
+        assert(watcher.changes(0.3) == [])
+        time.sleep(0.01)
+        (probs[1].path / "tests.in").write_text("1\n2 2\n")
+        assert(watcher.changes(2.0) == [probs[1].path])
+        # Other files don't count.
+        (probs[1].path / "notes.txt").write_text("")
+        assert(watcher.changes(0.3) == [])
+        # New problems do.
+        new_prob = rnd.path / "New"
+        new_prob.mkdir()
+        write_problem(new_prob, ECHO_SUM, "1\n1 2\n")
+        changed = []
+        deadline = time.monotonic() + 5
+        while new_prob not in changed and time.monotonic() < deadline:
+          changed += watcher.changes(0.5)
+        assert(new_prob in changed)
+      finally:
+        watcher.close()
+
+  def test_poll_watcher(self):
+    self.check_watcher(lambda path: PollWatcher(path, interval=0.05))
+
+  def test_inotify_watcher(self):
+    if not sys.platform.startswith("linux"):
+      self.skipTest("inotify is only available on Linux")
+    self.check_watcher(InotifyWatcher)
+
+  def test_watch(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root):
+      write_problem(probs[0].path, ECHO_SUM, "1\n1 2\n", "Case #1: 3\n")
+      write_problem(probs[1].path, ECHO_SUM, "1\n1 2\n")
+      timer = save_later(probs[0].path / "tests.in", "1\n1 3\n")
+      out = io.StringIO()
+      verdicts = watch(rnd.path, debounce=0.05, runs=1, out=out)
+      timer.join()
+      assert([(v.name.rsplit("/", 1)[1], v.status) for v in verdicts] == [(probs[0].path.name, "WA")])
+      assert("Case #1: 4" in out.getvalue())
+
+  def test_cancel(self):
+    root, comp, rnd, probs = problem_tree()
+    with TestFolders(root):
+      write_problem(probs[0].path, "import time\ntime.sleep(30)\n", "\n")
+      # The save during the slow run cancels it, and the new main.py is run.
+      timers = [save_later(probs[0].path / "tests.in", "1\n", 0.3),
+                save_later(probs[0].path / "main.py", "print('done')\n", 1.0)]
+      out = io.StringIO()
+      start = time.monotonic()
+      verdicts = watch(rnd.path, debounce=0.05, runs=1, out=out)
+      for timer in timers:
+        timer.join()
+      assert(time.monotonic() - start < 10)
+      assert(verdicts[0].status == "OK" and "STOP" in out.getvalue())
+
+  def test_process_input(self):
+    opts = process_input(["-d", "200", "--poll", "Comp"])
+    assert(opts["debounce"] == 0.2 and opts["poll"] and str(opts["path"]) == "Comp")
+    assert(opts["history"] is not None and process_input(["--no-history"])["history"] is None)
+    assert(process_input(["-h"]) == "help")
+    with self.assertRaises(ValueError):
+      process_input(["-t", "soon"])
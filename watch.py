@@ -0,0 +1,400 @@
+#!/usr/bin/python
+'''Watch script.
+
+This script watches a competition, year, round or problem folder and reruns a
+problem's solution on its `tests.in` whenever the solution, `tests.in` or
+`tests.out` in that problem's folder is saved, printing a verdict as in
+`grade.py`. Only the problem that changed is run. The solution is `main.py`, or
+a `main` source in a compiled language, built through the build cache.
+
+On Linux the tree is watched with inotify, so changes are seen as soon as they
+happen. Elsewhere, or with `--poll`, the watched files are checked every
+`--interval` milliseconds, and the tree is rescanned for new problems every few
+seconds. Saves closer together than `--debounce` milliseconds (editors often
+write a file more than once) lead to a single run, and a save to a problem
+which is being run kills the run, which starts again after the debounce.
+
+Runs are recorded in the run history (see `history.py`) unless `--no-history`
+is given, and a run much slower than the problem's fastest version so far is
+flagged under its verdict.
+
+Example::
+
+    $ cd CodeJam/2020/Round1A && python3 ../../../watch.py
+
+'''
+
+import ctypes, ctypes.util, os, select, struct, subprocess, sys, tempfile, time
+from getopt import getopt, GetoptError
+from pathlib import Path
+
+from build_cache import CompileError, solution_command
+from grade import Verdict, judge
+from history import History
+from problems import (PROBLEM_DEPTH, SOURCE_SUFFIXES, RunResult, find_problems, problem_name, scope_depth,
+                      solution_file, walk_tree)
+
+# Only saves to these files trigger a run.
+WATCHED_FILES = tuple('main' + suffix for suffix in SOURCE_SUFFIXES) + ('tests.in', 'tests.out')
+
+# The polling watcher looks for new problem folders this often, in seconds.
+RESCAN_INTERVAL = 2.0
+
+# Lines of stdout, or stderr for a crash, shown after a verdict.
+SHOWN_LINES = 10
+
+def main(argv):
+  try:
+    opts = process_input(argv)
+    if opts == 'help':
+      print_usage(err=False)
+    watch(**opts)
+  except KeyboardInterrupt:
+    pass
+  except Exception as e:
+    exit('{}'.format(e))
+
+def print_usage(err=True):
+  exit('usage: watch.py [-h] [-d <ms>] [-i <ms>] [-t <seconds>] [--poll] [--no-history] [<path>]', err=err)
+
+def exit(message, err=True):
+  print(message)
+  sys.exit(1 if err else 0)
+
+def process_input(argv):
+  try:
+    opts, args = getopt(argv, 'hd:i:t:', ['debounce=', 'interval=', 'timeout=', 'poll', 'no-history'])
+  except GetoptError:
+    print_usage()
+  if len(args) > 1:
+    print_usage()
+  result = {'path': Path(args[0]) if args else Path.cwd(), 'debounce': 0.1, 'interval': 0.25,
+            'timeout': None, 'poll': False, 'history': History()}
+  try:
+    for opt, arg in opts:
+      if opt == '-h':
+        return 'help'
+      elif opt in ('-d', '--debounce'):
+        result['debounce'] = float(arg) / 1000
+      elif opt in ('-i', '--interval'):
+        result['interval'] = float(arg) / 1000
+      elif opt in ('-t', '--timeout'):
+        result['timeout'] = float(arg)
+      elif opt == '--poll':
+        result['poll'] = True
+      elif opt == '--no-history':
+        result['history'] = None
+  except ValueError as e:
+    raise ValueError('Debounce, interval and timeout must be numbers.') from e
+  return result
+
+def watch(path, debounce=0.1, interval=0.25, timeout=None, poll=False, runs=None, history=None, out=sys.stdout):
+  '''Reruns problems below `path` as they change, until interrupted.
+
+  Args:
+    debounce (float): Seconds without saves before a changed problem is run.
+    interval (float): Seconds between checks of the polling watcher.
+    timeout (float): Seconds of wall time before a run is killed.
+    poll (bool): Use the polling watcher even if inotify is available.
+    runs (int): Stop after this many verdicts, or None to run forever.
+    history (History): The run history to record runs in, or None.
+
+  Returns:
+    The list of Verdicts printed.
+
+  '''
+  path = Path(path).resolve()
+  watcher = make_watcher(path, interval, poll)
+  verdicts = []
+  pending = {}
+  run = None
+  print('Watching {} problems in {}.'.format(len(find_problems(path)), path), file=out, flush=True)
+  try:
+    while runs is None or len(verdicts) < runs:
+      if run is not None:
+        # Check on the run often, so its verdict comes quickly.
+        wait = 0.005
+      elif pending:
+        wait = max(0.0, min(pending.values()) + debounce - time.monotonic())
+      else:
+        wait = None
+      for problem in watcher.changes(wait):
+        pending[problem] = time.monotonic()
+        if run is not None and run.path == problem:
+          run.cancel()
+          print('{:<5} {:>8} {:>8}  {}'.format('STOP', '-', '-', problem_name(problem)), file=out, flush=True)
+          run = None
+      if run is not None:
+        result = run.poll()
+        if result is not None:
+          verdict = Verdict(problem_name(run.path), judge(result, run.path / 'tests.out'), result)
+          report(verdict, out)
+          if history is not None:
+            regression = history.record(verdict.name, run.main_path, result, verdict.status)
+            if regression is not None:
+              print('  ! {}'.format(regression), file=out, flush=True)
+          verdicts.append(verdict)
+          run = None
+      if run is None:
+        now = time.monotonic()
+        ready = [p for p, t in pending.items() if now - t >= debounce]
+        if ready:
+          problem = min(ready, key=pending.get)
+          del pending[problem]
+          main_path = solution_file(problem)
+          if main_path is not None and (problem / 'tests.in').is_file():
+            try:
+              run = Run(problem, timeout, main_path)
+            except CompileError as e:
+              verdict = Verdict(problem_name(problem), 'CE')
+              print(verdict, file=out)
+              for line in e.output.splitlines()[-SHOWN_LINES:]:
+                print('  ' + line, file=out)
+              out.flush()
+              verdicts.append(verdict)
+  finally:
+    if run is not None:
+      run.cancel()
+    watcher.close()
+  return verdicts
+
+def report(verdict, out=sys.stdout):
+  '''Prints a verdict with the start of the output, or the end of the errors.'''
+  print(verdict, file=out)
+  if verdict.status == 'RE':
+    lines = verdict.result.stderr.decode(errors='replace').splitlines()[-SHOWN_LINES:]
+  elif verdict.status in ('OK', 'WA'):
+    lines = verdict.result.stdout.decode(errors='replace').splitlines()[:SHOWN_LINES]
+  else:
+    lines = []
+  for line in lines:
+    print('  ' + line, file=out)
+  out.flush()
+
+def make_watcher(path, interval=0.25, poll=False):
+  '''Returns an InotifyWatcher if possible, and a PollWatcher otherwise.'''
+  if not poll:
+    try:
+      return InotifyWatcher(path)
+    except OSError:
+      pass
+  return PollWatcher(path, interval)
+
+
+class Run:
+  '''A solution run in the background, on its problem's `tests.in`.
+
+  Args:
+    path (Path): The problem folder.
+    timeout (float): Seconds of wall time before the run is killed.
+    main_path (Path): The solution, or None for the folder's `solution_file`.
+
+  Attributes:
+    path (Path): The problem folder.
+    main_path (Path): The solution being run.
+
+  Raises:
+    CompileError: If a compiled solution fails to build.
+
+  '''
+
+  def __init__(self, path, timeout=None, main_path=None):
+    self.path      = path
+    self.main_path = main_path or solution_file(path)
+    command        = solution_command(self.main_path)
+    self._deadline = None
+    self._killed   = False
+    self._stdout   = tempfile.TemporaryFile()
+    self._stderr   = tempfile.TemporaryFile()
+    with open(str(path / 'tests.in'), 'rb') as stdin:
+      self._start = time.perf_counter()
+      self._p = subprocess.Popen(command, stdin=stdin, stdout=self._stdout,
+                                 stderr=self._stderr, cwd=str(path))
+    if timeout is not None:
+      self._deadline = self._start + timeout
+
+  def poll(self):
+    '''Returns the RunResult if the run has finished, or None.'''
+    if self._deadline is not None and time.perf_counter() > self._deadline and not self._killed:
+      self._killed = True
+      self._p.kill()
+    pid, status, usage = os.wait4(self._p.pid, os.WNOHANG)
+    if pid == 0:
+      return None
+    wall = time.perf_counter() - self._start
+    # Tell Popen the process has been reaped so it doesn't try again.
+    self._p.returncode = os.waitstatus_to_exitcode(status)
+    stdout, stderr = self._read(self._stdout), self._read(self._stderr)
+    return RunResult(self._p.returncode, wall, usage.ru_utime + usage.ru_stime, usage.ru_maxrss,
+                     stdout, stderr, self._killed)
+
+  def cancel(self):
+    '''Kills and reaps the run.'''
+    if self._p.returncode is None:
+      self._p.kill()
+      self._p.wait()
+    self._stdout.close()
+    self._stderr.close()
+
+  def _read(self, f):
+    f.seek(0)
+    data = f.read()
+    f.close()
+    return data
+
+
+class PollWatcher:
+  '''PollWatcher finds changed problems by checking file modification times.
+
+  Args:
+    path (Path): The folder being watched.
+    interval (float): Seconds between checks.
+
+  '''
+
+  def __init__(self, path, interval=0.25):
+    self.path      = path
+    self.interval  = interval
+    self._problems = {}
+    self._scanned  = 0
+    self._checked  = 0
+    self._rescan()
+
+  def changes(self, timeout=None):
+    '''Waits up to `timeout` seconds (forever if None) and returns changed problems.
+
+    The files are only checked once per interval, however short the timeout.
+    '''
+    while True:
+      now = time.monotonic()
+      next_check = self._checked + self.interval
+      if timeout is not None and now + timeout < next_check:
+        time.sleep(timeout)
+        return []
+      time.sleep(max(0.0, next_check - now))
+      changed = self._check()
+      if changed or timeout is not None:
+        return changed
+
+  def close(self):
+    pass
+
+  def _check(self):
+    self._checked = time.monotonic()
+    if time.monotonic() - self._scanned >= RESCAN_INTERVAL:
+      return self._rescan()
+    changed = []
+    for problem, stamps in self._problems.items():
+      new = _stamps(problem)
+      if new != stamps:
+        self._problems[problem] = new
+        changed.append(problem)
+    return changed
+
+  def _rescan(self):
+    # New problems count as changed, except on the first scan.
+    first = not self._scanned
+    old = self._problems
+    self._problems = {problem: _stamps(problem) for problem in find_problems(self.path)}
+    self._scanned = time.monotonic()
+    return [problem for problem, stamps in self._problems.items()
+            if not first and old.get(problem) != stamps]
+
+def _stamps(problem):
+  stamps = []
+  for name in WATCHED_FILES:
+    try:
+      st = os.stat(str(problem / name))
+      stamps.append((st.st_mtime_ns, st.st_size))
+    except OSError:
+      stamps.append(None)
+  return stamps
+
+
+class InotifyWatcher:
+  '''InotifyWatcher finds changed problems with Linux's inotify, through ctypes.
+
+  Every folder of the tree below the watched folder is watched, so that new
+  problem folders are picked up as soon as they are created.
+
+  Args:
+    path (Path): The folder being watched.
+
+  Raises:
+    OSError: If inotify isn't available.
+
+  '''
+
+  # Masks from <sys/inotify.h>.
+  IN_CLOSE_WRITE = 0x00000008
+  IN_MOVED_FROM  = 0x00000040
+  IN_MOVED_TO    = 0x00000080
+  IN_CREATE      = 0x00000100
+  IN_DELETE      = 0x00000200
+  IN_Q_OVERFLOW  = 0x00004000
+  IN_IGNORED     = 0x00008000
+  IN_ISDIR       = 0x40000000
+  MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+  EVENT = struct.Struct('iIII')
+
+  def __init__(self, path):
+    if not sys.platform.startswith('linux'):
+      raise OSError('inotify is only available on Linux.')
+    self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    self.path = path
+    self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    if self._fd < 0:
+      raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+    self._folders = {}
+    self._add_tree(path, scope_depth(path))
+
+  def changes(self, timeout=None):
+    '''Waits up to `timeout` seconds (forever if None) and returns changed problems.'''
+    readable, _, _ = select.select([self._fd], [], [], timeout)
+    if not readable:
+      return []
+    changed = []
+    try:
+      data = os.read(self._fd, 1 << 16)
+    except BlockingIOError:
+      return []
+    offset = 0
+    while offset < len(data):
+      wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+      name = data[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b'\0').decode(errors='replace')
+      offset += self.EVENT.size + length
+      if mask & self.IN_Q_OVERFLOW:
+        # Events were lost, so treat every problem as changed.
+        self._add_tree(self.path, scope_depth(self.path))
+        changed.extend(find_problems(self.path))
+        continue
+      if mask & self.IN_IGNORED:
+        self._folders.pop(wd, None)
+        continue
+      if wd not in self._folders:
+        continue
+      folder, depth = self._folders[wd]
+      if depth == PROBLEM_DEPTH:
+        if name in WATCHED_FILES and folder not in changed:
+          changed.append(folder)
+      elif mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+        # A new folder, e.g. made by new_problem.py, may already have problems.
+        if not name.startswith(('.', '_')) and not (depth == 0 and name == 'templates'):
+          self._add_tree(folder / name, depth + 1)
+          changed.extend(p for p in find_problems(folder / name) if p not in changed)
+    return changed
+
+  def close(self):
+    if self._fd >= 0:
+      os.close(self._fd)
+      self._fd = -1
+
+  def _add_tree(self, path, depth):
+    for folder, d in walk_tree(path, depth):
+      wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(folder)), self.MASK)
+      if wd >= 0:
+        self._folders[wd] = (folder, d)
+
+if __name__ == "__main__":
+  main(sys.argv[1:])